@@ -3,6 +3,7 @@ import re
 import pytest
 from django.contrib.auth import get_user_model
 from django.db.models import fields
+from django.utils import timezone
 
 try:
     from posts.models import Comment
@@ -55,8 +56,8 @@ class TestComment:
         assert type(pub_date_field) == fields.DateTimeField, (
             f'Свойство `{pub_date_field_name}` модели `Comment` должно быть датой и время `DateTimeField`'
         )
-        assert pub_date_field.auto_now_add, (
-            f'Свойство `{pub_date_field_name}` модели `Comment` должно быть `auto_now_add`'
+        assert pub_date_field.auto_now_add or pub_date_field.default is timezone.now, (
+            f'Свойство `{pub_date_field_name}` модели `Comment` должно быть `auto_now_add` или `default=timezone.now`'
         )
 
         author_field = search_field(model_fields, 'author_id')
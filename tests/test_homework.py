@@ -7,6 +7,7 @@ from django.contrib.auth import get_user_model
 from django.core.paginator import Page
 from django.db.models import fields
 from django.template.loader import select_template
+from django.utils import timezone
 
 from tests.utils import get_field_from_context
 
@@ -61,8 +62,8 @@ class TestPost:
         assert type(pub_date_field) == fields.DateTimeField, (
             f'Свойство `{pub_date_field_name}` модели `Post` должно быть датой и временем `DateTimeField`'
         )
-        assert pub_date_field.auto_now_add, (
-            f'Свойство `pub_date` или `created` модели `Post` должно быть `auto_now_add`'
+        assert pub_date_field.auto_now_add or pub_date_field.default is timezone.now, (
+            f'Свойство `pub_date` или `created` модели `Post` должно быть `auto_now_add` или `default=timezone.now`'
         )
 
         author_field = search_field(model_fields, 'author_id')
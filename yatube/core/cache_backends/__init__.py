@@ -0,0 +1,39 @@
+"""Выбор бэкенда кеша по адресу из окружения.
+
+Поддерживаются адреса:
+    locmem://                     — память процесса (по умолчанию);
+    dummy://                      — кеш отключён;
+    file:///var/tmp/yatube-cache  — общий каталог на диске;
+    memcached://host:11211[,host2:11211] — memcached (python-memcached);
+    redis://host:6379/0           — сервер с протоколом Redis (RESP).
+"""
+from urllib.parse import urlsplit
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'memcached': 'django.core.cache.backends.memcached.MemcachedCache',
+    'redis': 'core.cache_backends.resp.RespCache',
+}
+
+
+def cache_config(url, key_prefix=''):
+    """Словарь для settings.CACHES по адресу вида scheme://location."""
+    parts = urlsplit(url)
+    if parts.scheme not in BACKENDS:
+        raise ValueError(f'Неизвестная схема адреса кеша: {url!r}')
+    config = {
+        'BACKEND': BACKENDS[parts.scheme],
+        'KEY_PREFIX': key_prefix,
+    }
+    if parts.scheme == 'file':
+        config['LOCATION'] = parts.path
+    elif parts.scheme == 'memcached':
+        config['LOCATION'] = parts.netloc.split(',')
+    elif parts.scheme == 'redis':
+        config['LOCATION'] = parts.netloc
+        config['OPTIONS'] = {'DB': int(parts.path.strip('/') or 0)}
+    elif parts.scheme == 'locmem':
+        config['LOCATION'] = parts.netloc
+    return config
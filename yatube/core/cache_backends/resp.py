@@ -0,0 +1,249 @@
+"""Бэкенд кеша для серверов с протоколом Redis (RESP).
+
+Не требует сторонних пакетов: команды отправляются напрямую по сокету.
+Целые числа хранятся как есть, чтобы INCRBY был атомарным на сервере,
+остальные значения сериализуются pickle.
+"""
+import pickle
+import socket
+import threading
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+# INCRBY только существующего ключа одной командой: между проверкой и
+# увеличением другой клиент не удалит ключ. nil — ключа нет.
+INCR_EXISTING = (
+    "if redis.call('EXISTS', KEYS[1]) == 1 then "
+    "return redis.call('INCRBY', KEYS[1], ARGV[1]) end "
+    "return nil"
+)
+
+
+class RespError(Exception):
+    """Сервер ответил ошибкой."""
+
+
+class RespConnection:
+    """Одно соединение с сервером и разбор ответов RESP.
+
+    Команда и чтение её ответов идут под блокировкой: экземпляр кеша,
+    общий для нескольких потоков, не перемешивает их ответы.
+    """
+
+    def __init__(self, host, port, db=0, socket_timeout=5):
+        self.address = (host, port)
+        self.db = db
+        self.socket_timeout = socket_timeout
+        self._sock = None
+        self._file = None
+        self._lock = threading.RLock()
+
+    def connect(self):
+        self._sock = socket.create_connection(
+            self.address, timeout=self.socket_timeout
+        )
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile('rb')
+        if self.db:
+            self._send(('SELECT', self.db))
+            reply = self._read()
+            if isinstance(reply, RespError):
+                raise reply
+
+    def close(self):
+        with self._lock:
+            if self._sock is not None:
+                self._file.close()
+                self._sock.close()
+            self._sock = self._file = None
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode()
+
+    def _send(self, *commands):
+        chunks = []
+        for command in commands:
+            chunks.append(b'*%d\r\n' % len(command))
+            for arg in command:
+                arg = self._encode(arg)
+                chunks.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        self._sock.sendall(b''.join(chunks))
+
+    def _read(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError('Сервер кеша закрыл соединение')
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode()
+        if kind == b'-':
+            return RespError(payload.decode())
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length == -1:
+                return None
+            return self._file.read(length + 2)[:-2]
+        if kind == b'*':
+            length = int(payload)
+            if length == -1:
+                return None
+            return [self._read() for _ in range(length)]
+        raise RespError(f'Неожиданный ответ сервера: {line!r}')
+
+    def execute(self, *commands):
+        """Выполняет команды одним пакетом, возвращает список ответов."""
+        with self._lock:
+            replies = self._execute(commands)
+        # Ошибки поднимаем только после чтения всех ответов пакета,
+        # иначе следующие команды прочитают чужие ответы.
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def _execute(self, commands):
+        for attempt in (1, 2):
+            if self._sock is None:
+                self.connect()
+            try:
+                self._send(*commands)
+                return [self._read() for _ in commands]
+            except (ConnectionError, socket.timeout, OSError):
+                # Разорванное соединение переоткрываем один раз.
+                self.close()
+                if attempt == 2:
+                    raise
+
+
+class RespCache(BaseCache):
+    def __init__(self, server, params):
+        super().__init__(params)
+        host, _, port = server.partition(':')
+        options = params.get('OPTIONS', {})
+        self._close_connection = options.get('CLOSE_CONNECTION', False)
+        self._connection = RespConnection(
+            host or '127.0.0.1',
+            int(port or 6379),
+            db=options.get('DB', 0),
+            socket_timeout=options.get('SOCKET_TIMEOUT', 5),
+        )
+
+    def _command(self, *args):
+        return self._connection.execute(args)[0]
+
+    def _expiry_ms(self, timeout):
+        """Время жизни в миллисекундах, None — без срока."""
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return None
+        return max(int(timeout * 1000), 0)
+
+    @staticmethod
+    def _dump(value):
+        if type(value) is int:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _load(raw):
+        try:
+            return int(raw)
+        except ValueError:
+            return pickle.loads(raw)
+
+    def _set_args(self, key, value, timeout):
+        args = ['SET', key, self._dump(value)]
+        expiry = self._expiry_ms(timeout)
+        if expiry is not None:
+            args += ['PX', expiry]
+        return args
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        if self._expiry_ms(timeout) == 0:
+            return False
+        reply = self._command(*self._set_args(key, value, timeout), 'NX')
+        return reply is not None
+
+    def get(self, key, default=None, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        raw = self._command('GET', key)
+        return default if raw is None else self._load(raw)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        if self._expiry_ms(timeout) == 0:
+            self._command('DEL', key)
+            return
+        self._command(*self._set_args(key, value, timeout))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        expiry = self._expiry_ms(timeout)
+        if expiry is None:
+            return bool(self._command('PERSIST', key)) or self.has_key(key)
+        return bool(self._command('PEXPIRE', key, expiry))
+
+    def delete(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self._command('DEL', key)
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        made = {self.make_key(key, version=version): key for key in keys}
+        values = self._command('MGET', *made)
+        return {
+            made[made_key]: self._load(raw)
+            for made_key, raw in zip(made, values) if raw is not None
+        }
+
+    def has_key(self, key, version=None):
+        key = self.make_key(key, version=version)
+        return bool(self._command('EXISTS', key))
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_key(key, version=version)
+        try:
+            value = self._command('EVAL', INCR_EXISTING, 1, key, delta)
+        except RespError as error:
+            raise ValueError(str(error))
+        if value is None:
+            raise ValueError("Key '%s' not found" % key)
+        return value
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        commands = []
+        for key, value in data.items():
+            key = self.make_key(key, version=version)
+            self.validate_key(key)
+            commands.append(self._set_args(key, value, timeout))
+        if commands:
+            self._connection.execute(*commands)
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_key(key, version=version) for key in keys]
+        if keys:
+            self._command('DEL', *keys)
+
+    def clear(self):
+        self._command('FLUSHDB')
+
+    def close(self, **kwargs):
+        # Django закрывает кеши после каждого запроса; соединение потока
+        # по умолчанию переиспользуется между запросами.
+        if self._close_connection:
+            self._connection.close()
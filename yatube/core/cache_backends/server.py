@@ -0,0 +1,192 @@
+"""Локальная замена сервера Redis для разработки и тестов.
+
+Понимает подмножество команд, которое использует RespCache, и хранит
+данные в памяти одного процесса. Несколько воркеров Django, подключённых
+к нему, видят общий кеш — так проверяется согласованность и
+инвалидация без внешних сервисов.
+"""
+import socketserver
+import threading
+import time
+
+from .resp import INCR_EXISTING
+
+
+class Storage:
+    """Словарь ключей со сроками жизни, общий для всех соединений."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.databases = {}
+
+    def db(self, index):
+        return self.databases.setdefault(index, {})
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.db_index = 0
+
+    @property
+    def data(self):
+        return self.server.storage.db(self.db_index)
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def reply(self, value):
+        if value is None:
+            self.wfile.write(b'$-1\r\n')
+        elif isinstance(value, int):
+            self.wfile.write(b':%d\r\n' % value)
+        elif isinstance(value, bytes):
+            self.wfile.write(b'$%d\r\n%s\r\n' % (len(value), value))
+        elif isinstance(value, list):
+            self.wfile.write(b'*%d\r\n' % len(value))
+            for item in value:
+                self.reply(item)
+        elif isinstance(value, Exception):
+            self.wfile.write(b'-ERR %s\r\n' % str(value).encode())
+        else:
+            self.wfile.write(b'+%s\r\n' % str(value).encode())
+
+    def handle(self):
+        while True:
+            command = self.read_command()
+            if command is None:
+                return
+            if not command:
+                continue
+            name = command[0].decode().upper()
+            method = getattr(self, f'cmd_{name.lower()}', None)
+            with self.server.storage.lock:
+                if method is None:
+                    result = ValueError(f"unknown command '{name}'")
+                else:
+                    try:
+                        result = method(*command[1:])
+                    except (TypeError, ValueError) as error:
+                        result = ValueError(str(error) or 'syntax error')
+            self.reply(result)
+            self.wfile.flush()
+
+    def _alive(self, key):
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires = item
+        if expires is not None and expires <= time.monotonic():
+            del self.data[key]
+            return None
+        return item
+
+    def cmd_ping(self, *args):
+        return args[0] if args else 'PONG'
+
+    def cmd_select(self, index):
+        self.db_index = int(index)
+        return 'OK'
+
+    def cmd_get(self, key):
+        item = self._alive(key)
+        return None if item is None else item[0]
+
+    def cmd_mget(self, *keys):
+        return [self.cmd_get(key) for key in keys]
+
+    def cmd_set(self, key, value, *options):
+        options = [option.upper() for option in options]
+        expires = None
+        if b'PX' in options:
+            milliseconds = int(options[options.index(b'PX') + 1])
+            expires = time.monotonic() + milliseconds / 1000
+        if b'EX' in options:
+            seconds = int(options[options.index(b'EX') + 1])
+            expires = time.monotonic() + seconds
+        exists = self._alive(key) is not None
+        if (b'NX' in options and exists
+                or b'XX' in options and not exists):
+            return None
+        self.data[key] = (value, expires)
+        return 'OK'
+
+    def cmd_del(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def cmd_exists(self, *keys):
+        return sum(self._alive(key) is not None for key in keys)
+
+    def cmd_incrby(self, key, delta):
+        item = self._alive(key)
+        value, expires = item if item else (b'0', None)
+        try:
+            value = int(value) + int(delta)
+        except ValueError:
+            raise ValueError('value is not an integer or out of range')
+        self.data[key] = (str(value).encode(), expires)
+        return value
+
+    def cmd_incr(self, key):
+        return self.cmd_incrby(key, 1)
+
+    def cmd_eval(self, script, numkeys, *args):
+        # Lua не исполняется: сервер знает только скрипты RespCache.
+        if script != INCR_EXISTING.encode():
+            raise ValueError('only RespCache scripts are supported')
+        keys, argv = args[:int(numkeys)], args[int(numkeys):]
+        if self._alive(keys[0]) is None:
+            return None
+        return self.cmd_incrby(keys[0], argv[0])
+
+    def cmd_pexpire(self, key, milliseconds):
+        item = self._alive(key)
+        if item is None:
+            return 0
+        expires = time.monotonic() + int(milliseconds) / 1000
+        self.data[key] = (item[0], expires)
+        return 1
+
+    def cmd_persist(self, key):
+        item = self._alive(key)
+        if item is None or item[1] is None:
+            return 0
+        self.data[key] = (item[0], None)
+        return 1
+
+    def cmd_flushdb(self):
+        self.data.clear()
+        return 'OK'
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=('127.0.0.1', 6379)):
+        self.storage = Storage()
+        super().__init__(address, RespHandler)
+
+    @property
+    def location(self):
+        host, port = self.server_address[:2]
+        return f'{host}:{port}'
+
+    def start(self):
+        """Запускает сервер в фоновом потоке (для тестов)."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
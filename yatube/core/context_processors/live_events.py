@@ -0,0 +1,8 @@
+from django.conf import settings
+
+
+def live_events(request):
+    """Добавляет способ доставки событий живых лент."""
+    return {
+        'live_transport': settings.LIVE_EVENTS['TRANSPORT']
+    }
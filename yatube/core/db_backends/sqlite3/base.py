@@ -0,0 +1,151 @@
+"""SQLite с настройками PRAGMA, BEGIN IMMEDIATE и пулом соединений.
+
+Новое соединение получает PRAGMA из DATABASES[alias]['PRAGMAS'], а
+транзакции начинаются с BEGIN <TRANSACTION_MODE> (см. core.db_backends).
+
+Если задан DATABASES[alias]['POOL'], закрытое соединение (конец запроса,
+close_old_connections) не закрывается, а возвращается в пул и достаётся
+следующему запросу в любом потоке. Это полезно многопоточным серверам,
+где поток живёт один запрос и CONN_MAX_AGE не помогает: соединение
+умирает вместе с потоком. Перед выдачей соединение проверяется
+запросом SELECT 1.
+
+Настройки в DATABASES[alias]['POOL']:
+    SIZE — сколько простаивающих соединений держать (лишние закрываются);
+    HEALTH_CHECK_AFTER — проверять соединения, простоявшие дольше
+    стольких секунд (0 — проверять всегда).
+"""
+import collections
+import sqlite3
+import threading
+import time
+
+from django.db.backends.sqlite3 import base
+
+
+class ConnectionPool:
+    """Простаивающие соединения одной базы, общие для всех потоков."""
+
+    def __init__(self, size=8, health_check_after=0):
+        self.size = size
+        self.health_check_after = health_check_after
+        self.idle = collections.deque()
+        self.lock = threading.Lock()
+        self.stats = collections.Counter()
+
+    @staticmethod
+    def healthy(connection):
+        try:
+            connection.execute('SELECT 1').fetchone()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def checkout(self):
+        """Живое соединение из пула или None, если пул пуст."""
+        while True:
+            with self.lock:
+                if not self.idle:
+                    self.stats['created'] += 1
+                    return None
+                # Последнее возвращённое — самое «тёплое».
+                connection, since = self.idle.pop()
+            fresh = time.monotonic() - since < self.health_check_after
+            if fresh or self.healthy(connection):
+                with self.lock:
+                    self.stats['reused'] += 1
+                return connection
+            with self.lock:
+                self.stats['discarded'] += 1
+            try:
+                connection.close()
+            except sqlite3.Error:
+                pass
+
+    def checkin(self, connection):
+        """Возвращает соединение; False, если пул полон."""
+        with self.lock:
+            if len(self.idle) >= self.size:
+                self.stats['overflow'] += 1
+                return False
+            self.idle.append((connection, time.monotonic()))
+            return True
+
+    def close_all(self):
+        with self.lock:
+            idle, self.idle = self.idle, collections.deque()
+        for connection, _ in idle:
+            connection.close()
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats, idle=len(self.idle), size=self.size)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pool_for(name, size=8, health_check_after=0):
+    """Пул базы name (один на процесс)."""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = ConnectionPool(size, health_check_after)
+        return pool
+
+
+def pool_stats():
+    """Счётчики всех пулов процесса: {база: {...}}."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {name: pool.snapshot() for name, pool in pools.items()}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    @property
+    def pool(self):
+        options = self.settings_dict.get('POOL')
+        if options is None:
+            return None
+        return pool_for(
+            self.settings_dict['NAME'],
+            options.get('SIZE', 8),
+            options.get('HEALTH_CHECK_AFTER', 0),
+        )
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        connection = pool.checkout() if pool else None
+        if connection is None:
+            connection = super().get_new_connection(conn_params)
+            pragmas = self.settings_dict.get('PRAGMAS', {})
+            for name, value in pragmas.items():
+                connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        # Так начинает транзакцию atomic().
+        mode = self.settings_dict.get('TRANSACTION_MODE') or ''
+        self.cursor().execute(f'BEGIN {mode}'.strip())
+
+    def _set_autocommit(self, autocommit):
+        # Вне autocommit модуль sqlite3 сам начинает транзакцию перед
+        # первой записью командой BEGIN <isolation_level>.
+        if autocommit:
+            level = None
+        else:
+            level = self.settings_dict.get('TRANSACTION_MODE') or ''
+        with self.wrap_database_errors:
+            self.connection.isolation_level = level
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Соединение с незавершённым atomic другому запросу не отдаём.
+        if self.pool and not self.in_atomic_block:
+            if self.connection.in_transaction:
+                self.connection.rollback()
+            if self.pool.checkin(self.connection):
+                return
+        super()._close()
@@ -0,0 +1,292 @@
+"""Замеры запросов: время, SQL, кеш и отрисовка шаблонов.
+
+Счётчики текущего запроса лежат в thread-local; хуки кеша и шаблонов
+ставятся один раз и при отсутствии замера только проверяют, есть ли он.
+Итоги копятся в гистограммах процесса, их показывает страница /metrics/.
+Время шаблонов считается и по каждому шаблону отдельно, включая
+родителей extends и include: полное и «собственное» (без вложенных).
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.db import connections
+from django.template.base import Template
+
+# Верхние границы корзин гистограммы времени ответа, мс.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_local = threading.local()
+_MISSING = object()
+
+
+class RequestMetrics:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.queries = 0
+        self.sql_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_time = 0.0
+        # Шаблоны в процессе отрисовки: у каждого время вложенных.
+        self.template_stack = []
+        # {имя: [отрисовок, полное время, собственное время]}
+        self.templates = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка connection.execute_wrapper."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += time.perf_counter() - started
+
+    def add_template(self, name, elapsed, own):
+        stats = self.templates.setdefault(name, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] += own
+
+    def slowest_templates(self, limit=3):
+        """Шаблоны с наибольшим собственным временем: «имя 1.2 мс»."""
+        slowest = sorted(
+            self.templates.items(), key=lambda item: -item[1][2]
+        )[:limit]
+        return ', '.join(
+            f'{name} {own * 1000:.1f} мс' for name, (_, _, own) in slowest
+        )
+
+    def server_timing(self):
+        """Значение заголовка Server-Timing."""
+        return ', '.join((
+            f'db;dur={self.sql_time * 1000:.1f};'
+            f'desc="{self.queries} queries"',
+            f'cache;desc="{self.cache_hits} hits '
+            f'{self.cache_misses} misses"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+            f'total;dur={self.duration * 1000:.1f}',
+        ))
+
+
+def current():
+    """Замер текущего запроса или None."""
+    return getattr(_local, 'metrics', None)
+
+
+class measure:
+    """Контекстный менеджер: замер запроса в текущем потоке."""
+
+    def __enter__(self):
+        self.metrics = RequestMetrics()
+        self.stack = ExitStack()
+        for connection in connections.all():
+            self.stack.enter_context(
+                connection.execute_wrapper(self.metrics)
+            )
+        _local.metrics = self.metrics
+        return self.metrics
+
+    def __exit__(self, *exc_info):
+        _local.metrics = None
+        self.stack.close()
+        self.metrics.duration = time.perf_counter() - self.metrics.started
+
+
+def _patch_cache():
+    def get(self, key, default=None, version=None):
+        metrics = current()
+        if metrics is None:
+            return self._instrumented_get(key, default, version)
+        value = self._instrumented_get(key, _MISSING, version)
+        if value is _MISSING:
+            metrics.cache_misses += 1
+            return default
+        metrics.cache_hits += 1
+        return value
+
+    def get_many(self, keys, version=None):
+        metrics = current()
+        if metrics is None:
+            return self._instrumented_get_many(keys, version)
+        keys = list(keys)
+        # Базовый get_many вызывает get: промахи не считаем дважды.
+        _local.metrics = None
+        try:
+            found = self._instrumented_get_many(keys, version)
+        finally:
+            _local.metrics = metrics
+        metrics.cache_hits += len(found)
+        metrics.cache_misses += len(keys) - len(found)
+        return found
+
+    get.instrumented = get_many.instrumented = True
+    hooks = {'get': get, 'get_many': get_many}
+    # Бэкенды переопределяют get, поэтому хук ставится на каждый класс,
+    # где метод определён. Класс, унаследовавший метод, получает и хук,
+    # и исходный метод (_instrumented_*) от предка.
+    classes = [BaseCache]
+    while classes:
+        cls = classes.pop()
+        classes.extend(cls.__subclasses__())
+        for name, hook in hooks.items():
+            method = vars(cls).get(name)
+            if method is None or getattr(method, 'instrumented', False):
+                continue
+            setattr(cls, f'_instrumented_{name}', method)
+            setattr(cls, name, hook)
+
+
+def _patch_templates():
+    # _render вызывается и для include, и для родителя extends.
+    original_render = Template._render
+
+    def _render(self, context):
+        metrics = current()
+        if metrics is None:
+            return original_render(self, context)
+        nested = [0.0]
+        metrics.template_stack.append(nested)
+        started = time.perf_counter()
+        try:
+            return original_render(self, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.template_stack.pop()
+            # Вложенные шаблоны не считаем в общем времени дважды.
+            if metrics.template_stack:
+                metrics.template_stack[-1][0] += elapsed
+            else:
+                metrics.template_time += elapsed
+            metrics.add_template(
+                self.name or '<string>', elapsed, elapsed - nested[0]
+            )
+
+    Template._render = _render
+
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def install():
+    """Ставит хуки кеша и шаблонов (один раз на процесс)."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        # Классы бэкендов загружаются при первом обращении к кешу.
+        for alias in settings.CACHES:
+            caches[alias]
+        _patch_cache()
+        _patch_templates()
+        _installed = True
+
+
+class Histograms:
+    """Сводные замеры по представлениям в памяти процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+        self.templates = {}
+
+    def record(self, view, metrics, slow):
+        with self.lock:
+            stats = self.views.get(view)
+            if stats is None:
+                stats = self.views[view] = {
+                    'count': 0,
+                    'slow': 0,
+                    'buckets': [0] * (len(BUCKETS_MS) + 1),
+                    'duration_ms': 0.0,
+                    'max_duration_ms': 0.0,
+                    'sql_ms': 0.0,
+                    'queries': 0,
+                    'template_ms': 0.0,
+                    'cache_hits': 0,
+                    'cache_misses': 0,
+                }
+            duration_ms = metrics.duration * 1000
+            stats['count'] += 1
+            stats['slow'] += slow
+            bucket = bisect.bisect_left(BUCKETS_MS, duration_ms)
+            stats['buckets'][bucket] += 1
+            stats['duration_ms'] += duration_ms
+            stats['max_duration_ms'] = max(
+                stats['max_duration_ms'], duration_ms
+            )
+            stats['sql_ms'] += metrics.sql_time * 1000
+            stats['queries'] += metrics.queries
+            stats['template_ms'] += metrics.template_time * 1000
+            stats['cache_hits'] += metrics.cache_hits
+            stats['cache_misses'] += metrics.cache_misses
+            for name, (renders, elapsed, own) in metrics.templates.items():
+                total = self.templates.setdefault(name, {
+                    'renders': 0, 'ms': 0.0, 'self_ms': 0.0, 'max_ms': 0.0,
+                })
+                total['renders'] += renders
+                total['ms'] += elapsed * 1000
+                total['self_ms'] += own * 1000
+                total['max_ms'] = max(total['max_ms'], elapsed * 1000)
+
+    def snapshot(self):
+        """Копия гистограмм со средними значениями."""
+        with self.lock:
+            views = {}
+            for view, stats in self.views.items():
+                count = stats['count']
+                views[view] = {
+                    'count': count,
+                    'slow': stats['slow'],
+                    'duration_ms': {
+                        'buckets': {
+                            (f'le_{bound}' if bound else 'inf'): total
+                            for bound, total in zip(
+                                BUCKETS_MS + (None,), stats['buckets']
+                            )
+                        },
+                        'mean': round(stats['duration_ms'] / count, 3),
+                        'max': round(stats['max_duration_ms'], 3),
+                    },
+                    'mean_queries': round(stats['queries'] / count, 2),
+                    'mean_sql_ms': round(stats['sql_ms'] / count, 3),
+                    'mean_template_ms': round(
+                        stats['template_ms'] / count, 3
+                    ),
+                    'cache_hits': stats['cache_hits'],
+                    'cache_misses': stats['cache_misses'],
+                }
+            # Сначала шаблоны, на которые ушло больше всего времени.
+            templates = {
+                name: {
+                    'renders': stats['renders'],
+                    'mean_ms': round(stats['ms'] / stats['renders'], 3),
+                    'mean_self_ms': round(
+                        stats['self_ms'] / stats['renders'], 3
+                    ),
+                    'total_self_ms': round(stats['self_ms'], 3),
+                    'max_ms': round(stats['max_ms'], 3),
+                }
+                for name, stats in sorted(
+                    self.templates.items(),
+                    key=lambda item: -item[1]['self_ms'],
+                )
+            }
+        return {'pid': os.getpid(), 'views': views, 'templates': templates}
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+            self.templates.clear()
+
+
+histograms = Histograms()
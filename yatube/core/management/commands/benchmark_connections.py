@@ -0,0 +1,92 @@
+import json
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import ConnectionHandler
+
+from core.db_backends import ENGINES
+from core.db_backends.sqlite3.base import pool_stats
+
+MODES = ('new', 'persistent', 'pooled')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет цену соединения с базой на запрос: новое соединение '
+        'на каждый запрос (CONN_MAX_AGE=0), постоянное соединение потока '
+        '(CONN_MAX_AGE=None) и пул процесса (sqlite+pool). Каждый цикл '
+        'повторяет жизнь запроса: проверка соединения, запрос, закрытие.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument(
+            '--query', default='SELECT COUNT(*) FROM posts_group',
+            help='Запрос, который выполняет каждый «запрос».'
+        )
+        parser.add_argument(
+            '--thread-per-request', action='store_true',
+            help='Каждый запрос в новом потоке, как у runserver.'
+        )
+
+    def config(self, mode):
+        config = dict(connections.databases[DEFAULT_DB_ALIAS])
+        config.pop('POOL', None)
+        if mode == 'pooled':
+            if config['ENGINE'] != ENGINES['sqlite+pool']:
+                return None
+            config['POOL'] = {'SIZE': 8}
+        config['CONN_MAX_AGE'] = None if mode == 'persistent' else 0
+        return config
+
+    def handle(self, *args, **options):
+        results = []
+        for mode in MODES:
+            config = self.config(mode)
+            if config is None:
+                continue
+            # Отдельный набор соединений на режим, псевдоним обязателен.
+            handler = ConnectionHandler({DEFAULT_DB_ALIAS: config})
+            seconds = self.run(
+                handler, options['query'], options['requests'],
+                options['thread_per_request'],
+            )
+            result = {
+                'mode': mode,
+                'requests': options['requests'],
+                'thread_per_request': options['thread_per_request'],
+                'total_ms': round(seconds * 1000, 2),
+                'per_request_us': round(
+                    seconds / options['requests'] * 1e6, 1
+                ),
+            }
+            if mode == 'pooled':
+                result['pool'] = pool_stats().get(config['NAME'])
+            results.append(result)
+            self.stderr.write(
+                f'{mode:<11}{result["per_request_us"]:>10.1f} мкс/запрос'
+            )
+            handler.close_all()
+        self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
+
+    def run(self, handler, query, total, thread_per_request):
+        def request():
+            connection = handler[DEFAULT_DB_ALIAS]
+            # То же, что делают сигналы request_started/request_finished.
+            connection.close_if_unusable_or_obsolete()
+            with connection.cursor() as cursor:
+                cursor.execute(query)
+                cursor.fetchall()
+            connection.close_if_unusable_or_obsolete()
+
+        started = time.perf_counter()
+        for _ in range(total):
+            if thread_per_request:
+                thread = threading.Thread(target=request)
+                thread.start()
+                thread.join()
+            else:
+                request()
+        return time.perf_counter() - started
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.cache_backends.server import RespServer
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает локальный сервер кеша с протоколом Redis, '
+        'общий для нескольких процессов Django.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=6379)
+
+    def handle(self, *args, **options):
+        server = RespServer((options['host'], options['port']))
+        self.stdout.write(
+            f'Сервер кеша слушает redis://{server.location}/0'
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
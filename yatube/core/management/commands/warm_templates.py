@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+
+from core.template_warmup import is_cached, warm
+
+
+class Command(BaseCommand):
+    help = (
+        'Компилирует все шаблоны проекта и приложений и сообщает об '
+        'ошибках. Серверы прогревают шаблоны сами при запуске '
+        '(yatube/wsgi.py, yatube/asgi.py), команда нужна для проверки '
+        'перед выкладкой и оценки времени прогрева.'
+    )
+
+    def handle(self, *args, **options):
+        result = warm()
+        self.stdout.write(
+            f'Скомпилировано шаблонов: {result["templates"]} '
+            f'за {result["seconds"] * 1000:.1f} мс'
+        )
+        if not any(
+            is_cached(backend.engine) for backend in engines.all()
+            if hasattr(backend, 'engine')
+        ):
+            self.stdout.write(
+                'Кешируемый загрузчик выключен (DEBUG без TEMPLATE_CACHE): '
+                'шаблоны разбираются заново при каждой отрисовке.'
+            )
+        if result['errors']:
+            for name, error in result['errors'].items():
+                self.stderr.write(f'{name}: {error}')
+            raise CommandError(
+                f'Шаблонов с ошибками: {len(result["errors"])}'
+            )
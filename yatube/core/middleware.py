@@ -0,0 +1,105 @@
+import logging
+import random
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import Resolver404, resolve
+
+from . import instrumentation, page_cache
+
+logger = logging.getLogger('core.instrumentation')
+
+
+class InstrumentationMiddleware:
+    """Замеряет часть запросов: время, SQL, кеш и шаблоны.
+
+    Доля замеряемых запросов — INSTRUMENTATION['SAMPLE_RATE']; при нуле
+    middleware отключается целиком и ничего не стоит.
+    """
+
+    def __init__(self, get_response):
+        config = settings.INSTRUMENTATION
+        self.sample_rate = config['SAMPLE_RATE']
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.server_timing = config['SERVER_TIMING']
+        self.slow_request_ms = config['SLOW_REQUEST_MS']
+        self.slow_query_count = config['SLOW_QUERY_COUNT']
+        self.get_response = get_response
+        instrumentation.install()
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+        with instrumentation.measure() as metrics:
+            response = self.get_response(request)
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        slow = (
+            metrics.duration * 1000 > self.slow_request_ms
+            or metrics.queries > self.slow_query_count
+        )
+        instrumentation.histograms.record(view, metrics, slow)
+        if slow:
+            logger.warning(
+                'Медленный запрос %s %s (%s): %.1f мс, %d SQL за %.1f мс, '
+                'шаблоны %.1f мс (%s)',
+                request.method, request.path, view,
+                metrics.duration * 1000, metrics.queries,
+                metrics.sql_time * 1000, metrics.template_time * 1000,
+                metrics.slowest_templates(),
+            )
+        if self.server_timing:
+            response['Server-Timing'] = metrics.server_timing()
+        return response
+
+
+class PageCacheMiddleware:
+    """Отдаёт анонимам сохранённые страницы (см. core.page_cache).
+
+    Стоит до сессий и аутентификации: попадание в кеш их не запускает.
+    Запросы с cookie сессии идут мимо кеша. Заголовок X-Page-Cache
+    показывает результат: hit, stale или miss.
+    """
+
+    def __init__(self, get_response):
+        if not page_cache.enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not page_cache.cacheable_request(request):
+            page_cache.count('bypass')
+            return self.get_response(request)
+        cached, fresh = page_cache.lookup(request)
+        if cached is not None and (
+            fresh or not page_cache.try_revalidate(request)
+        ):
+            # Устаревшую страницу тем временем пересобирает другой запрос.
+            state = 'hit' if fresh else 'stale'
+            page_cache.count(state)
+            cached['X-Page-Cache'] = state
+            self.resolve(request)
+            return cached
+        try:
+            response = self.get_response(request)
+            if page_cache.cacheable_response(request, response):
+                page_cache.store(request, response)
+                page_cache.count('store')
+            elif cached is not None:
+                page_cache.forget(request)
+        finally:
+            if cached is not None:
+                page_cache.release(request)
+        if hasattr(request, 'page_cache_scopes'):
+            page_cache.count('miss')
+            response['X-Page-Cache'] = 'miss'
+        return response
+
+    @staticmethod
+    def resolve(request):
+        # Для замеров: ответ из кеша учитывается под своим представлением.
+        try:
+            request.resolver_match = resolve(request.path_info)
+        except Resolver404:
+            pass
@@ -0,0 +1,145 @@
+"""Кеш целых страниц для анонимных посетителей.
+
+Представление включает кеш своей страницы вызовом tag(request, ...),
+перечисляя области, от которых страница зависит (лента, группа, автор,
+пост). Ключ страницы — путь с параметрами; вместе с ответом хранятся
+версии её областей, а purge() увеличивает версии, так что изменение
+поста сбрасывает ровно те страницы, где он виден.
+
+Устаревшая страница (истёк PAGE_CACHE['TTL'] или сменилась версия
+области) ещё PAGE_CACHE['STALE'] секунд отдаётся посетителям, пока один
+запрос, взявший блокировку, строит новую: истечение кеша не приводит к
+лавине одинаковых запросов к базе.
+"""
+import collections
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+# Область, от которой зависит любая страница: purge(ALL) сбрасывает всё.
+ALL: str = 'pages'
+
+# Что случилось с запросом: hit, stale, miss, bypass, store.
+stats = collections.Counter()
+_stats_lock = threading.Lock()
+
+
+def enabled():
+    return settings.PAGE_CACHE['ENABLED']
+
+
+def count(event):
+    with _stats_lock:
+        stats[event] += 1
+
+
+def snapshot():
+    with _stats_lock:
+        return dict(stats)
+
+
+def tag(request, *scopes):
+    """Разрешает кешировать страницу запроса и задаёт её области."""
+    request.page_cache_scopes = (ALL, *scopes)
+
+
+def _page_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'page:{path}'
+
+
+def _scope_key(scope):
+    return f'page:scope:{scope}'
+
+
+def versions(scopes):
+    """Текущие версии областей: {область: версия}."""
+    keys = {_scope_key(scope): scope for scope in scopes}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        # Версия от времени: после вытеснения старые номера не вернутся.
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        found[key] = cache.get(key)
+    return {scope: found[key] for key, scope in keys.items()}
+
+
+def purge(*scopes):
+    """Сбрасывает страницы, зависящие от областей."""
+    if not enabled():
+        return
+    for scope in scopes:
+        key = _scope_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time.time() * 1000), timeout=None)
+
+
+def lookup(request):
+    """(ответ из кеша или None, свежий ли он)."""
+    entry = cache.get(_page_key(request))
+    if entry is None:
+        return None, False
+    fresh = (
+        time.time() < entry['fresh_until']
+        and versions(entry['versions']) == entry['versions']
+    )
+    response = HttpResponse(entry['content'], status=entry['status'])
+    for name, value in entry['headers']:
+        response[name] = value
+    return response, fresh
+
+
+def try_revalidate(request):
+    """Берёт право пересобрать страницу; False, если её уже строят."""
+    return cache.add(
+        f'{_page_key(request)}:lock', 1,
+        settings.PAGE_CACHE['LOCK_TIMEOUT'],
+    )
+
+
+def release(request):
+    cache.delete(f'{_page_key(request)}:lock')
+
+
+def store(request, response):
+    config = settings.PAGE_CACHE
+    cache.set(_page_key(request), {
+        'content': response.content,
+        'status': response.status_code,
+        'headers': list(response.items()),
+        'versions': versions(request.page_cache_scopes),
+        'fresh_until': time.time() + config['TTL'],
+    }, config['TTL'] + config['STALE'])
+
+
+def forget(request):
+    cache.delete(_page_key(request))
+
+
+def cacheable_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    cookies = settings.PAGE_CACHE['BYPASS_COOKIES']
+    return not any(name in request.COOKIES for name in cookies)
+
+
+def cacheable_response(request, response):
+    """Ответ одинаков для всех анонимов и его можно сохранить."""
+    user = getattr(request, 'user', None)
+    cache_control = response.get('Cache-Control', '')
+    return (
+        hasattr(request, 'page_cache_scopes')
+        and request.method == 'GET'
+        and response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_USED')
+        and not (user and user.is_authenticated)
+        and 'private' not in cache_control
+        and 'no-store' not in cache_control
+    )
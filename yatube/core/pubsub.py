@@ -0,0 +1,151 @@
+"""Публикация и ожидание событий по каналам.
+
+Событие — номер по порядку, набор каналов и данные, пригодные для JSON.
+Подписчик ждёт события своих каналов новее известного ему номера:
+ожидание блокирует поток, но не обращается к базе, поэтому сотни
+открытых соединений не превращаются в сотни запросов опроса.
+
+Бэкенд задаётся настройкой PUBSUB:
+    core.pubsub.LocalBroker — память процесса, будит ждущих сразу;
+    core.pubsub.CacheBroker — общий кеш (redis://, memcached://), события
+    видны всем процессам, ждущие раз в POLL_INTERVAL читают один ключ.
+"""
+import collections
+import itertools
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+
+class BaseBroker:
+    def publish(self, channels, data):
+        """Публикует событие в каналы, возвращает его номер."""
+        raise NotImplementedError
+
+    def last_id(self):
+        """Номер последнего опубликованного события."""
+        raise NotImplementedError
+
+    def wait(self, channels, after, timeout):
+        """Ждёт события каналов с номером больше after.
+
+        Возвращает (номер, с которого продолжать, [(номер, данные)]);
+        по истечении timeout список событий пуст.
+        """
+        raise NotImplementedError
+
+
+class LocalBroker(BaseBroker):
+    """События в памяти процесса; хранятся последние HISTORY штук."""
+
+    def __init__(self, history=1000):
+        self.events = collections.deque(maxlen=history)
+        self.ids = itertools.count(1)
+        self.last = 0
+        self.condition = threading.Condition()
+
+    def publish(self, channels, data):
+        with self.condition:
+            self.last = next(self.ids)
+            self.events.append((self.last, frozenset(channels), data))
+            self.condition.notify_all()
+        return self.last
+
+    def last_id(self):
+        return self.last
+
+    def _matching(self, channels, after):
+        found = []
+        for event_id, event_channels, data in reversed(self.events):
+            if event_id <= after:
+                break
+            if event_channels & channels:
+                found.append((event_id, data))
+        return found[::-1]
+
+    def wait(self, channels, after, timeout):
+        channels = frozenset(channels)
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            # Номер из прошлой жизни процесса: начинаем с текущего.
+            if after > self.last:
+                after = self.last
+            while True:
+                found = self._matching(channels, after)
+                remaining = deadline - time.monotonic()
+                if found or remaining <= 0:
+                    return self.last, found
+                self.condition.wait(remaining)
+
+
+class CacheBroker(BaseBroker):
+    """События в общем кеше: счётчик и ключ на каждое событие."""
+
+    def __init__(self, cache='default', history=1000, ttl=300,
+                 poll_interval=0.5):
+        self.alias = cache
+        self.history = history
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+
+    @property
+    def cache(self):
+        # Брокер один на процесс, а кеши Django у каждого потока свои.
+        return caches[self.alias]
+
+    def _event_key(self, event_id):
+        return f'pubsub:event:{event_id}'
+
+    def publish(self, channels, data):
+        self.cache.add('pubsub:last', 0, timeout=None)
+        event_id = self.cache.incr('pubsub:last')
+        self.cache.set(
+            self._event_key(event_id), (list(channels), data),
+            timeout=self.ttl,
+        )
+        return event_id
+
+    def last_id(self):
+        return self.cache.get('pubsub:last', 0)
+
+    def wait(self, channels, after, timeout):
+        channels = set(channels)
+        deadline = time.monotonic() + timeout
+        while True:
+            last = self.last_id()
+            if after > last:
+                after = last
+            found = []
+            if last > after:
+                first = max(after, last - self.history) + 1
+                keys = [self._event_key(i) for i in range(first, last + 1)]
+                events = self.cache.get_many(keys)
+                for event_id in range(first, last + 1):
+                    event = events.get(self._event_key(event_id))
+                    if event and channels.intersection(event[0]):
+                        found.append((event_id, event[1]))
+                after = last
+            if found or time.monotonic() >= deadline:
+                return after, found
+            time.sleep(
+                min(self.poll_interval, max(deadline - time.monotonic(), 0))
+            )
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def broker():
+    """Брокер из настройки PUBSUB (один на процесс)."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            config = settings.PUBSUB
+            _broker = import_string(config['BACKEND'])(
+                **config.get('OPTIONS', {})
+            )
+        return _broker
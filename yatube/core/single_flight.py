@@ -0,0 +1,120 @@
+"""Заполнение кеша одним запросом (single-flight).
+
+Когда дорогое значение в кеше истекает, его пересчитывает только
+запрос, взявший блокировку в кеше. Остальные в это время получают
+старое значение (оно хранится ещё SINGLE_FLIGHT['STALE'] секунд), а
+если старого нет — ждут до SINGLE_FLIGHT['WAIT'] секунд, пока значение
+появится.
+
+Чтобы пересчёт не начинался ровно в момент истечения, значение
+обновляется чуть раньше с вероятностью, растущей к концу срока и
+пропорциональной времени расчёта (XFetch, коэффициент BETA).
+"""
+import collections
+import math
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+# hit, fill, early_fill, stale, waited, wait_timeout.
+stats = collections.Counter()
+_stats_lock = threading.Lock()
+
+# Шаг ожидания чужого пересчёта, секунды.
+WAIT_STEP: float = 0.02
+
+
+def count(event):
+    with _stats_lock:
+        stats[event] += 1
+
+
+def snapshot():
+    """Счётчики и число пересчётов, которых удалось избежать."""
+    with _stats_lock:
+        result = dict(stats)
+    result['saved'] = result.get('stale', 0) + result.get('waited', 0)
+    return result
+
+
+def _read(cache, key):
+    """Запись (значение, срок, время расчёта) или None.
+
+    Срок None — значение бессрочное.
+
+    Под теми же ключами встроенный {% cache %} хранил просто строки:
+    после обновления они остаются в общем кеше до истечения, и всё,
+    что не похоже на запись, считается промахом.
+    """
+    entry = cache.get(key)
+    if (
+        isinstance(entry, tuple) and len(entry) == 3
+        and (entry[1] is None or isinstance(entry[1], (int, float)))
+        and isinstance(entry[2], (int, float))
+    ):
+        return entry
+    return None
+
+
+def _past_expiry(entry):
+    return entry[1] is not None and time.time() >= entry[1]
+
+
+def _expired(entry):
+    value, expires, delta = entry
+    if expires is None:
+        return False
+    beta = settings.SINGLE_FLIGHT['BETA']
+    # 1 - random() лежит в (0, 1]: логарифм определён.
+    early = delta * beta * -math.log(1 - random.random())
+    return time.time() + early >= expires
+
+
+def _fill(cache, key, fill, timeout):
+    started = time.time()
+    value = fill()
+    delta = time.time() - started
+    stale = settings.SINGLE_FLIGHT['STALE']
+    if timeout is None:
+        cache.set(key, (value, None, delta), None)
+    else:
+        cache.set(
+            key, (value, started + timeout, delta), timeout + stale
+        )
+    return value
+
+
+def get_or_fill(key, fill, timeout, cache='default'):
+    """Значение key из кеша; при промахе fill() вызывает один запрос.
+
+    timeout — срок свежести значения в секундах (None — бессрочно).
+    """
+    cache = caches[cache]
+    entry = _read(cache, key)
+    if entry is not None and not _expired(entry):
+        count('hit')
+        return entry[0]
+    config = settings.SINGLE_FLIGHT
+    lock = f'{key}:fill'
+    if cache.add(lock, 1, config['LOCK_TIMEOUT']):
+        try:
+            expired = entry is not None and _past_expiry(entry)
+            count('fill' if entry is None or expired else 'early_fill')
+            return _fill(cache, key, fill, timeout)
+        finally:
+            cache.delete(lock)
+    if entry is not None:
+        count('stale' if _past_expiry(entry) else 'hit')
+        return entry[0]
+    deadline = time.monotonic() + config['WAIT']
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_STEP)
+        entry = _read(cache, key)
+        if entry is not None:
+            count('waited')
+            return entry[0]
+    count('wait_timeout')
+    return _fill(cache, key, fill, timeout)
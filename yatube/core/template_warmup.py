@@ -0,0 +1,72 @@
+"""Компиляция всех шаблонов заранее.
+
+С кешируемым загрузчиком (TEMPLATE_CACHE) шаблон читается и
+разбирается при первой отрисовке в процессе, и первые запросы после
+запуска платят за это. warm() загружает все шаблоны из каталогов
+загрузчиков, так что они попадают в кеш до первого запроса, а заодно
+находит шаблоны с ошибками.
+"""
+import os
+import time
+
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+
+
+def _file_loaders(loaders):
+    for loader in loaders:
+        if isinstance(loader, CachedLoader):
+            yield from _file_loaders(loader.loaders)
+        elif hasattr(loader, 'get_dirs'):
+            yield loader
+
+
+def template_names(engine):
+    """Имена всех шаблонов в каталогах загрузчиков движка."""
+    names = set()
+    for loader in _file_loaders(engine.template_loaders):
+        for directory in loader.get_dirs():
+            for root, _, files in os.walk(directory):
+                for file in files:
+                    path = os.path.relpath(
+                        os.path.join(root, file), directory
+                    )
+                    names.add(path.replace(os.sep, '/'))
+    return sorted(names)
+
+
+def is_cached(engine):
+    return any(
+        isinstance(loader, CachedLoader) for loader in engine.template_loaders
+    )
+
+
+def warm(cached_only=False):
+    """Компилирует шаблоны движков Django.
+
+    {'templates': число, 'errors': {имя: ошибка}, 'seconds': время}.
+    С cached_only движки без кешируемого загрузчика пропускаются:
+    прогрев им ничего не даёт.
+    """
+    started = time.perf_counter()
+    compiled = 0
+    errors = {}
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        engine = backend.engine
+        if cached_only and not is_cached(engine):
+            continue
+        for name in template_names(engine):
+            try:
+                engine.get_template(name)
+            except (TemplateSyntaxError, UnicodeDecodeError) as error:
+                errors[name] = str(error)
+            else:
+                compiled += 1
+    return {
+        'templates': compiled,
+        'errors': errors,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,46 @@
+"""Номера страниц окном: первая, последняя и соседи текущей.
+
+    {% load pagination %}
+    {% page_window page_obj as window %}
+    {% for number in window %}
+      {% if number %}<a href="{% page_url number %}">{{ number }}</a>
+      {% else %}…{% endif %}
+    {% endfor %}
+
+Ссылок не больше 2 * neighbors + 5 при любом числе страниц.
+"""
+from django import template
+
+register = template.Library()
+
+
+def window(number, num_pages, neighbors=2):
+    """Номера страниц для ссылок; None — пропуск («…»)."""
+    shown = {1, num_pages} | set(range(
+        max(number - neighbors, 1), min(number + neighbors, num_pages) + 1
+    ))
+    result = []
+    previous = 0
+    for page in sorted(shown):
+        if page - previous == 2:
+            # Пропуск из одной страницы короче показать номером.
+            result.append(page - 1)
+        elif page - previous > 2:
+            result.append(None)
+        result.append(page)
+        previous = page
+    return result
+
+
+@register.simple_tag
+def page_window(page, neighbors=2):
+    return window(page.number, page.paginator.num_pages, neighbors)
+
+
+@register.simple_tag(takes_context=True)
+def page_url(context, number):
+    """Адрес страницы number с остальными параметрами запроса."""
+    query = context['request'].GET.copy()
+    query.pop('cursor', None)
+    query['page'] = number
+    return f'?{query.urlencode()}'
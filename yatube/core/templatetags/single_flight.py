@@ -0,0 +1,64 @@
+"""{% cache %} с заполнением одним запросом (см. core.single_flight).
+
+Синтаксис и ключи те же, что у встроенного тега:
+
+    {% load single_flight %}
+    {% cache 600 index_page version page %}...{% endcache %}
+"""
+from django import template
+from django.conf import settings
+from django.core.cache.utils import make_template_fragment_key
+from django.template import TemplateSyntaxError, VariableDoesNotExist
+from django.templatetags import cache as django_cache
+
+from .. import single_flight
+
+register = template.Library()
+
+
+class SingleFlightCacheNode(django_cache.CacheNode):
+    def resolve(self, var, context):
+        try:
+            return var.resolve(context)
+        except VariableDoesNotExist:
+            raise TemplateSyntaxError(
+                f'"cache" tag got an unknown variable: {var.var!r}'
+            )
+
+    def render(self, context):
+        expire_time = self.resolve(self.expire_time_var, context)
+        if expire_time is not None:
+            try:
+                expire_time = int(expire_time)
+            except (ValueError, TypeError):
+                raise TemplateSyntaxError(
+                    f'"cache" tag got a non-integer timeout value: '
+                    f'{expire_time!r}'
+                )
+        if self.cache_name:
+            cache_name = self.resolve(self.cache_name, context)
+            if cache_name not in settings.CACHES:
+                raise TemplateSyntaxError(
+                    f'Invalid cache name specified for cache tag: '
+                    f'{cache_name!r}'
+                )
+        elif 'template_fragments' in settings.CACHES:
+            cache_name = 'template_fragments'
+        else:
+            cache_name = 'default'
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        return single_flight.get_or_fill(
+            make_template_fragment_key(self.fragment_name, vary_on),
+            lambda: self.nodelist.render(context),
+            expire_time,
+            cache=cache_name,
+        )
+
+
+@register.tag('cache')
+def do_cache(parser, token):
+    node = django_cache.do_cache(parser, token)
+    return SingleFlightCacheNode(
+        node.nodelist, node.expire_time_var, node.fragment_name,
+        node.vary_on, node.cache_name,
+    )
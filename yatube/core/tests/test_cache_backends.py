@@ -0,0 +1,162 @@
+import subprocess
+import sys
+import threading
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from ..cache_backends import cache_config
+from ..cache_backends.resp import RespCache
+from ..cache_backends.server import RespServer
+
+# Второй «воркер» — отдельный процесс со своим соединением.
+WORKER_SCRIPT = '''
+import sys
+from core.cache_backends.resp import RespCache
+cache = RespCache(sys.argv[1], {'KEY_PREFIX': 'test'})
+if sys.argv[2] == 'set':
+    cache.set('shared', 'из другого процесса')
+    cache.incr('version')
+else:
+    print(cache.get('version'))
+'''
+
+
+class CacheConfigTests(SimpleTestCase):
+    def test_backends_by_url(self):
+        """Адрес из окружения превращается в настройки CACHES."""
+        cases = (
+            ('locmem://', 'locmem.LocMemCache', ''),
+            ('file:///tmp/yatube', 'filebased.FileBasedCache',
+             '/tmp/yatube'),
+            ('memcached://a:11211,b:11211', 'memcached.MemcachedCache',
+             ['a:11211', 'b:11211']),
+            ('redis://cache:6380/2', 'resp.RespCache', 'cache:6380'),
+        )
+        for url, backend, location in cases:
+            with self.subTest(url=url):
+                config = cache_config(url, key_prefix='prod')
+                self.assertTrue(config['BACKEND'].endswith(backend))
+                self.assertEqual(config.get('LOCATION', ''), location)
+                self.assertEqual(config['KEY_PREFIX'], 'prod')
+        self.assertEqual(
+            cache_config('redis://cache:6380/2')['OPTIONS'], {'DB': 2}
+        )
+
+    def test_unknown_scheme(self):
+        with self.assertRaises(ValueError):
+            cache_config('mongodb://localhost')
+
+
+class RespCacheTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = RespServer(('127.0.0.1', 0))
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.cache = self.make_cache()
+        self.cache.clear()
+
+    def make_cache(self, prefix='test'):
+        return RespCache(
+            RespCacheTests.server.location, {'KEY_PREFIX': prefix}
+        )
+
+    def test_basic_operations(self):
+        cache = self.cache
+        self.assertIsNone(cache.get('missing'))
+        cache.set('key', {'posts': [1, 2]})
+        self.assertEqual(cache.get('key'), {'posts': [1, 2]})
+        self.assertFalse(cache.add('key', 'other'))
+        self.assertTrue(cache.add('new', 'value'))
+        cache.set_many({'a': 1, 'b': 'два'})
+        self.assertEqual(
+            cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': 'два'}
+        )
+        cache.delete_many(['a', 'b'])
+        self.assertFalse(cache.has_key('a'))
+
+    def test_incr(self):
+        self.cache.set('counter', 10)
+        self.assertEqual(self.cache.incr('counter', 5), 15)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+        self.assertFalse(self.cache.has_key('missing'))
+
+    def test_incr_single_command(self):
+        """Проверка ключа и увеличение — одна команда, без гонки с DEL."""
+        self.cache.set('counter', 1)
+        connection = self.cache._connection
+        with mock.patch.object(
+            connection, 'execute', wraps=connection.execute
+        ) as execute:
+            self.assertEqual(self.cache.incr('counter'), 2)
+            with self.assertRaises(ValueError):
+                self.cache.incr('missing')
+        self.assertEqual(execute.call_count, 2)
+        self.assertEqual(execute.call_args[0][0][0], 'EVAL')
+
+    def test_expiry(self):
+        self.cache.set('short', 'value', timeout=0.05)
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get('short'))
+        self.cache.set('no_timeout', 'value', timeout=0)
+        self.assertIsNone(self.cache.get('no_timeout'))
+
+    def test_key_prefix(self):
+        """Разные развёртывания не видят ключи друг друга."""
+        other = self.make_cache(prefix='staging')
+        self.cache.set('key', 'prod')
+        self.assertIsNone(other.get('key'))
+
+    def run_worker(self, action):
+        return subprocess.run(
+            [sys.executable, '-c', WORKER_SCRIPT,
+             RespCacheTests.server.location, action],
+            cwd=settings.BASE_DIR,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+
+    def test_shared_between_processes(self):
+        """Запись и инвалидация из другого процесса видны сразу."""
+        self.cache.set('version', 1)
+        self.run_worker('set')
+        self.assertEqual(self.cache.get('shared'), 'из другого процесса')
+        self.assertEqual(self.cache.get('version'), 2)
+        self.cache.incr('version')
+        self.assertEqual(self.run_worker('get'), '3')
+
+    def test_shared_between_threads(self):
+        """Потоки с общим экземпляром получают ответы на свои команды."""
+        errors = []
+
+        def worker(number):
+            try:
+                for step in range(200):
+                    value = f'{number}:{step}'
+                    self.cache.set(f'thread:{number}', value)
+                    if self.cache.get(f'thread:{number}') != value:
+                        errors.append(value)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [
+            threading.Thread(target=worker, args=(number,))
+            for number in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
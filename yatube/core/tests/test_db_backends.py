@@ -0,0 +1,144 @@
+import os
+import tempfile
+import threading
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+
+from ..db_backends import SQLITE_PRAGMAS, database_config
+from ..db_backends.sqlite3.base import ConnectionPool, pool_for
+
+
+class DatabaseConfigTests(SimpleTestCase):
+    def test_backends_by_url(self):
+        """Адрес из окружения превращается в настройки DATABASES."""
+        config = database_config('sqlite:///db.sqlite3', base_dir='/srv')
+        self.assertEqual(config['ENGINE'], 'core.db_backends.sqlite3')
+        self.assertEqual(config['NAME'], '/srv/db.sqlite3')
+        self.assertNotIn('POOL', config)
+        config = database_config(
+            'sqlite+pool:////var/db/yatube.db', base_dir='/srv',
+            conn_max_age=60, pool_size=4,
+        )
+        self.assertEqual(config['ENGINE'], 'core.db_backends.sqlite3')
+        self.assertEqual(config['NAME'], '/var/db/yatube.db')
+        self.assertEqual(config['CONN_MAX_AGE'], 60)
+        self.assertEqual(config['POOL'], {'SIZE': 4})
+        config = database_config('postgres://user:p%40ss@db:5433/yatube')
+        self.assertEqual(
+            {key: config[key] for key in
+             ('ENGINE', 'NAME', 'USER', 'PASSWORD', 'HOST', 'PORT')},
+            {
+                'ENGINE': 'django.db.backends.postgresql',
+                'NAME': 'yatube',
+                'USER': 'user',
+                'PASSWORD': 'p@ss',
+                'HOST': 'db',
+                'PORT': '5433',
+            },
+        )
+        with self.assertRaises(ValueError):
+            database_config('mysql://db/yatube')
+
+    def test_sqlite_options(self):
+        """PRAGMA по умолчанию меняются параметрами адреса."""
+        config = database_config('sqlite:///db.sqlite3')
+        self.assertEqual(config['PRAGMAS'], SQLITE_PRAGMAS)
+        self.assertEqual(config['TRANSACTION_MODE'], 'IMMEDIATE')
+        config = database_config(
+            'sqlite:///db.sqlite3?synchronous=full&transaction_mode=deferred'
+        )
+        self.assertEqual(config['PRAGMAS']['synchronous'], 'full')
+        self.assertEqual(config['TRANSACTION_MODE'], 'DEFERRED')
+        with self.assertRaises(ValueError):
+            database_config('sqlite:///db.sqlite3?synchronous=off;DROP')
+
+
+class PooledSqliteTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'pool.sqlite3')
+        self.handler = ConnectionHandler({DEFAULT_DB_ALIAS: dict(
+            database_config(f'sqlite+pool:///{self.name}', pool_size=2),
+        )})
+        self.pool = pool_for(self.name)
+        self.addCleanup(self.pool.close_all)
+
+    def request(self):
+        """Жизнь соединения в одном запросе, как в потоке сервера."""
+        connection = self.handler[DEFAULT_DB_ALIAS]
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        raw = connection.connection
+        connection.close()
+        return raw
+
+    def in_thread(self, function):
+        result = []
+        thread = threading.Thread(target=lambda: result.append(function()))
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def test_connection_reused_across_threads(self):
+        """Соединение, закрытое в одном потоке, достаётся другому."""
+        first = self.in_thread(self.request)
+        second = self.in_thread(self.request)
+        self.assertIs(first, second)
+        stats = self.pool.snapshot()
+        self.assertEqual((stats['created'], stats['reused']), (1, 1))
+
+    def test_broken_connection_is_discarded(self):
+        broken = self.request()
+        broken.close()
+        self.assertIsNot(self.request(), broken)
+        self.assertEqual(self.pool.snapshot()['discarded'], 1)
+
+    def test_open_transaction_is_rolled_back(self):
+        connection = self.handler[DEFAULT_DB_ALIAS]
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id integer)')
+        connection.set_autocommit(False)
+        with connection.cursor() as cursor:
+            cursor.execute('INSERT INTO item VALUES (1)')
+        connection.close()
+        with self.handler[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM item')
+            self.assertEqual(cursor.fetchone(), (0,))
+
+    def test_pragmas_and_immediate_transactions(self):
+        """Новое соединение настроено, транзакция сразу берёт запись."""
+        connection = self.handler[DEFAULT_DB_ALIAS]
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone(), ('wal',))
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone(), (1,))
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone(), (5000,))
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id integer)')
+        statements = []
+        connection.connection.set_trace_callback(statements.append)
+        # Так транзакцию открывает atomic(): BEGIN до первого чтения.
+        connection.set_autocommit(
+            False, force_begin_transaction_with_broken_autocommit=True
+        )
+        connection.rollback()
+        # Ручное отключение autocommit: BEGIN перед первой записью.
+        connection.set_autocommit(True)
+        connection.set_autocommit(False)
+        with connection.cursor() as cursor:
+            cursor.execute('INSERT INTO item VALUES (1)')
+        connection.rollback()
+        connection.set_autocommit(True)
+        self.assertEqual(statements[0], 'BEGIN IMMEDIATE')
+        self.assertIn('BEGIN IMMEDIATE', statements[2:])
+
+    def test_pool_size_is_bounded(self):
+        pool = ConnectionPool(size=1)
+        self.assertTrue(pool.checkin(object()))
+        self.assertFalse(pool.checkin(object()))
+        self.assertEqual(pool.snapshot()['overflow'], 1)
@@ -0,0 +1,130 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..instrumentation import _patch_cache, histograms, measure
+
+User = get_user_model()
+
+INSTRUMENTATION = {
+    'SAMPLE_RATE': 1.0,
+    'SERVER_TIMING': True,
+    'SLOW_REQUEST_MS': 10 ** 6,
+    'SLOW_QUERY_COUNT': 10 ** 6,
+}
+
+
+@override_settings(INSTRUMENTATION=INSTRUMENTATION)
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        histograms.reset()
+        self.client = Client()
+
+    def timing(self, response):
+        """Разбирает Server-Timing в словарь {метрика: параметры}."""
+        metrics = {}
+        for part in response['Server-Timing'].split(', '):
+            name, *params = part.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    def test_server_timing(self):
+        """Ответ содержит время SQL, кеша, шаблонов и общее."""
+        timing = self.timing(self.client.get(reverse('posts:index')))
+        self.assertEqual(
+            set(timing), {'db', 'cache', 'tpl', 'total'}
+        )
+        self.assertNotEqual(timing['db']['desc'], '"0 queries"')
+        self.assertGreater(float(timing['tpl']['dur']), 0)
+
+    def test_cache_hits_and_misses(self):
+        """Повторный запрос берёт фрагменты из кеша."""
+        first = self.timing(self.client.get(reverse('posts:index')))
+        second = self.timing(self.client.get(reverse('posts:index')))
+        self.assertNotIn(' 0 misses', first['cache']['desc'])
+        self.assertIn(' 0 misses', second['cache']['desc'])
+
+    def test_histograms(self):
+        """Замеры собираются по имени представления."""
+        for _ in range(3):
+            self.client.get(reverse('posts:index'))
+        stats = histograms.snapshot()['views']['posts:index']
+        self.assertEqual(stats['count'], 3)
+        self.assertEqual(sum(stats['duration_ms']['buckets'].values()), 3)
+        self.assertGreater(stats['mean_queries'], 0)
+
+    def test_template_breakdown(self):
+        """Время отрисовки считается по каждому шаблону, включая
+        базовый и подключаемые.
+        """
+        self.client.get(reverse('posts:index'))
+        templates = histograms.snapshot()['templates']
+        for name in ('posts/index.html', 'base.html',
+                     'includes/header.html', 'includes/paginator.html'):
+            with self.subTest(name=name):
+                self.assertEqual(templates[name]['renders'], 1)
+        index = templates['posts/index.html']
+        # Полное время index включает base.html, собственное — нет.
+        self.assertGreater(index['mean_ms'], index['mean_self_ms'])
+        self.assertGreaterEqual(
+            index['mean_ms'], templates['base.html']['mean_ms']
+        )
+
+    @override_settings(INSTRUMENTATION={
+        **INSTRUMENTATION, 'SLOW_QUERY_COUNT': 0
+    })
+    def test_slow_request_logged(self):
+        """Запросы сверх порогов попадают в лог."""
+        with self.assertLogs('core.instrumentation', 'WARNING') as logs:
+            self.client.get(reverse('posts:index'))
+        self.assertIn('posts:index', logs.output[0])
+        self.assertIn('.html', logs.output[0])
+        self.assertEqual(
+            histograms.snapshot()['views']['posts:index']['slow'], 1
+        )
+
+    @override_settings(INSTRUMENTATION={
+        **INSTRUMENTATION, 'SAMPLE_RATE': 0
+    })
+    def test_sampling_off(self):
+        """При нулевой доле запросы не замеряются."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertEqual(histograms.snapshot()['views'], {})
+
+    def test_metrics_for_staff_only(self):
+        """Страница метрик доступна только персоналу."""
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(
+            User.objects.create_user(username='user')
+        )
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(
+            User.objects.create_user(username='admin', is_staff=True)
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('views', response.json())
+
+
+class InheritedGetCache(LocMemCache):
+    """Бэкенд без своего get, как MemcachedCache."""
+
+
+class CacheHookTests(TestCase):
+    def test_inherited_get(self):
+        """Хук не подменяет унаследованный get базовым BaseCache.get."""
+        _patch_cache()
+        _patch_cache()
+        backend = InheritedGetCache('inherited', {})
+        backend.set('key', 'value')
+        self.assertEqual(backend.get('key'), 'value')
+        with measure() as metrics:
+            self.assertEqual(backend.get('key'), 'value')
+            self.assertIsNone(backend.get('missing'))
+            self.assertEqual(backend.get_many(['key']), {'key': 'value'})
+        self.assertEqual((metrics.cache_hits, metrics.cache_misses), (2, 1))
@@ -0,0 +1,33 @@
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase
+
+from ..templatetags.pagination import window
+
+
+class PageWindowTests(SimpleTestCase):
+    def test_window(self):
+        """Первая, последняя и соседи текущей; пропуски — None."""
+        cases = (
+            ((1, 1), [1]),
+            ((3, 5), [1, 2, 3, 4, 5]),
+            ((1, 5000), [1, 2, 3, None, 5000]),
+            ((4, 5000), [1, 2, 3, 4, 5, 6, None, 5000]),
+            ((2500, 5000), [1, None, 2498, 2499, 2500, 2501, 2502, None,
+                            5000]),
+            ((5000, 5000), [1, None, 4998, 4999, 5000]),
+        )
+        for (number, num_pages), expected in cases:
+            with self.subTest(number=number, num_pages=num_pages):
+                self.assertEqual(window(number, num_pages), expected)
+
+    def test_size_does_not_grow(self):
+        for num_pages in (10, 1000, 10 ** 6):
+            self.assertLessEqual(len(window(num_pages // 2, num_pages)), 9)
+
+    def test_page_url_keeps_query(self):
+        """Ссылка сохраняет параметры запроса и убирает курсор."""
+        request = RequestFactory().get('/', {'q': 'лес', 'cursor': 'x'})
+        rendered = Template(
+            '{% load pagination %}{% page_url 3 %}'
+        ).render(Context({'request': request}))
+        self.assertEqual(rendered, '?q=%D0%BB%D0%B5%D1%81&amp;page=3')
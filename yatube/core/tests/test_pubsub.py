@@ -0,0 +1,112 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from ..cache_backends.server import RespServer
+from ..pubsub import CacheBroker, LocalBroker
+
+
+class BrokerTestsMixin:
+    def make_broker(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        cache.clear()
+        self.broker = self.make_broker()
+
+    def test_wait_returns_matching_events(self):
+        """Подписчик получает только события своих каналов."""
+        start = self.broker.last_id()
+        self.broker.publish(['posts', 'group:1'], {'id': 1})
+        self.broker.publish(['posts', 'group:2'], {'id': 2})
+        last, events = self.broker.wait(['group:2'], start, timeout=0)
+        self.assertEqual(events, [(start + 2, {'id': 2})])
+        self.assertEqual(last, start + 2)
+        _, events = self.broker.wait(['posts'], start, timeout=0)
+        self.assertEqual([data['id'] for _, data in events], [1, 2])
+
+    def test_wait_times_out(self):
+        last = self.broker.last_id()
+        started = time.monotonic()
+        self.assertEqual(
+            self.broker.wait(['posts'], last, timeout=0.1), (last, [])
+        )
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
+
+    def test_wait_wakes_on_publish(self):
+        """Ждущий поток просыпается от публикации из другого потока."""
+        last = self.broker.last_id()
+        timer = threading.Timer(
+            0.05, self.broker.publish, (['posts'], {'id': 7})
+        )
+        timer.start()
+        started = time.monotonic()
+        _, events = self.broker.wait(['posts'], last, timeout=5)
+        timer.join()
+        self.assertEqual([data for _, data in events], [{'id': 7}])
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_unknown_cursor_starts_from_now(self):
+        """Номер из будущего (перезапуск брокера) не теряет события."""
+        last = self.broker.last_id()
+        self.broker.publish(['posts'], {'id': 1})
+        _, events = self.broker.wait(['posts'], last + 100, timeout=0)
+        self.assertEqual(events, [])
+        _, events = self.broker.wait(['posts'], last + 1, timeout=0)
+        self.assertEqual(events, [])
+
+
+class LocalBrokerTests(BrokerTestsMixin, SimpleTestCase):
+    def make_broker(self):
+        return LocalBroker()
+
+    def test_history_is_bounded(self):
+        broker = LocalBroker(history=2)
+        for i in range(5):
+            broker.publish(['posts'], {'id': i})
+        _, events = broker.wait(['posts'], 0, timeout=0)
+        self.assertEqual([data['id'] for _, data in events], [3, 4])
+
+
+class CacheBrokerTests(BrokerTestsMixin, SimpleTestCase):
+    def make_broker(self):
+        return CacheBroker(poll_interval=0.01)
+
+
+class SharedCacheBrokerTests(SimpleTestCase):
+    """Два процесса-воркера с общим сервером кеша видят события друг друга."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = RespServer(('127.0.0.1', 0))
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        caches = dict(settings.CACHES)
+        caches['pubsub'] = {
+            'BACKEND': 'core.cache_backends.resp.RespCache',
+            'LOCATION': self.server.location,
+            'KEY_PREFIX': 'ps',
+        }
+        override = self.settings(CACHES=caches)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def make_broker(self):
+        return CacheBroker(cache='pubsub', poll_interval=0.01)
+
+    def test_events_cross_workers(self):
+        publisher, subscriber = self.make_broker(), self.make_broker()
+        last = subscriber.last_id()
+        publisher.publish(['author:1'], {'id': 1})
+        _, events = subscriber.wait(['author:1'], last, timeout=1)
+        self.assertEqual([data for _, data in events], [{'id': 1}])
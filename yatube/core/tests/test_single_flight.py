@@ -0,0 +1,128 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+
+from .. import single_flight
+from ..single_flight import get_or_fill
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        single_flight.stats.clear()
+        self.calls = 0
+
+    def fill(self, value='новое', delay=0):
+        def compute():
+            self.calls += 1
+            time.sleep(delay)
+            return value
+        return compute
+
+    def test_filled_once(self):
+        self.assertEqual(get_or_fill('key', self.fill(), 60), 'новое')
+        self.assertEqual(get_or_fill('key', self.fill('другое'), 60), 'новое')
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(single_flight.snapshot()['hit'], 1)
+
+    def test_concurrent_miss_computes_once(self):
+        """Одновременный промах считает один запрос, остальные ждут."""
+        fill = self.fill(delay=0.2)
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(get_or_fill('key', fill, 60))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['новое'] * 8)
+        self.assertEqual(self.calls, 1)
+        snapshot = single_flight.snapshot()
+        self.assertEqual(snapshot['waited'], 7)
+        self.assertEqual(snapshot['saved'], 7)
+
+    def test_stale_value_while_other_fills(self):
+        """Истёкшее значение отдаётся, пока его пересчитывает другой."""
+        cache.set('key', ('старое', time.time() - 1, 0.01), 60)
+        cache.add('key:fill', 1)
+        self.assertEqual(get_or_fill('key', self.fill(), 60), 'старое')
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(single_flight.snapshot()['stale'], 1)
+        cache.delete('key:fill')
+        self.assertEqual(get_or_fill('key', self.fill(), 60), 'новое')
+        self.assertEqual(single_flight.snapshot()['fill'], 1)
+
+    @override_settings(SINGLE_FLIGHT=dict(
+        STALE=60, WAIT=0.05, LOCK_TIMEOUT=30, BETA=1.0
+    ))
+    def test_wait_timeout_computes(self):
+        cache.add('key:fill', 1)
+        self.assertEqual(get_or_fill('key', self.fill(), 60), 'новое')
+        self.assertEqual(single_flight.snapshot()['wait_timeout'], 1)
+
+    @override_settings(SINGLE_FLIGHT=dict(
+        STALE=60, WAIT=2.0, LOCK_TIMEOUT=30, BETA=1e9
+    ))
+    def test_early_refresh(self):
+        """Долго считаемое значение обновляется до истечения."""
+        cache.set('key', ('старое', time.time() + 50, 1.0), 60)
+        self.assertEqual(get_or_fill('key', self.fill(), 60), 'новое')
+        self.assertEqual(single_flight.snapshot()['early_fill'], 1)
+
+    def test_foreign_value_is_miss(self):
+        """Значение старого формата под тем же ключом — промах."""
+        for value in ('<p>фрагмент</p>', ('a', 'b', 'c'), None):
+            with self.subTest(value=value):
+                cache.set('key', value, 60)
+                self.assertEqual(get_or_fill('key', self.fill(), 60), 'новое')
+                cache.delete('key')
+        key = make_template_fragment_key('fragment', ['a'])
+        cache.set(key, 'строка встроенного тега')
+        template = Template(
+            '{% load single_flight %}'
+            '{% cache 60 fragment name %}{{ value }}{% endcache %}'
+        )
+        self.assertEqual(
+            template.render(Context({'name': 'a', 'value': 'новое'})),
+            'новое',
+        )
+
+    def test_no_timeout(self):
+        """timeout=None — значение без срока, как у {% cache None %}."""
+        self.assertEqual(get_or_fill('key', self.fill(), None), 'новое')
+        self.assertEqual(
+            get_or_fill('key', self.fill('другое'), None), 'новое'
+        )
+        self.assertEqual(self.calls, 1)
+        template = Template(
+            '{% load single_flight %}'
+            '{% cache None fragment name %}{{ value }}{% endcache %}'
+        )
+        for value in ('первое', 'второе'):
+            self.assertEqual(
+                template.render(Context({'name': 'a', 'value': value})),
+                'первое',
+            )
+
+    def test_template_tag(self):
+        """Тег совместим со встроенным {% cache %} по синтаксису и ключам."""
+        template = Template(
+            '{% load single_flight %}'
+            '{% cache 60 fragment name %}{{ value }}{% endcache %}'
+        )
+
+        def render(value):
+            return template.render(Context({'name': 'a', 'value': value}))
+
+        self.assertEqual(render('первое'), 'первое')
+        self.assertEqual(render('второе'), 'первое')
+        cache.delete(make_template_fragment_key('fragment', ['a']))
+        self.assertEqual(render('третье'), 'третье')
@@ -0,0 +1,51 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from ..template_warmup import template_names, warm
+
+FILE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+def templates_with(loaders):
+    return [{
+        **settings.TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {**settings.TEMPLATES[0]['OPTIONS'], 'loaders': loaders},
+    }]
+
+
+class TemplateWarmupTests(SimpleTestCase):
+    def test_template_names(self):
+        """Находятся шаблоны проекта и приложений."""
+        names = template_names(engines['django'].engine)
+        for name in ('base.html', 'includes/paginator.html',
+                     'posts/comment.html', 'admin/base.html'):
+            self.assertIn(name, names)
+
+    @override_settings(TEMPLATES=templates_with(
+        [('django.template.loaders.cached.Loader', FILE_LOADERS)]
+    ))
+    def test_warm_fills_cached_loader(self):
+        result = warm(cached_only=True)
+        self.assertEqual(result['errors'], {})
+        self.assertGreater(result['templates'], 0)
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertIn(
+            loader.cache_key('posts/index.html'), loader.get_template_cache
+        )
+
+    @override_settings(TEMPLATES=templates_with(FILE_LOADERS))
+    def test_cached_only_skips_uncached_engines(self):
+        self.assertEqual(warm(cached_only=True)['templates'], 0)
+
+    def test_command(self):
+        output = StringIO()
+        call_command('warm_templates', stdout=output)
+        self.assertIn('Скомпилировано шаблонов', output.getvalue())
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ..write_queue import WriteQueue, serialized_writes, write_queue
+
+
+class WriteQueueTests(SimpleTestCase):
+    def test_writes_in_arrival_order(self):
+        """Ждущие записи выполняются по одной в порядке прихода."""
+        queue = WriteQueue()
+        order = []
+        queue.acquire()
+        threads = []
+        for number in range(5):
+            thread = threading.Thread(
+                target=self.write, args=(queue, order, number)
+            )
+            thread.start()
+            threads.append(thread)
+            # Следующий поток встаёт в очередь после предыдущего.
+            while queue.next_ticket != number + 2:
+                time.sleep(0.001)
+        queue.release()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, list(range(5)))
+        snapshot = queue.snapshot()
+        self.assertEqual(snapshot['writes'], 6)
+        self.assertEqual(snapshot['waited'], 5)
+        self.assertEqual(snapshot['queued'], 0)
+
+    @staticmethod
+    def write(queue, order, number):
+        with queue:
+            order.append(number)
+
+    def test_reentrant(self):
+        queue = WriteQueue()
+        with queue:
+            with queue:
+                pass
+            self.assertEqual(queue.owner, threading.get_ident())
+        self.assertIsNone(queue.owner)
+        with self.assertRaises(RuntimeError):
+            queue.release()
+
+    def test_decorator_queues_only_writes(self):
+        """Очередь включается настройкой и только для изменяющих
+        запросов.
+        """
+        @serialized_writes
+        def view(request):
+            return write_queue.owner == threading.get_ident()
+
+        factory = RequestFactory()
+        with override_settings(SQLITE_WRITE_QUEUE=True):
+            self.assertTrue(view(factory.post('/')))
+            self.assertFalse(view(factory.get('/')))
+        with override_settings(SQLITE_WRITE_QUEUE=False):
+            self.assertFalse(view(factory.post('/')))
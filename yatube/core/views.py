@@ -1,6 +1,14 @@
 from http import HTTPStatus
 
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.shortcuts import render
+from django.views.decorators.cache import never_cache
+
+from . import page_cache, single_flight
+from .db_backends.sqlite3.base import pool_stats
+from .instrumentation import histograms
+from .write_queue import write_queue
 
 
 def page_not_found(request, exception):
@@ -26,3 +34,24 @@ def permission_denied(request, exception):
         request, 'core/403.html',
         {'path': request.path}, status=HTTPStatus.FORBIDDEN
     )
+
+
+@never_cache
+@staff_member_required
+def metrics(request):
+    """Гистограммы замеров запросов, пулы соединений с базой, очередь
+    записей, кеш страниц и заполнения кеша этого процесса (только для
+    админов).
+    """
+    if request.method == 'POST':
+        histograms.reset()
+    return JsonResponse(
+        dict(
+            histograms.snapshot(),
+            db_pools=pool_stats(),
+            write_queue=write_queue.snapshot(),
+            page_cache=page_cache.snapshot(),
+            single_flight=single_flight.snapshot(),
+        ),
+        json_dumps_params={'ensure_ascii': False},
+    )
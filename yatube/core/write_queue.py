@@ -0,0 +1,99 @@
+"""Очередь записей в базу внутри процесса.
+
+SQLite пускает одного писателя за раз: остальные ждут busy_timeout и
+при долгой очереди получают «database is locked». Если включить
+SQLITE_WRITE_QUEUE, изменяющие запросы представлений с декоратором
+serialized_writes выполняются по одному в порядке прихода, а ждут
+в процессе, не занимая базу. Читающие запросы очередь не трогает.
+"""
+import collections
+import functools
+import threading
+import time
+
+from django.conf import settings
+
+# Методы, запросы с которыми встают в очередь.
+WRITE_METHODS = frozenset(('POST', 'PUT', 'PATCH', 'DELETE'))
+
+
+class WriteQueue:
+    """Блокировка со справедливым порядком (FIFO) и счётчиками.
+
+    Повторный вход из того же потока не ждёт, так что вложенные
+    представления с serialized_writes безопасны.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.next_ticket = 0
+        self.serving = 0
+        self.owner = None
+        self.depth = 0
+        self.stats = collections.Counter()
+        self.max_wait = 0.0
+
+    def acquire(self):
+        me = threading.get_ident()
+        with self.condition:
+            if self.owner == me:
+                self.depth += 1
+                return
+            ticket = self.next_ticket
+            self.next_ticket += 1
+            started = time.monotonic()
+            if ticket != self.serving:
+                self.stats['waited'] += 1
+                self.condition.wait_for(lambda: self.serving == ticket)
+            waited = time.monotonic() - started
+            self.max_wait = max(self.max_wait, waited)
+            self.stats['wait_ms'] += round(waited * 1000)
+            self.stats['writes'] += 1
+            self.owner = me
+            self.depth = 1
+
+    def release(self):
+        with self.condition:
+            if self.owner != threading.get_ident():
+                raise RuntimeError('Очередь записей занята другим потоком')
+            self.depth -= 1
+            if self.depth:
+                return
+            self.owner = None
+            self.serving += 1
+            self.condition.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def snapshot(self):
+        with self.condition:
+            return dict(
+                self.stats,
+                queued=self.next_ticket - self.serving,
+                max_wait_ms=round(self.max_wait * 1000, 3),
+            )
+
+
+write_queue = WriteQueue()
+
+
+def serialized_writes(view):
+    """Ставит изменяющие запросы к view в очередь записей процесса.
+
+    Декоратор должен быть снаружи transaction.atomic: очередь
+    освобождается после фиксации транзакции.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not (
+            settings.SQLITE_WRITE_QUEUE and request.method in WRITE_METHODS
+        ):
+            return view(request, *args, **kwargs)
+        with write_queue:
+            return view(request, *args, **kwargs)
+    return wrapper
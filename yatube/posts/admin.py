@@ -1,6 +1,8 @@
 from django.contrib import admin
 
+from .export import streaming_response
 from .models import Group, Post
+from .search import search_posts
 
 
 @admin.register(Post)
@@ -14,6 +16,23 @@ class PostAdmin(admin.ModelAdmin):
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
+    actions = ('export_jsonl', 'export_csv')
+
+    def export_jsonl(self, request, queryset):
+        return streaming_response('posts', 'jsonl', queryset)
+
+    export_jsonl.short_description = 'Выгрузить в JSON Lines'
+
+    def export_csv(self, request, queryset):
+        return streaming_response('posts', 'csv', queryset)
+
+    export_csv.short_description = 'Выгрузить в CSV'
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск в админке идёт по полнотекстовому индексу."""
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(pk__in=search_posts(search_term)), False
 
 
 @admin.register(Group)
@@ -0,0 +1,359 @@
+"""Read-only JSON API лент и постов (версия 1).
+
+Ответы поддерживают условные запросы. ETag собирается из версий кеша
+областей (лента, комментарии, подписки читателя), id и даты последнего
+поста ленты и курсора страницы; Last-Modified — из даты последнего
+поста и времени последнего изменения этих областей. Оба значения
+считаются без выборки строк ленты: один запрос по индексу за последней
+строкой и чтение версий из кеша. Поэтому
+неизменившаяся лента отвечает 304 без выборки и сериализации постов.
+
+Для обновления уже показанной ленты есть опрос .../posts/new/: он отдаёт
+только посты новее известного клиенту. О появлении новых постов
+сообщают .../posts/events/ (server-sent events) и .../posts/events/poll/
+(long polling для серверов, где держать поток накладно).
+"""
+import hashlib
+import json
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import condition, require_safe
+
+from core.pubsub import broker
+
+from . import cache, live
+from .models import Group, Post, User
+from .timeline import timeline_posts
+from .utils import POSTS_ON_THE_PAGE, CursorPaginator
+
+# Сколько новых постов отдаёт один опрос ленты.
+NEW_POSTS_LIMIT: int = 50
+
+
+def post_json(post):
+    """Пост в виде словаря для ответа API."""
+    return {
+        'id': post.pk,
+        'text': post.text,
+        'pub_date': post.pub_date.isoformat(),
+        'author': {
+            'username': post.author.username,
+            'full_name': post.author.get_full_name(),
+        },
+        'group': post.group and {
+            'slug': post.group.slug,
+            'title': post.group.title,
+        },
+        'image': post.image.url if post.image else None,
+        'thumbnails': post.thumbnail_urls,
+        'comments_count': post.comments_count,
+        'url': reverse('posts:post_detail', args=(post.pk,)),
+        'api_url': reverse('api:post', args=(post.pk,)),
+        'comments_url': reverse('posts:comments', args=(post.pk,)),
+    }
+
+
+def feed_queryset(request, feed, **kwargs):
+    """Посты ленты или None, если лента недоступна."""
+    if feed == 'index':
+        return Post.objects.all()
+    if feed == 'group':
+        return Post.objects.filter(group__slug=kwargs['slug'])
+    if feed == 'profile':
+        return Post.objects.filter(author__username=kwargs['username'])
+    if request.user.is_authenticated:
+        return timeline_posts(request.user)
+    return None
+
+
+def _latest(request, queryset):
+    """(pub_date, id) самого нового поста — одна строка по индексу.
+
+    Запоминается в запросе: её читают и ETag, и Last-Modified.
+    """
+    if not hasattr(request, '_api_latest'):
+        request._api_latest = queryset.order_by(
+            '-pub_date', '-pk'
+        ).values_list('pub_date', 'pk').first()
+    return request._api_latest
+
+
+def _etag(*parts):
+    raw = '|'.join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _feed_scopes(request, feed):
+    """Области кеша, от которых зависит ответ ленты."""
+    scopes = [cache.FEED_SCOPE, cache.COMMENTS_SCOPE]
+    if feed == 'follow':
+        scopes.append(cache.timeline_scope(request.user.pk))
+    return scopes
+
+
+def feed_etag(request, feed, **kwargs):
+    queryset = feed_queryset(request, feed, **kwargs)
+    if queryset is None:
+        return None
+    return _etag(
+        'v1', feed, sorted(kwargs.items()),
+        request.user.pk if feed == 'follow' else '',
+        *(cache.version(scope) for scope in _feed_scopes(request, feed)),
+        _latest(request, queryset),
+        request.GET.get('cursor', ''),
+    )
+
+
+def feed_last_modified(request, feed, **kwargs):
+    queryset = feed_queryset(request, feed, **kwargs)
+    if queryset is None:
+        return None
+    changed = max(
+        cache.changed_at(scope) for scope in _feed_scopes(request, feed)
+    )
+    latest = _latest(request, queryset)
+    return max(changed, latest[0]) if latest else changed
+
+
+def _page_url(request, cursor):
+    if not cursor:
+        return None
+    return request.build_absolute_uri(f'{request.path}?cursor={cursor}')
+
+
+def _poll_url(request, path, pub_date, pk):
+    """Адрес опроса новых постов после поста (pub_date, pk)."""
+    query = {'since': pub_date.isoformat()}
+    if pk is not None:
+        query['since_id'] = pk
+    query = urlencode(query)
+    return request.build_absolute_uri(f'{path}?{query}')
+
+
+def _unauthorized():
+    return JsonResponse({'detail': 'Нужно войти на сайт.'}, status=401)
+
+
+def _existing_feed(request, feed, **kwargs):
+    """Посты ленты; 404, если нет группы или автора."""
+    if feed == 'group':
+        get_object_or_404(Group, slug=kwargs['slug'])
+    if feed == 'profile':
+        get_object_or_404(User, username=kwargs['username'])
+    return feed_queryset(request, feed, **kwargs)
+
+
+@require_safe
+@condition(etag_func=feed_etag, last_modified_func=feed_last_modified)
+def feed(request, feed, **kwargs):
+    """Страница ленты: index, group, profile или follow."""
+    queryset = _existing_feed(request, feed, **kwargs)
+    if queryset is None:
+        return _unauthorized()
+    page = CursorPaginator(
+        queryset.for_feed(), POSTS_ON_THE_PAGE
+    ).cursor_page(request.GET.get('cursor'))
+    new_posts_url = None
+    if page.object_list and not page.has_previous():
+        newest = page.object_list[0]
+        new_posts_url = _poll_url(
+            request, f'{request.path}new/', newest.pub_date, newest.pk
+        )
+    return JsonResponse({
+        'results': [post_json(post) for post in page],
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+        'next': _page_url(request, page.next_cursor),
+        'previous': _page_url(request, page.previous_cursor),
+        'new_posts': new_posts_url,
+    })
+
+
+def _since(request):
+    """Позиция (pub_date, id) из ?since=...&since_id=... или None.
+
+    since — дата самого нового поста у клиента, since_id — его id:
+    он различает посты с одинаковой датой и может отсутствовать.
+    """
+    try:
+        since = parse_datetime(request.GET.get('since', ''))
+    except ValueError:
+        # Формат верный, но даты нет: 2020-13-01T00:00.
+        return None
+    since_id = request.GET.get('since_id', '')
+    if since is None or since_id and not since_id.isdigit():
+        return None
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since, int(since_id) if since_id else None
+
+
+@require_safe
+def new_posts(request, feed, **kwargs):
+    """Посты ленты новее since, не больше NEW_POSTS_LIMIT.
+
+    Выборка идёт по индексу ленты от самого нового поста вниз до since,
+    поэтому пустой опрос стоит одного короткого запроса. Если новых
+    постов больше лимита, отдаются самые новые и truncated: клиенту
+    проще перечитать первую страницу ленты.
+    """
+    queryset = _existing_feed(request, feed, **kwargs)
+    if queryset is None:
+        return _unauthorized()
+    since = _since(request)
+    if since is None:
+        return JsonResponse(
+            {'detail': 'Нужен параметр since (ISO 8601) и, по желанию, '
+                       'since_id.'},
+            status=400,
+        )
+    pub_date, pk = since
+    # Отдельная граница pub_date >= since даёт планировщику диапазон
+    # индекса; условие с OR само по себе читается полным проходом.
+    newer = queryset.filter(pub_date__gte=pub_date)
+    if pk is None:
+        newer = newer.filter(pub_date__gt=pub_date)
+    else:
+        newer = newer.filter(
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+        )
+    posts = list(
+        newer.for_feed().order_by(
+            '-pub_date', '-pk'
+        )[:NEW_POSTS_LIMIT + 1]
+    )
+    truncated = len(posts) > NEW_POSTS_LIMIT
+    posts = posts[:NEW_POSTS_LIMIT]
+    if posts:
+        pub_date, pk = posts[0].pub_date, posts[0].pk
+    return JsonResponse({
+        'results': [post_json(post) for post in posts],
+        'truncated': truncated,
+        'next': _poll_url(request, request.path, pub_date, pk),
+    })
+
+
+def _pub_date(request, post_id):
+    """Дата поста (заодно проверка, что он есть), одна на запрос."""
+    if not hasattr(request, '_api_pub_date'):
+        request._api_pub_date = Post.objects.filter(
+            pk=post_id
+        ).values_list('pub_date', flat=True).first()
+    return request._api_pub_date
+
+
+def post_etag(request, post_id):
+    pub_date = _pub_date(request, post_id)
+    if pub_date is None:
+        return None
+    return _etag(
+        'v1', 'post', post_id, pub_date,
+        cache.version(cache.FEED_SCOPE),
+        cache.version(cache.post_scope(post_id)),
+    )
+
+
+def post_last_modified(request, post_id):
+    pub_date = _pub_date(request, post_id)
+    if pub_date is None:
+        return None
+    return max(
+        pub_date,
+        cache.changed_at(cache.FEED_SCOPE),
+        cache.changed_at(cache.post_scope(post_id)),
+    )
+
+
+@require_safe
+@condition(etag_func=post_etag, last_modified_func=post_last_modified)
+def post_detail(request, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), pk=post_id
+    )
+    return JsonResponse(post_json(post))
+
+
+def _event_id(value):
+    return int(value) if value and value.isdigit() else None
+
+
+def _sse(event_id, data):
+    payload = json.dumps(data, ensure_ascii=False)
+    return f'id: {event_id}\nevent: post\ndata: {payload}\n\n'
+
+
+def _stream(channels, after):
+    """Поток SSE: события каналов и комментарии-пинги.
+
+    Поток закрывается через STREAM_TIMEOUT секунд, браузер
+    переподключается сам и присылает Last-Event-ID.
+    """
+    options = settings.LIVE_EVENTS
+    deadline = time.monotonic() + options['STREAM_TIMEOUT']
+    yield f'retry: {options["RETRY_MS"]}\n\n'
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        after, events = broker().wait(
+            channels, after, min(options['HEARTBEAT'], remaining)
+        )
+        if not events:
+            yield ': ping\n\n'
+        for event_id, data in events:
+            yield _sse(event_id, data)
+
+
+@require_safe
+def events(request, feed, **kwargs):
+    """Server-sent events о новых постах ленты."""
+    channels = live.feed_channels(request, feed, **kwargs)
+    if channels is None:
+        return _unauthorized()
+    after = _event_id(request.META.get('HTTP_LAST_EVENT_ID'))
+    if after is None:
+        after = broker().last_id()
+    live.release_connection()
+    response = StreamingHttpResponse(
+        _stream(channels, after), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Прокси (nginx) не должен копить поток в буфере.
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_safe
+def events_poll(request, feed, **kwargs):
+    """Long polling: ждёт событий ленты новее ?after= до POLL_TIMEOUT."""
+    channels = live.feed_channels(request, feed, **kwargs)
+    if channels is None:
+        return _unauthorized()
+    after = _event_id(request.GET.get('after'))
+    if after is None:
+        # Первый запрос только сообщает, с какого номера ждать.
+        last, found = broker().last_id(), []
+    else:
+        live.release_connection()
+        last, found = broker().wait(
+            channels, after, settings.LIVE_EVENTS['POLL_TIMEOUT']
+        )
+    response = JsonResponse({
+        'events': [
+            dict(data, event_id=event_id) for event_id, data in found
+        ],
+        'last_id': last,
+        'next': request.build_absolute_uri(
+            f'{request.path}?{urlencode({"after": last})}'
+        ),
+    })
+    response['Cache-Control'] = 'no-cache'
+    return response
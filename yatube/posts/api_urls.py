@@ -0,0 +1,34 @@
+from django.urls import path
+
+from . import api
+
+app_name = 'api'
+
+# Ленты: (префикс адреса, вид ленты, имя маршрута).
+FEEDS = (
+    ('posts/', 'index', 'index'),
+    ('groups/<slug:slug>/posts/', 'group', 'group_posts'),
+    ('users/<str:username>/posts/', 'profile', 'profile'),
+    ('follow/posts/', 'follow', 'follow'),
+)
+
+urlpatterns = [
+    path('posts/<int:post_id>/', api.post_detail, name='post'),
+]
+
+for prefix, feed, name in FEEDS:
+    urlpatterns += [
+        path(prefix, api.feed, {'feed': feed}, name=name),
+        path(
+            f'{prefix}new/', api.new_posts, {'feed': feed},
+            name=f'{name}_new'
+        ),
+        path(
+            f'{prefix}events/', api.events, {'feed': feed},
+            name=f'{name}_events'
+        ),
+        path(
+            f'{prefix}events/poll/', api.events_poll, {'feed': feed},
+            name=f'{name}_events_poll'
+        ),
+    ]
@@ -0,0 +1,109 @@
+"""Поколения кеша фрагментов шаблонов.
+
+Ключ фрагмента содержит номер версии своей области (вся лента,
+отдельный пост). Сигналы сохранения и удаления увеличивают версию,
+и старые фрагменты просто перестают читаться, поэтому TTL можно
+делать длинным без риска показать устаревшие данные. Вместе с версией
+запоминается время изменения области — для Last-Modified в API.
+"""
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core import page_cache
+
+FEED_SCOPE: str = 'feed'
+# Число комментариев есть в постах лент API, но не на HTML-страницах
+# лент, поэтому у комментариев своя область, а не FEED_SCOPE.
+COMMENTS_SCOPE: str = 'comments'
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def timeline_scope(user_id):
+    """Состав ленты подписок пользователя (подписки и отписки)."""
+    return f'timeline:{user_id}'
+
+
+def _version_key(scope):
+    return f'posts:version:{scope}'
+
+
+def _changed_key(scope):
+    return f'posts:changed:{scope}'
+
+
+def _initial_version():
+    # Версия от времени: после вытеснения ключа из кеша
+    # старые номера не переиспользуются.
+    return int(time.time() * 1000)
+
+
+def version(scope):
+    """Текущая версия области кеша."""
+    key = _version_key(scope)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, _initial_version(), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+def bump(*scopes):
+    """Сбрасывает фрагменты областей, увеличивая их версии."""
+    now = time.time()
+    for scope in scopes:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), timeout=None)
+        cache.set(_changed_key(scope), now, timeout=None)
+
+
+def invalidate_post(post):
+    """Сбрасывает фрагменты лент и страницы поста, а из кеша страниц —
+    ленты, где пост виден.
+    """
+    bump(FEED_SCOPE, post_scope(post.pk))
+    scopes = [FEED_SCOPE, post_scope(post.pk), author_scope(post.author_id)]
+    if post.group_id:
+        scopes.append(group_scope(post.group_id))
+    page_cache.purge(*scopes)
+
+
+def changed_at(scope):
+    """Когда область менялась в последний раз (aware datetime).
+
+    Если отметка вытеснена из кеша, считается, что область изменилась
+    сейчас: клиенты один раз перечитают данные.
+    """
+    key = _changed_key(scope)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, time.time(), timeout=None)
+        value = cache.get(key)
+    return datetime.fromtimestamp(value, timezone.utc)
+
+
+def fragment_cache(request, *scopes):
+    """Параметры {% cache %} для страницы: TTL, версия и номер страницы."""
+    return {
+        'ttl': settings.FRAGMENT_CACHE_TTL,
+        'version': '.'.join(str(version(scope)) for scope in scopes),
+        'page': '{}|{}'.format(
+            request.GET.get('cursor', ''), request.GET.get('page', '')
+        ),
+    }
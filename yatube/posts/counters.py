@@ -0,0 +1,134 @@
+"""Денормализованные счётчики постов, комментариев и подписок.
+
+Счётчики меняются атомарными UPDATE ... SET n = n ± 1 из сигналов,
+а recount_* пересчитывают их целиком и исправляют расхождения.
+"""
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Group, Post, User, UserStats
+
+
+def count_of(model, field):
+    """Подзапрос: число строк model, ссылающихся полем field на строку."""
+    rows = (
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+def user_totals():
+    """Пользователи с точными значениями счётчиков."""
+    return User.objects.annotate(
+        actual_posts=count_of(Post, 'author'),
+        actual_followers=count_of(Follow, 'author'),
+        actual_following=count_of(Follow, 'user'),
+    )
+
+
+def recount_user(user_id):
+    """Пересчитывает счётчики одного пользователя."""
+    totals = user_totals().filter(pk=user_id).values(
+        'actual_posts', 'actual_followers', 'actual_following'
+    ).first()
+    if totals is None:
+        return
+    UserStats.objects.update_or_create(
+        user_id=user_id,
+        defaults={
+            'posts_count': totals['actual_posts'],
+            'followers_count': totals['actual_followers'],
+            'following_count': totals['actual_following'],
+        },
+    )
+
+
+def change_user_stats(user_id, **deltas):
+    """Сдвигает счётчики пользователя, например posts_count=1."""
+    with transaction.atomic():
+        updated = UserStats.objects.filter(
+            user_id=user_id,
+            **{
+                f'{field}__gte': -delta
+                for field, delta in deltas.items() if delta < 0
+            }
+        ).update(
+            **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+        # При каскадном удалении пользователя его строки уже может не
+        # быть — воссоздаём её только при росте счётчиков.
+        if not updated and sum(deltas.values()) > 0:
+            recount_user(user_id)
+
+
+def change_comments_count(post_id, delta):
+    """Сдвигает счётчик комментариев поста."""
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(comments_count__gte=-delta)
+    posts.update(comments_count=F('comments_count') + delta)
+
+
+def change_group_posts(group_id, delta):
+    """Сдвигает счётчик постов группы (group_id может быть None)."""
+    if group_id is None:
+        return
+    groups = Group.objects.filter(pk=group_id)
+    if delta < 0:
+        groups = groups.filter(posts_count__gte=-delta)
+    groups.update(posts_count=F('posts_count') + delta)
+
+
+def recount_users():
+    """Исправляет счётчики всех пользователей, возвращает число правок."""
+    stats = UserStats.objects.in_bulk()
+    changed, missing = [], []
+    totals = user_totals().values_list(
+        'pk', 'actual_posts', 'actual_followers', 'actual_following'
+    )
+    for user_id, posts, followers, following in totals.iterator():
+        row = stats.get(user_id)
+        if row is None:
+            missing.append(UserStats(
+                user_id=user_id,
+                posts_count=posts,
+                followers_count=followers,
+                following_count=following,
+            ))
+        elif (row.posts_count, row.followers_count,
+              row.following_count) != (posts, followers, following):
+            row.posts_count = posts
+            row.followers_count = followers
+            row.following_count = following
+            changed.append(row)
+    with transaction.atomic():
+        UserStats.objects.bulk_create(missing, batch_size=500)
+        UserStats.objects.bulk_update(
+            changed,
+            ('posts_count', 'followers_count', 'following_count'),
+            batch_size=500,
+        )
+    return len(changed) + len(missing)
+
+
+def recount_comments():
+    """Исправляет счётчики комментариев, возвращает число правок."""
+    return Post.objects.annotate(
+        actual=count_of(Comment, 'post')
+    ).exclude(comments_count=F('actual')).update(
+        comments_count=count_of(Comment, 'post')
+    )
+
+
+def recount_groups():
+    """Исправляет счётчики постов групп, возвращает число правок."""
+    return Group.objects.annotate(
+        actual=count_of(Post, 'group')
+    ).exclude(posts_count=F('actual')).update(
+        posts_count=count_of(Post, 'group')
+    )
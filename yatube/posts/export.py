@@ -0,0 +1,111 @@
+"""Потоковая выгрузка групп, постов, комментариев и подписок.
+
+Строки читаются через iterator(chunk_size=...) и сразу превращаются
+в строки JSON Lines или CSV, так что память не зависит от объёма
+выгрузки. Связи выгружаются по естественным ключам (username, slug),
+в том же формате их принимает import_data.
+"""
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+
+from .models import Comment, Follow, Group, Post
+
+CHUNK_SIZE: int = 2000
+FORMATS = ('jsonl', 'csv')
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+# Набор данных: (модель, {поле выгрузки: путь в values()}).
+DATASETS = {
+    'groups': (Group, {
+        'id': 'pk',
+        'title': 'title',
+        'slug': 'slug',
+        'description': 'description',
+    }),
+    'posts': (Post, {
+        'id': 'pk',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'author': 'author__username',
+        'group': 'group__slug',
+        'image': 'image',
+    }),
+    'comments': (Comment, {
+        'id': 'pk',
+        'post': 'post_id',
+        'author': 'author__username',
+        'text': 'text',
+        'created': 'created',
+    }),
+    'follows': (Follow, {
+        'user': 'user__username',
+        'author': 'author__username',
+    }),
+}
+
+
+def fields(dataset):
+    return list(DATASETS[dataset][1])
+
+
+def rows(dataset, queryset=None):
+    """Строки набора данных словарями, порциями по CHUNK_SIZE."""
+    model, columns = DATASETS[dataset]
+    if queryset is None:
+        queryset = model.objects.all()
+    values = queryset.order_by('pk').values_list(*columns.values())
+    for row in values.iterator(chunk_size=CHUNK_SIZE):
+        yield dict(zip(columns, row))
+
+
+def _isoformat(value):
+    """Даты в ISO 8601 (для json.dumps)."""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} не сериализуется в JSON')
+
+
+def jsonl_lines(dataset, queryset=None):
+    for row in rows(dataset, queryset):
+        yield json.dumps(row, ensure_ascii=False, default=_isoformat) + '\n'
+
+
+class _Line:
+    """Буфер для csv.writer, возвращающий записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(dataset, queryset=None):
+    writer = csv.writer(_Line())
+    yield writer.writerow(fields(dataset))
+    for row in rows(dataset, queryset):
+        yield writer.writerow([
+            _isoformat(value) if hasattr(value, 'isoformat') else value
+            for value in row.values()
+        ])
+
+
+def stream(dataset, format, queryset=None):
+    """Строки выгрузки набора dataset в формате format."""
+    if format == 'csv':
+        return csv_lines(dataset, queryset)
+    return jsonl_lines(dataset, queryset)
+
+
+def streaming_response(dataset, format, queryset=None):
+    """Ответ-файл, который отдаётся клиенту по мере чтения из базы."""
+    response = StreamingHttpResponse(
+        stream(dataset, format, queryset),
+        content_type=CONTENT_TYPES[format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{dataset}.{format}"'
+    )
+    return response
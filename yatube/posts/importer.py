@@ -0,0 +1,244 @@
+"""Массовая загрузка групп, постов, комментариев и подписок.
+
+Принимает файлы в формате export_data (JSON Lines или CSV). Строки
+читаются потоком и сохраняются пачками через bulk_create, каждая пачка —
+в своей транзакции. Авторы и группы ищутся по username и slug в словарях
+в памяти, а не запросом на строку. Посты и комментарии сохраняют id
+из выгрузки: по ним комментарии находят свои посты, а повторная загрузка
+той же пачки ничего не дублирует. Если id уже занят другой записью,
+загрузка останавливается с ImportConflict: иначе пост из выгрузки
+потерялся бы, а его комментарии достались бы чужому посту.
+"""
+import csv
+import itertools
+import json
+import os
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Comment, Follow, Group, Post, User
+
+BATCH_SIZE: int = 1000
+# Порядок загрузки: сначала то, на что ссылаются остальные.
+DATASETS = ('groups', 'posts', 'comments', 'follows')
+# Индексы, которые можно снять на время загрузки (--defer-indexes).
+DEFERRABLE_INDEXES = (Post, Comment)
+
+
+def dataset_of(path):
+    """Набор данных по имени файла: posts.jsonl -> posts."""
+    name = os.path.basename(path).split('.')[0]
+    return name if name in DATASETS else None
+
+
+def read_rows(path, skip=0):
+    """Строки файла словарями, первые skip строк пропускаются."""
+    with open(path, encoding='utf-8', newline='') as source:
+        if path.endswith('.csv'):
+            lines = csv.DictReader(source)
+        else:
+            lines = (json.loads(line) for line in source if line.strip())
+        yield from itertools.islice(lines, skip, None)
+
+
+class ImportConflict(ValueError):
+    """id из выгрузки занят другой записью."""
+
+
+def _int(value):
+    return int(value) if value not in (None, '') else None
+
+
+def _new_objects(model, objects, fields):
+    """Объекты, которых ещё нет в базе.
+
+    Запись с тем же id и теми же полями fields уже загружена раньше
+    и пропускается; тот же id у другой записи — ImportConflict.
+    """
+    existing = {
+        pk: values for pk, *values in model.objects.filter(
+            pk__in=[obj.pk for obj in objects if obj.pk is not None]
+        ).values_list('pk', *fields)
+    }
+    conflicts = [
+        obj.pk for obj in objects if obj.pk in existing
+        and existing[obj.pk] != [getattr(obj, field) for field in fields]
+    ]
+    if conflicts:
+        raise ImportConflict(
+            f'{model._meta.verbose_name_plural}: id '
+            f'{", ".join(map(str, conflicts[:10]))} уже заняты другими '
+            'записями. Загрузите выгрузку в пустую базу.'
+        )
+    return [obj for obj in objects if obj.pk not in existing]
+
+
+def _date(value, default):
+    if not value:
+        return default
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f'Некорректная дата: {value!r}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class Importer:
+    """Загружает пачки строк; счётчики skipped — строки без связей."""
+
+    def __init__(self, create_users=False):
+        self.create_users = create_users
+        self.users = dict(User.objects.values_list('username', 'pk'))
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.now = timezone.now()
+        self.skipped = 0
+
+    def _resolve_users(self, usernames):
+        """Дополняет словарь пользователей; недостающих создаёт,
+        если это разрешено.
+        """
+        missing = {
+            name for name in usernames if name and name not in self.users
+        }
+        if missing and self.create_users:
+            password = make_password(None)
+            User.objects.bulk_create(
+                [User(username=name, password=password) for name in missing],
+                ignore_conflicts=True,
+            )
+            self.users.update(
+                User.objects.filter(username__in=missing)
+                .values_list('username', 'pk')
+            )
+
+    def load(self, dataset, batch):
+        """Сохраняет пачку строк набора dataset."""
+        with transaction.atomic():
+            getattr(self, f'load_{dataset}')(batch)
+
+    def load_groups(self, batch):
+        Group.objects.bulk_create(
+            [
+                Group(
+                    title=row['title'],
+                    slug=row['slug'],
+                    description=row.get('description') or '',
+                )
+                for row in batch if row['slug'] not in self.groups
+            ],
+            ignore_conflicts=True,
+        )
+        self.groups.update(
+            Group.objects.filter(slug__in=[row['slug'] for row in batch])
+            .values_list('slug', 'pk')
+        )
+
+    def load_posts(self, batch):
+        self._resolve_users(row['author'] for row in batch)
+        posts = []
+        for row in batch:
+            author_id = self.users.get(row['author'])
+            group = row.get('group')
+            if author_id is None or group and group not in self.groups:
+                self.skipped += 1
+                continue
+            posts.append(Post(
+                pk=_int(row.get('id')),
+                text=row['text'],
+                author_id=author_id,
+                group_id=self.groups.get(group),
+                image=row.get('image') or '',
+                pub_date=_date(row.get('pub_date'), self.now),
+            ))
+        posts = _new_objects(Post, posts, ('author_id', 'text'))
+        Post.objects.bulk_create(posts)
+
+    def load_comments(self, batch):
+        self._resolve_users(row['author'] for row in batch)
+        post_ids = set(
+            Post.objects.filter(
+                pk__in=[_int(row['post']) for row in batch]
+            ).values_list('pk', flat=True)
+        )
+        comments = []
+        for row in batch:
+            author_id = self.users.get(row['author'])
+            post_id = _int(row['post'])
+            if author_id is None or post_id not in post_ids:
+                self.skipped += 1
+                continue
+            comments.append(Comment(
+                pk=_int(row.get('id')),
+                post_id=post_id,
+                author_id=author_id,
+                text=row['text'],
+                created=_date(row.get('created'), self.now),
+            ))
+        comments = _new_objects(
+            Comment, comments, ('post_id', 'author_id', 'text')
+        )
+        Comment.objects.bulk_create(comments)
+
+    def load_follows(self, batch):
+        self._resolve_users(
+            itertools.chain.from_iterable(
+                (row['user'], row['author']) for row in batch
+            )
+        )
+        follows = []
+        for row in batch:
+            user_id = self.users.get(row['user'])
+            author_id = self.users.get(row['author'])
+            if user_id is None or author_id is None:
+                self.skipped += 1
+                continue
+            follows.append(Follow(user_id=user_id, author_id=author_id))
+        Follow.objects.bulk_create(follows, ignore_conflicts=True)
+
+
+def _existing_indexes(model):
+    with connection.cursor() as cursor:
+        return connection.introspection.get_constraints(
+            cursor, model._meta.db_table
+        )
+
+
+def drop_indexes():
+    """Снимает индексы лент, возвращает их имена."""
+    dropped = []
+    with connection.schema_editor() as editor:
+        for model in DEFERRABLE_INDEXES:
+            existing = _existing_indexes(model)
+            for index in model._meta.indexes:
+                if index.name in existing:
+                    editor.remove_index(model, index)
+                    dropped.append(index.name)
+    return dropped
+
+
+def restore_indexes():
+    """Создаёт недостающие индексы лент, возвращает их имена."""
+    created = []
+    with connection.schema_editor() as editor:
+        for model in DEFERRABLE_INDEXES:
+            existing = _existing_indexes(model)
+            for index in model._meta.indexes:
+                if index.name not in existing:
+                    editor.add_index(model, index)
+                    created.append(index.name)
+    return created
+
+
+def reset_sequences():
+    """Сдвигает счётчики id после вставки постов с явными id."""
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), [Post, Comment]
+    )
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
@@ -0,0 +1,77 @@
+"""Уведомления о новых постах для живых лент.
+
+Пост после коммита публикуется в каналы общей ленты, своей группы
+и автора; подписчик ленты ждёт события нужных каналов через брокер
+core.pubsub. Само уведомление короткое: клиент дочитывает посты
+опросом .../posts/new/.
+"""
+from django.db import connection, transaction
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+
+from core.pubsub import broker
+
+from .models import Follow, Group, User
+
+GLOBAL_CHANNEL: str = 'posts'
+
+
+def group_channel(group_id):
+    return f'group:{group_id}'
+
+
+def author_channel(author_id):
+    return f'author:{author_id}'
+
+
+def post_channels(post):
+    channels = [GLOBAL_CHANNEL, author_channel(post.author_id)]
+    if post.group_id:
+        channels.append(group_channel(post.group_id))
+    return channels
+
+
+def event_data(post):
+    return {
+        'id': post.pk,
+        'pub_date': post.pub_date.isoformat(),
+        'author_id': post.author_id,
+        'group_id': post.group_id,
+        'api_url': reverse('api:post', args=(post.pk,)),
+    }
+
+
+def publish(post):
+    """Публикует новый пост, когда транзакция зафиксирована."""
+    channels, data = post_channels(post), event_data(post)
+    transaction.on_commit(lambda: broker().publish(channels, data))
+
+
+def feed_channels(request, feed, **kwargs):
+    """Каналы ленты или None, если лента подписок недоступна.
+
+    Для ленты подписок берутся авторы на момент подключения: поток
+    ограничен по времени, и при переподключении список обновится.
+    """
+    if feed == 'index':
+        return [GLOBAL_CHANNEL]
+    if feed == 'group':
+        group = get_object_or_404(Group, slug=kwargs['slug'])
+        return [group_channel(group.pk)]
+    if feed == 'profile':
+        author = get_object_or_404(User, username=kwargs['username'])
+        return [author_channel(author.pk)]
+    if not request.user.is_authenticated:
+        return None
+    return [
+        author_channel(author_id)
+        for author_id in Follow.objects.filter(
+            user=request.user
+        ).values_list('author', flat=True)
+    ]
+
+
+def release_connection():
+    """Отдаёт соединение с базой перед долгим ожиданием событий."""
+    if not connection.in_atomic_block:
+        connection.close()
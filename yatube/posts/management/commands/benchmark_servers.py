@@ -0,0 +1,212 @@
+import http.client
+import json
+import platform
+import socket
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import (ThreadedWSGIServer,
+                                          WSGIRequestHandler)
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group, User
+
+from .benchmark_views import percentile
+
+SERVERS = ('wsgi', 'asgi')
+# Сколько ждать, пока uvicorn начнёт принимать соединения.
+ASGI_START_TIMEOUT = 30
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class WsgiServer(ThreadedWSGIServer):
+    # Как у asyncio.start_server: очередь не должна ограничивать замер.
+    request_queue_size = 100
+
+
+def start_wsgi(application):
+    server = WsgiServer(('127.0.0.1', 0), QuietHandler)
+    server.set_app(application)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address[1], server.shutdown
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def start_asgi(application):
+    """Приложение под uvicorn через адаптер asgiref, в фоновом потоке."""
+    try:
+        import uvicorn
+        from asgiref.wsgi import WsgiToAsgi
+    except ImportError:
+        raise CommandError(
+            'Для замера ASGI установите uvicorn и asgiref: '
+            'pip install uvicorn asgiref'
+        )
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        WsgiToAsgi(application), host='127.0.0.1', port=port,
+        log_level='warning', lifespan='off',
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + ASGI_START_TIMEOUT
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise CommandError('uvicorn не запустился.')
+        time.sleep(0.05)
+
+    def stop():
+        server.should_exit = True
+        thread.join()
+    return server, port, stop
+
+
+def fetch(port, path):
+    """Один GET в новом соединении: (секунды, статус)."""
+    started = time.perf_counter()
+    client = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        client.request('GET', path)
+        response = client.getresponse()
+        response.read()
+        return time.perf_counter() - started, response.status
+    except OSError:
+        return time.perf_counter() - started, None
+    finally:
+        client.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность проекта под WSGI (потоковый '
+        'сервер Django) и ASGI (yatube.asgi под uvicorn) при '
+        'одновременных запросах к лентам. Замер идёт по текущей базе, '
+        'наполните её заранее командой seed_data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, nargs='+', default=[1, 8, 32],
+            help='Число одновременных клиентов.'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Запросов на каждый уровень нагрузки.'
+        )
+        parser.add_argument(
+            '--servers', nargs='+', default=list(SERVERS)
+        )
+        parser.add_argument(
+            '--paths', nargs='+',
+            help='Адреса страниц (по умолчанию главная, самая большая '
+                 'группа и самый активный автор).'
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл для результатов в JSON (по умолчанию stdout).'
+        )
+
+    def paths(self):
+        paths = [reverse('posts:index')]
+        group = Group.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        author = User.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        if group:
+            paths.append(reverse('posts:group_posts', args=(group.slug,)))
+        if author:
+            paths.append(reverse('posts:profile', args=(author.username,)))
+        return paths
+
+    def handle(self, *args, **options):
+        unknown = set(options['servers']) - set(SERVERS)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные серверы: {", ".join(sorted(unknown))}'
+            )
+        paths = options['paths'] or self.paths()
+        report = {
+            'meta': {
+                'started': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'paths': paths,
+                'requests': options['requests'],
+            },
+            'results': [],
+        }
+        # Панель отладки (INTERNAL_IPS) исказила бы замер.
+        with override_settings(INTERNAL_IPS=[]):
+            application = get_wsgi_application()
+            for name in options['servers']:
+                if name == 'wsgi':
+                    _, port, stop = start_wsgi(application)
+                else:
+                    _, port, stop = start_asgi(application)
+                try:
+                    for path in paths:
+                        fetch(port, path)
+                    for concurrency in options['concurrency']:
+                        report['results'].append(self.measure(
+                            name, port, paths, options['requests'],
+                            concurrency,
+                        ))
+                finally:
+                    stop()
+        result = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(result)
+            self.stderr.write(f'Результаты записаны в {options["output"]}')
+        else:
+            self.stdout.write(result)
+
+    def measure(self, server, port, paths, total, concurrency):
+        with ThreadPoolExecutor(concurrency) as pool:
+            started = time.perf_counter()
+            results = list(pool.map(
+                lambda i: fetch(port, paths[i % len(paths)]), range(total)
+            ))
+            elapsed = time.perf_counter() - started
+        durations = [seconds * 1000 for seconds, _ in results]
+        errors = sum(status != 200 for _, status in results)
+        result = {
+            'server': server,
+            'concurrency': concurrency,
+            'requests': total,
+            'errors': errors,
+            'requests_per_second': round(total / elapsed, 2),
+            'latency_ms': {
+                'median': round(statistics.median(durations), 3),
+                'p95': round(percentile(durations, 0.95), 3),
+                'max': round(max(durations), 3),
+            },
+        }
+        self.stderr.write(
+            f'{server:<5} x{concurrency:<4}'
+            f'{result["requests_per_second"]:>9.1f} запросов/с'
+            f'{result["latency_ms"]["p95"]:>10.1f} мс p95'
+            f'{errors:>5} ошибок'
+        )
+        return result
@@ -0,0 +1,198 @@
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+
+import django
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group, Post, User
+from posts.seeding import Seeder, refresh_derived
+
+VIEWS = ('index', 'group_posts', 'profile', 'post_detail', 'follow_index')
+
+
+class QueryCounter:
+    """Считает запросы к базе и их суммарное время (execute_wrapper)."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = min(int(round(share * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время ответа, число запросов и память основных страниц. '
+        'С --sizes база по очереди дополняется синтетическими постами до '
+        'каждого размера; все изменения откатываются, если не указан --keep.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='*', default=[],
+            help='Число постов, при котором делать замер (по возрастанию).'
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--warm', action='store_true',
+            help='Не очищать кеш перед запросами (замер с кешем).'
+        )
+        parser.add_argument(
+            '--views', nargs='*', choices=VIEWS, default=list(VIEWS)
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output',
+            help='Файл для результатов в JSON (по умолчанию stdout).'
+        )
+        parser.add_argument(
+            '--keep', action='store_true',
+            help='Сохранить сгенерированные данные.'
+        )
+
+    def handle(self, *args, **options):
+        report = {
+            'meta': {
+                'started': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'repeat': options['repeat'],
+                'warm_cache': options['warm'],
+            },
+            'results': [],
+        }
+        with transaction.atomic():
+            sizes = sorted(options['sizes']) or [None]
+            seeder = Seeder(prefix='bench', seed=options['seed'])
+            for size in sizes:
+                if size is not None:
+                    self.grow(seeder, size)
+                report['results'] += self.measure(
+                    options['views'], options['repeat'], options['warm']
+                )
+            if not options['keep']:
+                transaction.set_rollback(True)
+        result = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(result)
+            self.stderr.write(f'Результаты записаны в {options["output"]}')
+        else:
+            self.stdout.write(result)
+
+    def grow(self, seeder, size):
+        """Добавляет посты (и пропорционально остальное) до size."""
+        missing = size - Post.objects.count()
+        if missing <= 0:
+            return
+        self.stderr.write(f'Генерация {missing} постов…')
+        user_ids = seeder.users(max(missing // 50, 2))
+        group_ids = seeder.groups(max(missing // 1000, 1))
+        seeder.posts(missing, user_ids, group_ids)
+        posts = list(Post.objects.values_list('pk', 'pub_date'))
+        seeder.comments(missing // 2, user_ids, posts)
+        seeder.follows(20, seeder.seeded_users())
+        refresh_derived()
+
+    def targets(self):
+        """Адреса страниц для самых наполненных объектов и читатель ленты."""
+        author = User.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        group = Group.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        post = Post.objects.order_by('-comments_count', '-pk').first()
+        reader = User.objects.annotate(
+            total=Count('follower')
+        ).order_by('-total').first()
+        urls = {'index': reverse('posts:index')}
+        if group:
+            urls['group_posts'] = reverse(
+                'posts:group_posts', args=(group.slug,)
+            )
+        if author:
+            urls['profile'] = reverse(
+                'posts:profile', args=(author.username,)
+            )
+        if post:
+            urls['post_detail'] = reverse(
+                'posts:post_detail', args=(post.pk,)
+            )
+        if reader:
+            urls['follow_index'] = reverse('posts:follow_index')
+        return urls, reader
+
+    def measure(self, views, repeat, warm):
+        urls, reader = self.targets()
+        # Адрес не из INTERNAL_IPS: панель отладки не должна искажать замер.
+        client = Client(REMOTE_ADDR='192.0.2.1')
+        if reader:
+            client.force_login(reader)
+        posts = Post.objects.count()
+        results = []
+        for view in views:
+            if view not in urls:
+                continue
+            url = urls[view]
+            durations = []
+            for _ in range(repeat):
+                if not warm:
+                    cache.clear()
+                queries = QueryCounter()
+                with connection.execute_wrapper(queries):
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    durations.append(
+                        (time.perf_counter() - started) * 1000
+                    )
+            if not warm:
+                cache.clear()
+            tracemalloc.start()
+            client.get(url)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results.append({
+                'view': view,
+                'url': url,
+                'posts': posts,
+                'status': response.status_code,
+                'latency_ms': {
+                    'median': round(statistics.median(durations), 3),
+                    'mean': round(statistics.mean(durations), 3),
+                    'p95': round(percentile(durations, 0.95), 3),
+                    'min': round(min(durations), 3),
+                    'max': round(max(durations), 3),
+                },
+                'queries': queries.count,
+                'query_time_ms': round(queries.seconds * 1000, 3),
+                'peak_memory_kb': round(peak / 1024, 1),
+            })
+            self.stderr.write(
+                f'{posts:>9} {view:<14}'
+                f'{results[-1]["latency_ms"]["median"]:>10.2f} мс'
+                f' {queries.count:>5} запросов'
+            )
+        return results
@@ -0,0 +1,179 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from posts.models import Comment, Follow, Group, Post, User
+from posts.timeline import timeline_posts
+from posts.utils import POSTS_ON_THE_PAGE
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает планы и время запросов лент с индексами и без них. '
+        'Все изменения (тестовые данные, удаление индексов) '
+        'откатываются в конце.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Сколько постов сгенерировать перед замером.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз выполнять каждый запрос.'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed']:
+                self.seed(options['seed'])
+            queries = self.feed_queries()
+            if not queries:
+                self.stdout.write('Нет данных: запустите с --seed N.')
+                return
+            with_indexes = self.measure(
+                queries, options['repeat'], 'with-indexes'
+            )
+            self.drop_indexes()
+            without_indexes = self.measure(
+                queries, options['repeat'], 'without-indexes'
+            )
+            transaction.set_rollback(True)
+        self.stdout.write(f'\n{"запрос":<16}{"с индексами":>14}'
+                          f'{"без индексов":>14}  (медиана, мс)')
+        for name in queries:
+            self.stdout.write(
+                f'{name:<16}{with_indexes[name]:>14.3f}'
+                f'{without_indexes[name]:>14.3f}'
+            )
+
+    def seed(self, total):
+        """Синтетические данные; откатываются вместе с транзакцией."""
+        now = timezone.now()
+        User.objects.bulk_create(
+            User(username=f'explain_user_{i}')
+            for i in range(max(total // 50, 2))
+        )
+        users = list(User.objects.filter(username__startswith='explain_'))
+        Group.objects.bulk_create(
+            Group(title=f'Группа {i}', slug=f'explain-{i}', description='')
+            for i in range(max(total // 500, 1))
+        )
+        groups = list(Group.objects.filter(slug__startswith='explain-'))
+        Post.objects.bulk_create(
+            (
+                Post(
+                    text=f'Пост {i}',
+                    author=random.choice(users),
+                    group=random.choice(groups + [None]),
+                    pub_date=now - timedelta(
+                        minutes=random.randint(0, 10 ** 6)
+                    ),
+                )
+                for i in range(total)
+            ),
+        )
+        posts = list(Post.objects.values_list('pk', flat=True)[:100])
+        Comment.objects.bulk_create(
+            (
+                Comment(
+                    post_id=random.choice(posts),
+                    author=random.choice(users),
+                    text='Комментарий',
+                )
+                for _ in range(total // 2)
+            ),
+        )
+        Follow.objects.bulk_create(
+            {
+                (reader.pk, author.pk): Follow(user=reader, author=author)
+                for reader in users
+                for author in random.sample(users, min(len(users), 10))
+                if reader != author
+            }.values(),
+        )
+
+    def feed_queries(self):
+        """Первые страницы лент для самых наполненных объектов."""
+        author = User.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        group = Group.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        reader = User.objects.annotate(
+            total=Count('follower')
+        ).order_by('-total').first()
+        post = Post.objects.annotate(
+            total=Count('comments')
+        ).order_by('-total').first()
+        if None in (author, group, reader, post):
+            return {}
+        ordering = ('-pub_date', '-pk')
+        limit = POSTS_ON_THE_PAGE + 1
+        return {
+            'index': Post.objects.for_feed().order_by(*ordering)[:limit],
+            'group_posts': Post.objects.for_feed().filter(
+                group=group
+            ).order_by(*ordering)[:limit],
+            'profile': Post.objects.for_feed().filter(
+                author=author
+            ).order_by(*ordering)[:limit],
+            'follow_index': timeline_posts(reader).order_by(
+                *ordering
+            )[:limit],
+            'comments': Comment.objects.filter(post=post).order_by(
+                'created', 'pk'
+            )[:limit],
+            'follow_exists': Follow.objects.filter(
+                user=reader, author=author
+            )[:1],
+        }
+
+    def explain(self, queryset, label):
+        """План запроса.
+
+        Метка в комментарии делает текст запроса уникальным: модуль
+        sqlite3 кеширует подготовленные запросы, и EXPLAIN из кеша
+        показал бы план до удаления индексов.
+        """
+        sql, params = queryset.query.sql_with_params()
+        prefix = connection.ops.explain_query_prefix()
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql} -- {label}', params)
+            return '\n'.join(
+                ' '.join(str(column) for column in row)
+                for row in cursor.fetchall()
+            )
+
+    def measure(self, queries, repeat, label):
+        """Печатает план каждого запроса, возвращает медиану времени."""
+        timings = {}
+        for name, queryset in queries.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n{name}'))
+            self.stdout.write(self.explain(queryset, label))
+            durations = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                durations.append((time.perf_counter() - started) * 1000)
+            timings[name] = statistics.median(durations)
+        return timings
+
+    def drop_indexes(self):
+        """Удаляет индексы лент внутри транзакции (для замера «до»)."""
+        self.stdout.write(self.style.WARNING('\nИндексы лент удалены:'))
+        schema_editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for model in (Post, Comment):
+                for index in model._meta.indexes:
+                    sql = index.remove_sql(model, schema_editor)
+                    cursor.execute(str(sql))
+                    self.stdout.write(f'  {index.name}')
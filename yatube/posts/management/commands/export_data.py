@@ -0,0 +1,56 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import DATASETS, FORMATS, stream
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает группы, посты, комментарии и подписки в JSON Lines '
+        'или CSV, не загружая таблицы в память целиком.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'datasets', nargs='*',
+            help=f'Что выгружать: {", ".join(DATASETS)} (по умолчанию всё).'
+        )
+        parser.add_argument('--format', choices=FORMATS, default='jsonl')
+        parser.add_argument(
+            '--output-dir',
+            help='Каталог для файлов <набор>.<формат>; без него — stdout.'
+        )
+
+    def handle(self, *args, **options):
+        datasets = options['datasets'] or list(DATASETS)
+        unknown = set(datasets) - set(DATASETS)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные наборы: {", ".join(sorted(unknown))}.'
+            )
+        format = options['format']
+        directory = options['output_dir']
+        if directory is None:
+            if len(datasets) > 1:
+                raise CommandError(
+                    'В stdout выгружается один набор; укажите его '
+                    'или --output-dir.'
+                )
+            for line in stream(datasets[0], format):
+                self.stdout.write(line, ending='')
+            return
+        os.makedirs(directory, exist_ok=True)
+        for dataset in datasets:
+            path = os.path.join(directory, f'{dataset}.{format}')
+            started = time.perf_counter()
+            total = -1 if format == 'csv' else 0
+            with open(path, 'w', encoding='utf-8', newline='') as output:
+                for line in stream(dataset, format):
+                    output.write(line)
+                    total += 1
+            self.stdout.write(
+                f'{dataset}: {total} строк за '
+                f'{time.perf_counter() - started:.1f} с → {path}'
+            )
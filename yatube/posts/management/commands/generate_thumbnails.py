@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from posts.models import Post
+from posts.thumbnails import generate
+
+
+def _generate(post_id):
+    try:
+        return generate(post_id)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит миниатюры картинок постов. По умолчанию только для постов, '
+        'у которых миниатюр ещё нет.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Перестроить миниатюры всех постов с картинками.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=settings.THUMBNAIL_WORKERS,
+            help='Сколько потоков строят миниатюры (1 — без потоков).'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['all']:
+            posts = posts.filter(thumbnails='')
+        post_ids = list(posts.values_list('pk', flat=True))
+        if options['workers'] > 1:
+            with ThreadPoolExecutor(options['workers']) as executor:
+                results = list(executor.map(_generate, post_ids))
+        else:
+            results = [generate(post_id) for post_id in post_ids]
+        done = sum(1 for urls in results if urls)
+        self.stdout.write(self.style.SUCCESS(
+            f'Миниатюры построены для постов: {done} из {len(post_ids)}.'
+        ))
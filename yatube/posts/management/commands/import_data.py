@@ -0,0 +1,134 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importer import (
+    BATCH_SIZE, DATASETS, ImportConflict, Importer, dataset_of, drop_indexes,
+    read_rows, reset_sequences, restore_indexes,
+)
+from posts.seeding import refresh_derived
+from posts.utils import batched
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает группы, посты, комментарии и подписки из файлов '
+        'export_data (JSON Lines или CSV) пачками через bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='+',
+            help='Файлы <набор>.jsonl/.csv или каталоги с ними.'
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл с прогрессом: повторный запуск продолжит с него.'
+        )
+        parser.add_argument(
+            '--defer-indexes', action='store_true',
+            help='Снять индексы лент на время загрузки и построить после.'
+        )
+        parser.add_argument(
+            '--create-users', action='store_true',
+            help='Создавать отсутствующих пользователей без пароля.'
+        )
+        parser.add_argument(
+            '--no-refresh', action='store_true',
+            help='Не пересчитывать счётчики, поиск и ленты после загрузки.'
+        )
+
+    def files(self, paths):
+        """Файлы наборов данных в порядке загрузки."""
+        found = []
+        for path in paths:
+            if os.path.isdir(path):
+                found += [
+                    os.path.join(path, name) for name in os.listdir(path)
+                    if dataset_of(name)
+                    and name.endswith(('.jsonl', '.csv'))
+                ]
+            elif dataset_of(path):
+                found.append(path)
+            else:
+                raise CommandError(
+                    f'{path}: имя файла должно начинаться с одного из '
+                    f'{", ".join(DATASETS)}.'
+                )
+        return sorted(
+            (os.path.abspath(path) for path in found),
+            key=lambda path: DATASETS.index(dataset_of(path)),
+        )
+
+    def load_checkpoint(self, path):
+        if path and os.path.exists(path):
+            with open(path) as checkpoint:
+                return json.load(checkpoint)
+        return {}
+
+    def save_checkpoint(self, path, done):
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as checkpoint:
+            json.dump(done, checkpoint)
+        os.replace(temporary, path)
+
+    def load_files(self, files, importer, checkpoint, done, options):
+        """Загружает файлы пачками, возвращает число строк."""
+        total = 0
+        for path in files:
+            dataset = dataset_of(path)
+            skip = done.get(path, 0)
+            file_started = time.perf_counter()
+            loaded = 0
+            rows = read_rows(path, skip=skip)
+            for batch in batched(rows, options['batch_size']):
+                importer.load(dataset, batch)
+                loaded += len(batch)
+                if checkpoint:
+                    done[path] = skip + loaded
+                    self.save_checkpoint(checkpoint, done)
+            elapsed = time.perf_counter() - file_started
+            total += loaded
+            self.stdout.write(
+                f'{dataset}: {loaded} строк'
+                + (f' (пропущено уже загруженных: {skip})' if skip else '')
+                + f', {loaded / elapsed if elapsed else 0:.0f} строк/с'
+            )
+        return total
+
+    def handle(self, *args, **options):
+        files = self.files(options['paths'])
+        checkpoint = options['checkpoint']
+        done = self.load_checkpoint(checkpoint)
+        importer = Importer(create_users=options['create_users'])
+        if options['defer_indexes']:
+            dropped = drop_indexes()
+            self.stdout.write(f'Сняты индексы: {", ".join(dropped) or "-"}')
+        started = time.perf_counter()
+        try:
+            total = self.load_files(files, importer, checkpoint, done, options)
+        except ImportConflict as error:
+            raise CommandError(error)
+        finally:
+            # И при ошибке: загруженные пачки уже сохранены, а база не
+            # должна остаться без индексов до следующего успешного запуска.
+            reset_sequences()
+            if options['defer_indexes']:
+                restored = restore_indexes()
+                self.stdout.write(
+                    f'Построены индексы: {", ".join(restored) or "-"}'
+                )
+        if not options['no_refresh']:
+            refreshed = refresh_derived()
+            self.stdout.write(', '.join(
+                f'{name}: {value}' for name, value in refreshed.items()
+            ))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено строк: {total}, без связей пропущено: '
+            f'{importer.skipped}; {total / elapsed if elapsed else 0:.0f} '
+            'строк/с в среднем.'
+        ))
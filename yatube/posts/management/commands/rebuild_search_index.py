@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.search import rebuild, use_fts
+
+
+class Command(BaseCommand):
+    help = 'Строит поисковый индекс постов и комментариев заново.'
+
+    def handle(self, *args, **options):
+        total = rebuild()
+        backend = 'FTS5' if use_fts() else 'таблица термов'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано постов: {total} ({backend}).'
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import recount_comments, recount_groups, recount_users
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счётчики постов, комментариев, подписок и групп '
+        'и исправляет расхождения.'
+    )
+
+    def handle(self, *args, **options):
+        users = recount_users()
+        comments = recount_comments()
+        groups = recount_groups()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счётчиков пользователей: {users}, '
+            f'счётчиков комментариев: {comments}, счётчиков групп: {groups}.'
+        ))
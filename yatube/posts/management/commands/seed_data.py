@@ -0,0 +1,84 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import Post
+from posts.seeding import BATCH_SIZE, Seeder, refresh_derived
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, группами, постами, '
+        'комментариями и подписками для нагрузочных замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок на пользователя.'
+        )
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель закона Ципфа: чем больше, тем сильнее перекос.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=None,
+            help='Зерно генератора для воспроизводимых данных.'
+        )
+        parser.add_argument('--prefix', default='seed')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--no-refresh', action='store_true',
+            help='Не пересчитывать счётчики, поиск и ленты после загрузки.'
+        )
+
+    def stage(self, title, function, *args):
+        started = time.perf_counter()
+        result = function(*args)
+        self.stdout.write(
+            f'{title}: {time.perf_counter() - started:.1f} с'
+        )
+        return result
+
+    def handle(self, *args, **options):
+        seeder = Seeder(
+            prefix=options['prefix'],
+            seed=options['seed'],
+            skew=options['skew'],
+            batch_size=options['batch_size'],
+        )
+        with transaction.atomic():
+            user_ids = self.stage(
+                'Пользователи', seeder.users, options['users']
+            )
+            if not user_ids:
+                self.stdout.write('Нет пользователей: укажите --users.')
+                return
+            group_ids = self.stage(
+                'Группы', seeder.groups, options['groups']
+            )
+            self.stage(
+                'Посты', seeder.posts, options['posts'], user_ids, group_ids
+            )
+            if options['comments']:
+                posts = list(Post.objects.values_list('pk', 'pub_date'))
+                self.stage(
+                    'Комментарии', seeder.comments,
+                    options['comments'], user_ids, posts
+                )
+            self.stage(
+                'Подписки', seeder.follows, options['follows'], user_ids
+            )
+            if not options['no_refresh']:
+                refreshed = self.stage(
+                    'Счётчики, поиск и ленты', refresh_derived
+                )
+                self.stdout.write(', '.join(
+                    f'{name}: {value}' for name, value in refreshed.items()
+                ))
+        self.stdout.write(self.style.SUCCESS('Данные созданы.'))
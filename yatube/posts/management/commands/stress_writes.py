@@ -0,0 +1,145 @@
+import json
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connection
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.write_queue import write_queue
+from posts import views
+from posts.models import Post, User
+
+from .benchmark_views import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочная проверка одновременных записей: потоки создают посты '
+        'и комментарии через представления post_create и add_comment, '
+        'пока читатели открывают главную. Каждый запрос, как в сервере, '
+        'берёт и закрывает соединение с базой. Считает ошибки '
+        '«database is locked». Данные пишутся в текущую базу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument(
+            '--writes', type=int, default=50,
+            help='Записей на поток (пост и комментарий по очереди).'
+        )
+        parser.add_argument('--readers', type=int, default=2)
+        parser.add_argument(
+            '--write-queue', choices=('on', 'off', 'settings'),
+            default='settings',
+            help='Очередь записей (по умолчанию SQLITE_WRITE_QUEUE).'
+        )
+
+    def handle(self, *args, **options):
+        writers = [
+            User.objects.get_or_create(username=f'stress-{number}')[0]
+            for number in range(options['threads'])
+        ]
+        post = Post.objects.create(author=writers[0], text='stress')
+        self.factory = RequestFactory()
+        self.lock = threading.Lock()
+        self.counts = {'writes': 0, 'reads': 0, 'lock_errors': 0,
+                       'errors': 0}
+        self.durations = []
+        self.done = threading.Event()
+        overrides = {}
+        if options['write_queue'] != 'settings':
+            overrides['SQLITE_WRITE_QUEUE'] = options['write_queue'] == 'on'
+        with override_settings(**overrides):
+            queue = settings.SQLITE_WRITE_QUEUE
+            threads = [
+                threading.Thread(
+                    target=self.writer, args=(user, post, options['writes'])
+                )
+                for user in writers
+            ]
+            readers = [
+                threading.Thread(target=self.reader)
+                for _ in range(options['readers'])
+            ]
+            started = time.perf_counter()
+            for thread in threads + readers:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            self.done.set()
+            for thread in readers:
+                thread.join()
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+        result = dict(
+            self.counts,
+            threads=options['threads'],
+            readers=options['readers'],
+            vendor=connection.vendor,
+            journal_mode=journal_mode,
+            write_queue=queue,
+            writes_per_second=round(self.counts['writes'] / elapsed, 1),
+            write_ms={
+                'median': round(statistics.median(self.durations), 3),
+                'p95': round(percentile(self.durations, 0.95), 3),
+                'max': round(max(self.durations), 3),
+            },
+            queue=write_queue.snapshot(),
+        )
+        self.stdout.write(json.dumps(result, ensure_ascii=False, indent=2))
+
+    def request(self, view, request, *args):
+        """Запрос с жизненным циклом соединения, как в сервере."""
+        close_old_connections()
+        try:
+            return view(request, *args)
+        except OperationalError as error:
+            key = 'lock_errors' if 'locked' in str(error) else 'errors'
+        except Exception:
+            key = 'errors'
+        finally:
+            close_old_connections()
+        with self.lock:
+            self.counts[key] += 1
+        return None
+
+    def writer(self, user, post, total):
+        for number in range(total):
+            if number % 2:
+                request = self.factory.post(
+                    reverse('posts:add_comment', args=(post.pk,)),
+                    {'text': f'Комментарий {number}'},
+                )
+                view, args = views.add_comment, (post.pk,)
+            else:
+                request = self.factory.post(
+                    reverse('posts:post_create'), {'text': f'Пост {number}'}
+                )
+                view, args = views.post_create, ()
+            request.user = user
+            started = time.perf_counter()
+            response = self.request(view, request, *args)
+            duration = (time.perf_counter() - started) * 1000
+            with self.lock:
+                self.durations.append(duration)
+                if response is not None and response.status_code == 302:
+                    self.counts['writes'] += 1
+                elif response is not None:
+                    self.counts['errors'] += 1
+
+    def reader(self):
+        while not self.done.is_set():
+            request = self.factory.get(reverse('posts:index'))
+            request.user = AnonymousUser()
+            response = self.request(views.index, request)
+            if response is not None:
+                with self.lock:
+                    self.counts['reads'] += 1
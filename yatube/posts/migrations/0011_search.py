@@ -0,0 +1,59 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:08
+
+from django.db import migrations, models
+from django.db.utils import OperationalError
+import django.db.models.deletion
+
+FTS_TABLE = 'posts_search_fts'
+
+
+def create_fts_table(apps, schema_editor):
+    """Создаёт и заполняет индекс FTS5, если SQLite его поддерживает."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE {FTS_TABLE} '
+                'USING fts5(text, comments)'
+            )
+        except OperationalError:
+            # SQLite без FTS5: поиск работает по таблице SearchTerm,
+            # её заполняет команда rebuild_search_index.
+            return
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, text, comments) '
+            'SELECT p.id, p.text, COALESCE(('
+            'SELECT group_concat(c.text, char(10)) '
+            'FROM posts_comment c WHERE c.post_id = p.id'
+            "), '') FROM posts_post p"
+        )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Слово')),
+                ('weight', models.PositiveIntegerField(verbose_name='Вес')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='posts.Post', verbose_name='Пост')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='searchterm',
+            index=models.Index(fields=['term', 'post'], name='posts_searc_term_27a9f7_idx'),
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
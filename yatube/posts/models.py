@@ -1,5 +1,8 @@
+import json
+
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -22,11 +25,24 @@ class Group(models.Model):
         verbose_name='Описание группы',
         help_text='Напишите описание группы'
     )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Число постов'
+    )
 
     def __str__(self):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Посты для лент: автор и группа подтягиваются одним запросом."""
+        return self.select_related('author', 'group').defer(
+            'group__description'
+        )
+
+
 class Post(models.Model):
     """Базовый класс Посты"""
 
@@ -34,8 +50,11 @@ class Post(models.Model):
         verbose_name='Текст поста',
         help_text='Введите текст поста',
     )
+    # Не auto_now_add: при загрузке данных (seed_data, import_data)
+    # bulk_create сохраняет даты из источника.
     pub_date = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         verbose_name='Дата публикации',
     )
     author = models.ForeignKey(
@@ -60,13 +79,57 @@ class Post(models.Model):
         null=True,
         help_text='Загрузите картинку'
     )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Число комментариев'
+    )
+    thumbnails = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Адреса миниатюр (JSON)'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='post_feed_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_feed_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super().from_db(db, field_names, values)
+        # Группа при загрузке: сигнал переноса поста не запрашивает её.
+        if 'group_id' in field_names:
+            post._loaded_group_id = post.group_id
+        return post
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        if fields is None or {'group', 'group_id'} & set(fields):
+            self._loaded_group_id = self.group_id
+
+    @property
+    def thumbnail_urls(self):
+        """Готовые миниатюры картинки: {вариант: адрес}."""
+        return json.loads(self.thumbnails) if self.thumbnails else {}
+
 
 class Comment(models.Model):
     """Модель комментарие"""
@@ -90,10 +153,18 @@ class Comment(models.Model):
         help_text='Введите текст комментария',
     )
     created = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         verbose_name='Дата комментария'
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['post', 'created', 'id'], name='comment_post_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.text
 
@@ -111,3 +182,80 @@ class Follow(models.Model):
         related_name='follower',
         verbose_name='Подписчик'
     )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'], name='unique_follow'
+            ),
+        ]
+
+
+class SearchTerm(models.Model):
+    """Терм поискового индекса, если в SQLite нет FTS5."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_terms',
+        verbose_name='Пост'
+    )
+    term = models.CharField(
+        max_length=64,
+        verbose_name='Слово'
+    )
+    weight = models.PositiveIntegerField(
+        verbose_name='Вес'
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['term', 'post']),
+        ]
+
+
+class UserStats(models.Model):
+    """Счётчики пользователя, которые обновляются вместе с данными."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь'
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число постов'
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число подписчиков'
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число подписок'
+    )
+
+
+class TimelineEntry(models.Model):
+    """Запись персональной ленты подписок (fan-out при публикации)."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Владелец ленты'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации поста',
+    )
+
+    class Meta:
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(fields=['user', '-pub_date']),
+        ]
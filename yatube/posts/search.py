@@ -0,0 +1,191 @@
+"""Полнотекстовый поиск по постам и комментариям.
+
+Документ индекса — пост: его текст и тексты комментариев к нему.
+Если SQLite собран с FTS5, индекс хранится в виртуальной таблице
+posts_search_fts и ранжируется bm25; иначе используется таблица
+термов SearchTerm. Индекс обновляется сигналами при сохранении и
+удалении постов и комментариев.
+"""
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Sum
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Comment, Post, SearchTerm
+
+FTS_TABLE: str = 'posts_search_fts'
+# Совпадение в тексте поста весит больше, чем в комментарии.
+TEXT_WEIGHT: int = 2
+COMMENT_WEIGHT: int = 1
+SNIPPET_LENGTH: int = 300
+
+WORD_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Слова текста в нижнем регистре."""
+    return [word.lower() for word in WORD_RE.findall(text or '')]
+
+
+def fts_available():
+    """Есть ли в базе таблица FTS5 (её создаёт миграция).
+
+    Ответ запоминается на соединении до переподключения или миграций
+    (forget_fts), а не проверяется при каждом поиске и сохранении.
+    """
+    if connection.vendor != 'sqlite':
+        return False
+    available = getattr(connection, 'fts_available', None)
+    if available is None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master "
+                "WHERE type = 'table' AND name = %s",
+                [FTS_TABLE],
+            )
+            available = cursor.fetchone() is not None
+        connection.fts_available = available
+    return available
+
+
+def forget_fts(connection):
+    """Сбрасывает запомненный ответ fts_available() для соединения."""
+    connection.fts_available = None
+
+
+def use_fts():
+    backend = settings.SEARCH_BACKEND
+    if backend == 'auto':
+        return fts_available()
+    return backend == 'fts5'
+
+
+def _document(post_id):
+    text = Post.objects.filter(pk=post_id).values_list(
+        'text', flat=True
+    ).first()
+    comments = Comment.objects.filter(post=post_id).values_list(
+        'text', flat=True
+    )
+    return text, list(comments)
+
+
+def index_post(post_id):
+    """Переиндексирует пост вместе с его комментариями."""
+    text, comments = _document(post_id)
+    if text is None:
+        remove_post(post_id)
+        return
+    if use_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text, comments) '
+                'VALUES (%s, %s, %s)',
+                [post_id, text, '\n'.join(comments)],
+            )
+        return
+    weights = Counter()
+    for term in tokenize(text):
+        weights[term] += TEXT_WEIGHT
+    for comment in comments:
+        for term in tokenize(comment):
+            weights[term] += COMMENT_WEIGHT
+    SearchTerm.objects.filter(post=post_id).delete()
+    SearchTerm.objects.bulk_create(
+        [
+            SearchTerm(post_id=post_id, term=term[:64], weight=weight)
+            for term, weight in weights.items()
+        ],
+        batch_size=500,
+    )
+
+
+def remove_post(post_id):
+    """Убирает пост из индекса."""
+    if use_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+            )
+    else:
+        SearchTerm.objects.filter(post=post_id).delete()
+
+
+def rebuild():
+    """Строит индекс заново по всем постам, возвращает их число."""
+    if use_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text, comments) '
+                'SELECT p.id, p.text, COALESCE(('
+                "SELECT group_concat(c.text, char(10)) "
+                'FROM posts_comment c WHERE c.post_id = p.id'
+                "), '') FROM posts_post p"
+            )
+        return Post.objects.count()
+    SearchTerm.objects.all().delete()
+    total = 0
+    for post_id in Post.objects.values_list('pk', flat=True).iterator():
+        index_post(post_id)
+        total += 1
+    return total
+
+
+def search_posts(query, limit=None):
+    """Id постов по запросу, от самых релевантных. Все слова обязательны."""
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return []
+    limit = limit or settings.SEARCH_MAX_RESULTS
+    if use_fts():
+        match = ' '.join(f'"{term}"' for term in terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, %s, %s), rowid DESC '
+                'LIMIT %s',
+                [match, TEXT_WEIGHT, COMMENT_WEIGHT, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+    return list(
+        SearchTerm.objects.filter(term__in=terms)
+        .values('post')
+        .annotate(
+            score=Sum('weight'),
+            matched=Count('term'),
+        )
+        .filter(matched=len(terms))
+        .order_by('-score', '-post_id')
+        .values_list('post', flat=True)[:limit]
+    )
+
+
+def highlight(text, query):
+    """Фрагмент текста с найденными словами в <mark>, HTML экранирован."""
+    terms = set(tokenize(query))
+    start = 0
+    for match in WORD_RE.finditer(text):
+        if match.group().lower() in terms:
+            start = max(match.start() - SNIPPET_LENGTH // 3, 0)
+            break
+    snippet = text[start:start + SNIPPET_LENGTH]
+    parts = []
+    position = 0
+    for match in WORD_RE.finditer(snippet):
+        if match.group().lower() in terms:
+            parts.append(escape(snippet[position:match.start()]))
+            parts.append(f'<mark>{escape(match.group())}</mark>')
+            position = match.end()
+    parts.append(escape(snippet[position:]))
+    prefix = '…' if start else ''
+    suffix = '…' if start + SNIPPET_LENGTH < len(text) else ''
+    return mark_safe(prefix + ''.join(parts) + suffix)
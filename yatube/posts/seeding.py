@@ -0,0 +1,185 @@
+"""Синтетические данные для нагрузочных замеров.
+
+Объекты создаются пачками через bulk_create, тексты берутся из заранее
+сгенерированного Faker набора. Распределения неравномерные, как в живой
+соцсети: у немногих авторов большая часть постов и подписчиков,
+у немногих постов большая часть комментариев (закон Ципфа).
+bulk_create не шлёт сигналов, поэтому после загрузки счётчики,
+поисковый индекс и ленты строятся заново — refresh_derived().
+"""
+import itertools
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+from faker import Faker
+
+from core import page_cache
+
+from . import cache, counters, search, timeline
+from .models import Comment, Follow, Group, Post, User
+from .utils import batched
+
+BATCH_SIZE: int = 500
+# Сколько разных текстов генерирует Faker; дальше они повторяются.
+TEXT_POOL_SIZE: int = 1000
+# Доля постов без группы.
+NO_GROUP_SHARE: float = 0.3
+
+
+def zipf_cum_weights(total, skew):
+    """Накопленные веса рангов 1..total по закону Ципфа."""
+    return list(itertools.accumulate(
+        1 / rank ** skew for rank in range(1, total + 1)
+    ))
+
+
+class Seeder:
+    """Генератор пользователей, групп, постов, комментариев и подписок."""
+
+    def __init__(self, prefix='seed', seed=None, skew=1.1, days=365,
+                 batch_size=BATCH_SIZE):
+        self.prefix = prefix
+        self.skew = skew
+        self.days = days
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self._weights = {}
+        fake = Faker('ru_RU')
+        fake.seed_instance(seed)
+        self.texts = [
+            fake.paragraph(nb_sentences=4) for _ in range(TEXT_POOL_SIZE)
+        ]
+        self.comment_texts = [fake.sentence() for _ in range(TEXT_POOL_SIZE)]
+        self.names = [
+            (fake.first_name(), fake.last_name())
+            for _ in range(TEXT_POOL_SIZE)
+        ]
+        self.now = timezone.now()
+
+    def _skewed(self, population, k):
+        """k случайных элементов, популярность которых падает по Ципфу."""
+        total = len(population)
+        if total not in self._weights:
+            self._weights[total] = zipf_cum_weights(total, self.skew)
+        cum_weights = self._weights[total]
+        return self.random.choices(population, cum_weights=cum_weights, k=k)
+
+    def _date(self):
+        return self.now - timedelta(
+            seconds=self.random.randint(0, self.days * 24 * 60 * 60)
+        )
+
+    def _date_after(self, start):
+        """Дата между start и моментом генерации."""
+        seconds = max(int((self.now - start).total_seconds()), 0)
+        return start + timedelta(seconds=self.random.randint(0, seconds))
+
+    def _bulk(self, model, objects):
+        for batch in batched(objects, self.batch_size):
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+
+    def seeded_users(self):
+        return list(
+            User.objects.filter(username__startswith=f'{self.prefix}_')
+            .values_list('pk', flat=True)
+        )
+
+    def users(self, total):
+        start = User.objects.filter(
+            username__startswith=f'{self.prefix}_'
+        ).count()
+        password = make_password(None)
+        self._bulk(User, (
+            User(
+                username=f'{self.prefix}_{start + i}',
+                first_name=first_name,
+                last_name=last_name,
+                password=password,
+            )
+            for i, (first_name, last_name) in zip(
+                range(total), itertools.cycle(self.names)
+            )
+        ))
+        return self.seeded_users()
+
+    def groups(self, total):
+        start = Group.objects.filter(
+            slug__startswith=f'{self.prefix}-'
+        ).count()
+        self._bulk(Group, (
+            Group(
+                title=f'Группа {start + i}',
+                slug=f'{self.prefix}-{start + i}',
+                description=self.random.choice(self.texts),
+            )
+            for i in range(total)
+        ))
+        return list(
+            Group.objects.filter(slug__startswith=f'{self.prefix}-')
+            .values_list('pk', flat=True)
+        )
+
+    def posts(self, total, user_ids, group_ids):
+        authors = user_ids[:]
+        self.random.shuffle(authors)
+        groups = group_ids or [None]
+        for batch in batched(range(total), self.batch_size):
+            picked = self._skewed(authors, len(batch))
+            Post.objects.bulk_create([
+                Post(
+                    text=self.random.choice(self.texts),
+                    author_id=author_id,
+                    group_id=(
+                        None if self.random.random() < NO_GROUP_SHARE
+                        else self.random.choice(groups)
+                    ),
+                    pub_date=self._date(),
+                )
+                for author_id in picked
+            ])
+
+    def comments(self, total, user_ids, posts):
+        """Комментарии к posts — парам (id, pub_date), не раньше поста."""
+        posts = posts[:]
+        self.random.shuffle(posts)
+        for batch in batched(range(total), self.batch_size):
+            picked = self._skewed(posts, len(batch))
+            Comment.objects.bulk_create([
+                Comment(
+                    post_id=post_id,
+                    author_id=self.random.choice(user_ids),
+                    text=self.random.choice(self.comment_texts),
+                    created=self._date_after(pub_date),
+                )
+                for post_id, pub_date in picked
+            ])
+
+    def follows(self, per_user, user_ids):
+        """Каждый читатель подписан в среднем на per_user авторов."""
+        authors = user_ids[:]
+        self.random.shuffle(authors)
+
+        def generate():
+            for reader in user_ids:
+                count = self.random.randint(0, per_user * 2)
+                for author in set(self._skewed(authors, count)):
+                    if author != reader:
+                        yield Follow(user_id=reader, author_id=author)
+
+        self._bulk(Follow, generate())
+
+
+def refresh_derived():
+    """Пересчитывает всё, что обычно поддерживают сигналы."""
+    # Версия ленты входит в ключи всех фрагментов, включая страницы постов.
+    cache.bump(cache.FEED_SCOPE, cache.COMMENTS_SCOPE)
+    page_cache.purge(page_cache.ALL)
+    return {
+        'user_stats': counters.recount_users(),
+        'comment_counts': counters.recount_comments(),
+        'group_counts': counters.recount_groups(),
+        'search_index': search.rebuild(),
+        'timeline_entries': timeline.rebuild(),
+    }
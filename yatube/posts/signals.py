@@ -0,0 +1,169 @@
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (post_delete, post_migrate, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from core import page_cache
+
+from . import cache, counters, live, search, thumbnails, timeline
+from .models import Comment, Follow, Group, Post, User, UserStats
+
+
+@receiver(post_save, sender=User)
+def user_created(sender, instance, created, **kwargs):
+    """У нового пользователя сразу есть строка счётчиков."""
+    if created:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def post_published(sender, instance, created, **kwargs):
+    """Новый пост учитывается в счётчике, попадает в ленты подписчиков
+    и рассылается открытым живым лентам.
+    """
+    if created:
+        counters.change_user_stats(instance.author_id, posts_count=1)
+        counters.change_group_posts(instance.group_id, 1)
+        timeline.fan_out(instance)
+        live.publish(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.change_user_stats(instance.author_id, posts_count=-1)
+    counters.change_group_posts(instance.group_id, -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    """Любое изменение поста сбрасывает кеш лент и страницы поста."""
+    cache.invalidate_post(instance)
+
+
+@receiver(pre_save, sender=Post)
+def post_regrouping(sender, instance, **kwargs):
+    """Запоминает группу, в которой пост был до сохранения.
+
+    Новый пост ни в какой группе не был, у загруженного из базы группа
+    известна с загрузки; запрос нужен, только если её не загружали.
+    """
+    if instance._state.adding:
+        previous = None
+    elif hasattr(instance, '_loaded_group_id'):
+        previous = instance._loaded_group_id
+    else:
+        previous = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', flat=True).first()
+    instance._previous_group_id = previous
+
+
+@receiver(post_save, sender=Post)
+def post_regrouped(sender, instance, created, **kwargs):
+    """Пост, перенесённый в другую группу, уходит со страницы старой
+    и переходит в счётчик новой.
+    """
+    old = getattr(instance, '_previous_group_id', None)
+    instance._loaded_group_id = instance.group_id
+    if created or old == instance.group_id:
+        return
+    counters.change_group_posts(old, -1)
+    counters.change_group_posts(instance.group_id, 1)
+    if old:
+        page_cache.purge(cache.group_scope(old))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    """Название группы есть на карточках постов всех страниц."""
+    cache.bump(cache.FEED_SCOPE)
+    page_cache.purge(page_cache.ALL)
+
+
+@receiver(post_save, sender=Post)
+def post_indexed(sender, instance, **kwargs):
+    search.index_post(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def post_image_saved(sender, instance, **kwargs):
+    """Новая или заменённая картинка отправляется на построение миниатюр."""
+    if thumbnails.needs_update(instance):
+        thumbnails.schedule(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_unindexed(sender, instance, **kwargs):
+    search.remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created and instance.post_id:
+        counters.change_comments_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if instance.post_id:
+        counters.change_comments_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    """Комментарий сбрасывает кеш поста и меняет его поисковый документ."""
+    if instance.post_id:
+        cache.bump(
+            cache.post_scope(instance.post_id), cache.COMMENTS_SCOPE
+        )
+        page_cache.purge(cache.post_scope(instance.post_id))
+        search.index_post(instance.post_id)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    """При подписке растут счётчики, а лента дополняется постами автора."""
+    if created:
+        counters.change_user_stats(instance.author_id, followers_count=1)
+        counters.change_user_stats(instance.user_id, following_count=1)
+        timeline.backfill(instance.user_id, instance.author_id)
+        follow_changed(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    """При отписке уменьшаются счётчики, посты автора уходят из ленты.
+    Автор, опустившийся до порога раскладки, переходит в ленты
+    оставшихся подписчиков.
+    """
+    counters.change_user_stats(instance.author_id, followers_count=-1)
+    counters.change_user_stats(instance.user_id, following_count=-1)
+    timeline.forget(instance.user_id, instance.author_id)
+    timeline.follower_lost(instance.author_id)
+    follow_changed(instance)
+
+
+def follow_changed(follow):
+    """Счётчики подписок видны на страницах обоих пользователей,
+    а посты автора появляются в ленте подписок читателя или уходят из неё.
+    """
+    cache.bump(cache.timeline_scope(follow.user_id))
+    page_cache.purge(
+        cache.author_scope(follow.author_id),
+        cache.author_scope(follow.user_id),
+    )
+
+
+@receiver(connection_created)
+def search_connection_created(sender, connection, **kwargs):
+    search.forget_fts(connection)
+
+
+@receiver(post_migrate)
+def search_migrated(sender, using, **kwargs):
+    """Миграции создают и удаляют таблицу FTS5."""
+    search.forget_fts(connections[using])
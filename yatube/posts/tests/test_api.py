@@ -0,0 +1,258 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class FeedApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Пост', author=cls.author, group=cls.group
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_feeds_return_posts(self):
+        """Все ленты отдают посты в JSON."""
+        urls = (
+            (self.client, reverse('api:index')),
+            (self.client, reverse('api:group_posts', args=('group',))),
+            (self.client, reverse('api:profile', args=('auth',))),
+            (self.reader_client, reverse('api:follow')),
+        )
+        for client, url in urls:
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertEqual(response.status_code, 200)
+                post = response.json()['results'][0]
+                self.assertEqual(post['id'], self.post.pk)
+                self.assertEqual(post['author']['username'], 'auth')
+                self.assertEqual(post['group']['slug'], 'group')
+                self.assertEqual(
+                    post['api_url'], reverse('api:post', args=(post['id'],))
+                )
+
+    def test_not_found_and_anonymous(self):
+        """Несуществующие объекты — 404, подписки анонима — 401."""
+        for url in (
+            reverse('api:group_posts', args=('missing',)),
+            reverse('api:profile', args=('missing',)),
+            reverse('api:post', args=(self.post.pk + 100,)),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(
+            self.client.get(reverse('api:follow')).status_code, 401
+        )
+
+    def test_etag_not_modified(self):
+        """Повтор с If-None-Match — 304 без выборки постов."""
+        url = reverse('api:index')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_last_modified_not_modified(self):
+        url = reverse('api:index')
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes(self):
+        """Новый пост, правка поста и другой курсор меняют ETag."""
+        url = reverse('api:index')
+        etag = self.client.get(url)['ETag']
+        Post.objects.create(text='Новый', author=self.author)
+        new_etag = self.client.get(url)['ETag']
+        self.assertNotEqual(new_etag, etag)
+        self.post.text = 'Правка'
+        self.post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=new_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(
+            self.client.get(url, {'cursor': 'abc'})['ETag'],
+            response['ETag'],
+        )
+
+    def test_etag_changes_with_comments_and_follows(self):
+        """Новый комментарий и отписка меняют ответ, а с ним ETag."""
+        # Самый новый пост ленты подписок после отписки не меняется.
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=self.reader, author=other)
+        Post.objects.create(text='Новее', author=other)
+        cases = (
+            (reverse('api:index'), lambda: Comment.objects.create(
+                post=self.post, author=self.reader, text='Комментарий'
+            )),
+            (reverse('api:follow'), lambda: Follow.objects.filter(
+                user=self.reader, author=self.author
+            ).delete()),
+        )
+        for url, change in cases:
+            with self.subTest(url=url):
+                response = self.reader_client.get(url)
+                change()
+                repeated = self.reader_client.get(
+                    url,
+                    HTTP_IF_NONE_MATCH=response['ETag'],
+                    HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+                )
+                self.assertEqual(repeated.status_code, 200)
+                self.assertNotEqual(repeated.json(), response.json())
+
+    def test_follow_etag_depends_on_reader(self):
+        other = Client()
+        other.force_login(User.objects.create_user(username='other'))
+        url = reverse('api:follow')
+        self.assertNotEqual(
+            self.reader_client.get(url)['ETag'], other.get(url)['ETag']
+        )
+
+    def test_cursor_pagination(self):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.author) for i in range(12)
+        )
+        url = reverse('api:index')
+        first = self.client.get(url).json()
+        self.assertEqual(len(first['results']), 10)
+        self.assertIsNotNone(first['next_cursor'])
+        second = self.client.get(url, {'cursor': first['next_cursor']})
+        ids = [post['id'] for post in second.json()['results']]
+        self.assertEqual(len(ids), 3)
+        self.assertFalse(
+            set(ids) & {post['id'] for post in first['results']}
+        )
+
+    def test_post_detail(self):
+        url = reverse('api:post', args=(self.post.pk,))
+        response = self.client.get(url)
+        self.assertEqual(response.json()['text'], 'Пост')
+        etag = response['ETag']
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+        self.post.text = 'Правка'
+        self.post.save()
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+
+    def test_read_only(self):
+        response = self.client.post(reverse('api:index'))
+        self.assertEqual(response.status_code, 405)
+
+
+class NewPostsApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Пост', author=cls.author, group=cls.group
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def poll_url(self, client, url):
+        return client.get(url).json()['new_posts']
+
+    def test_poll_returns_only_new_posts(self):
+        """Опрос отдаёт только посты новее известного клиенту."""
+        feeds = (
+            (self.client, reverse('api:index')),
+            (self.client, reverse('api:group_posts', args=('group',))),
+            (self.client, reverse('api:profile', args=('auth',))),
+            (self.reader_client, reverse('api:follow')),
+        )
+        polls = [
+            (client, self.poll_url(client, url)) for client, url in feeds
+        ]
+        for client, poll in polls:
+            self.assertEqual(client.get(poll).json()['results'], [])
+        new = Post.objects.create(
+            text='Новый', author=self.author, group=self.group
+        )
+        for client, poll in polls:
+            with self.subTest(poll=poll):
+                data = client.get(poll).json()
+                self.assertEqual(
+                    [post['id'] for post in data['results']], [new.pk]
+                )
+                self.assertFalse(data['truncated'])
+                self.assertEqual(client.get(data['next']).json()['results'],
+                                 [])
+
+    def test_same_pub_date_uses_id(self):
+        poll = self.poll_url(self.client, reverse('api:index'))
+        twin = Post.objects.create(text='Двойник', author=self.author)
+        Post.objects.filter(pk=twin.pk).update(pub_date=self.post.pub_date)
+        results = self.client.get(poll).json()['results']
+        self.assertEqual([post['id'] for post in results], [twin.pk])
+
+    @mock.patch('posts.api.NEW_POSTS_LIMIT', 3)
+    def test_poll_is_bounded(self):
+        poll = self.poll_url(self.client, reverse('api:index'))
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.author) for i in range(5)
+        )
+        with self.assertNumQueries(1):
+            data = self.client.get(poll).json()
+        self.assertEqual(len(data['results']), 3)
+        self.assertTrue(data['truncated'])
+        newest = Post.objects.order_by('-pub_date', '-pk').first()
+        self.assertEqual(data['results'][0]['id'], newest.pk)
+
+    def test_errors(self):
+        url = reverse('api:index_new')
+        self.assertEqual(self.client.get(url).status_code, 400)
+        for since in ('вчера', '2020-13-01T00:00', '2020-02-30T25:00'):
+            with self.subTest(since=since):
+                self.assertEqual(
+                    self.client.get(url, {'since': since}).status_code, 400
+                )
+        self.assertEqual(
+            self.client.get(
+                reverse('api:follow_new'), {'since': '2020-01-01T00:00'}
+            ).status_code,
+            401,
+        )
+        self.assertEqual(
+            self.client.get(
+                reverse('api:group_posts_new', args=('missing',)),
+                {'since': '2020-01-01T00:00'},
+            ).status_code,
+            404,
+        )
+        response = self.client.get(url, {'since': '2020-01-01T00:00'})
+        self.assertEqual(
+            [post['id'] for post in response.json()['results']],
+            [self.post.pk],
+        )
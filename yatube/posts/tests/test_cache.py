@@ -3,7 +3,7 @@ from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 
-from ..models import Group, Post
+from ..models import Comment, Group, Post
 
 User = get_user_model()
 
@@ -30,12 +30,51 @@ class CacheTests(TestCase):
     def test_cach_index(self):
         """Проверка кеширования для index."""
         response = self.guest_client.get(reverse('posts:index')).content
-        Post.objects.create(
-            text='Новый пост',
-            author=self.user,
-        )
+        Post.objects.filter(pk=self.post.pk).update(text='Изменён в обход')
         response_2 = self.guest_client.get(reverse('posts:index')).content
         self.assertEqual(response_2, response)
         cache.clear()
         response_3 = self.guest_client.get(reverse('posts:index')).content
         self.assertNotEqual(response_2, response_3)
+
+    def test_new_post_invalidates_cache(self):
+        """Новый пост сразу виден на закешированных страницах."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': 'test_slug'}),
+            reverse('posts:profile', kwargs={'username': 'auth'}),
+        )
+        for url in urls:
+            self.guest_client.get(url)
+        Post.objects.create(
+            text='Новый пост',
+            author=self.user,
+            group=self.group,
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(self.guest_client.get(url), 'Новый пост')
+
+    def test_comment_invalidates_post_detail(self):
+        """Новый комментарий сразу виден на странице поста."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        self.guest_client.get(url)
+        Comment.objects.create(
+            post=self.post,
+            author=self.user,
+            text='Свежий комментарий',
+        )
+        self.assertContains(self.guest_client.get(url), 'Свежий комментарий')
+
+    def test_pages_cached_separately(self):
+        """Каждая страница ленты кешируется под своим ключом."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост номер {i}') for i in range(11)
+        )
+        cache.clear()
+        first_page = self.guest_client.get(reverse('posts:index'))
+        second_page = self.guest_client.get(
+            reverse('posts:index'), {'page': 2}
+        )
+        self.assertNotEqual(first_page.content, second_page.content)
+        self.assertContains(second_page, 'Тестовый пост')
@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Post
+
+User = get_user_model()
+
+
+@mock.patch('posts.utils.COMMENTS_ON_THE_PAGE', 3)
+class CommentsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+        self.url = reverse('posts:comments', args=(self.post.pk,))
+
+    def add_comments(self, total):
+        start = Comment.objects.count()
+        readers = [
+            User.objects.create_user(username=f'reader{start + i}')
+            for i in range(total)
+        ]
+        return [
+            Comment.objects.create(
+                post=self.post, author=reader,
+                text=f'Комментарий {start + i}'
+            )
+            for i, reader in enumerate(readers)
+        ]
+
+    def detail_queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(
+                reverse('posts:post_detail', args=(self.post.pk,))
+            )
+        return len(queries)
+
+    def test_post_detail_shows_first_page(self):
+        """На странице поста только первые комментарии, без N+1."""
+        self.add_comments(2)
+        few = self.detail_queries()
+        comments = self.add_comments(5)
+        self.assertEqual(self.detail_queries(), few)
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,))
+        )
+        self.assertEqual(len(response.context['comments']), 3)
+        self.assertNotContains(response, comments[-1].text)
+        self.assertContains(response, 'data-comments-more')
+
+    def test_list_follows_cursor(self):
+        """Курсор проходит все комментарии по порядку и без повторов."""
+        comments = self.add_comments(7)
+        url, texts = self.url, []
+        while url:
+            data = self.client.get(url).json()
+            texts += [comment['text'] for comment in data['comments']]
+            url = data['next_url']
+        self.assertEqual(texts, [comment.text for comment in comments])
+
+    def test_create(self):
+        """Комментарий создаётся запросом к JSON API."""
+        response = self.authorized_client.post(self.url, {'text': 'Новый'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['author'], 'auth')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+
+    def test_create_errors(self):
+        """Гостю и пустому тексту отвечают ошибкой в JSON."""
+        response = self.client.post(self.url, {'text': 'Гость'})
+        self.assertEqual(response.status_code, 403)
+        response = self.authorized_client.post(self.url, {'text': ''})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('text', response.json()['errors'])
+        self.assertFalse(Comment.objects.exists())
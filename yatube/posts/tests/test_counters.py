@@ -0,0 +1,131 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, UserStats
+from ..signals import post_regrouping
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.author = User.objects.create_user(username='writer')
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.author)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(CountersTests.user)
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_posts_count(self):
+        """Счётчик постов меняется при создании и удалении поста."""
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        post = Post.objects.create(text='Ещё пост', author=self.author)
+        self.assertEqual(self.stats(self.author).posts_count, 2)
+        post.delete()
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+
+    def test_group_posts_count(self):
+        """Счётчик группы следует за созданием, переносом и удалением."""
+        first, second = (
+            Group.objects.create(title=slug, slug=slug, description='')
+            for slug in ('first', 'second')
+        )
+
+        def counts():
+            return list(
+                Group.objects.filter(pk__in=(first.pk, second.pk))
+                .order_by('pk').values_list('posts_count', flat=True)
+            )
+
+        post = Post.objects.create(
+            text='В группе', author=self.author, group=first
+        )
+        self.assertEqual(counts(), [1, 0])
+        post.group = second
+        post.save()
+        self.assertEqual(counts(), [0, 1])
+        post.text = 'Правка'
+        post.save()
+        self.assertEqual(counts(), [0, 1])
+        post.delete()
+        self.assertEqual(counts(), [0, 0])
+
+    def test_regrouping_without_extra_query(self):
+        """Группа до сохранения известна с загрузки поста: новые
+        и загруженные посты сохраняются без запроса старой группы.
+        """
+        group = Group.objects.create(title='Группа', slug='group')
+        with self.assertNumQueries(0):
+            post_regrouping(Post, Post(text='Новый', author=self.author))
+        post = Post.objects.get(pk=self.post.pk)
+        with self.assertNumQueries(0):
+            post_regrouping(Post, post)
+        # После refresh_from_db группой до сохранения считается новая.
+        Post.objects.filter(pk=post.pk).update(group=group)
+        post.refresh_from_db()
+        post.save()
+        group.refresh_from_db()
+        self.assertEqual(group.posts_count, 0)
+
+    def test_comments_count(self):
+        """Счётчик комментариев растёт после add_comment."""
+        self.authorized_client.post(
+            reverse('posts:add_comment', args=(self.post.id,)),
+            {'text': 'Комментарий'}
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+        Comment.objects.get(post=self.post).delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 0)
+        group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.filter(pk=self.post.pk).update(group=group)
+        call_command('recount_stats', stdout=StringIO())
+        group.refresh_from_db()
+        self.assertEqual(group.posts_count, 1)
+
+    def test_follow_counts(self):
+        """Подписка и отписка меняют счётчики обеих сторон."""
+        url_kwargs = {'username': self.author.username}
+        self.authorized_client.get(
+            reverse('posts:profile_follow', kwargs=url_kwargs)
+        )
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.user).following_count, 1)
+        self.authorized_client.get(
+            reverse('posts:profile_unfollow', kwargs=url_kwargs)
+        )
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.user).following_count, 0)
+
+    def test_user_delete(self):
+        """Пользователь с постами и подписками удаляется без ошибок."""
+        Follow.objects.create(user=self.user, author=self.author)
+        self.author.delete()
+        self.assertEqual(self.stats(self.user).following_count, 0)
+
+    def test_recount_stats_command(self):
+        """recount_stats исправляет разошедшиеся счётчики."""
+        UserStats.objects.filter(user=self.author).update(posts_count=7)
+        UserStats.objects.filter(user=self.user).delete()
+        Post.objects.filter(pk=self.post.pk).update(comments_count=3)
+        call_command('recount_stats', stdout=StringIO())
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.user).posts_count, 0)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 0)
+        group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.filter(pk=self.post.pk).update(group=group)
+        call_command('recount_stats', stdout=StringIO())
+        group.refresh_from_db()
+        self.assertEqual(group.posts_count, 1)
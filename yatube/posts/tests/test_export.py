@@ -0,0 +1,107 @@
+import csv
+import json
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..export import rows
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='test_slug', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Пост, с запятой', author=cls.author, group=cls.group
+        )
+        Post.objects.create(text='Без группы', author=cls.reader)
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def export(self, *args):
+        out = StringIO()
+        call_command('export_data', *args, stdout=out)
+        return out.getvalue()
+
+    def test_jsonl(self):
+        """Посты выгружаются со связями по username и slug."""
+        lines = self.export('posts').splitlines()
+        self.assertEqual(len(lines), 2)
+        first = json.loads(lines[0])
+        self.assertEqual(first['id'], self.post.pk)
+        self.assertEqual(first['author'], 'auth')
+        self.assertEqual(first['group'], 'test_slug')
+        self.assertEqual(first['pub_date'], self.post.pub_date.isoformat())
+        self.assertIsNone(json.loads(lines[1])['group'])
+
+    def test_csv(self):
+        """CSV с заголовком и экранированием запятых."""
+        reader = csv.DictReader(
+            StringIO(self.export('posts', '--format=csv'))
+        )
+        self.assertEqual(
+            [row['text'] for row in reader],
+            ['Пост, с запятой', 'Без группы'],
+        )
+
+    def test_output_dir(self):
+        """С --output-dir каждый набор пишется в свой файл."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.export('--output-dir', directory)
+        for dataset, total in (
+            ('groups', 1), ('posts', 2), ('comments', 1), ('follows', 1)
+        ):
+            with open(f'{directory}/{dataset}.jsonl') as dump:
+                self.assertEqual(len(dump.readlines()), total)
+
+    def test_rows_are_streamed(self):
+        """Строки читаются итератором, а не списком."""
+        self.assertEqual(
+            next(rows('follows')), {'user': 'reader', 'author': 'auth'}
+        )
+
+    def test_streaming_view_for_staff(self):
+        """Выгрузка по ссылке доступна только персоналу и идёт потоком."""
+        url = reverse(
+            'posts:export', kwargs={'dataset': 'comments', 'format': 'csv'}
+        )
+        client = Client()
+        client.force_login(self.author)
+        self.assertEqual(client.get(url).status_code, 302)
+        client.force_login(
+            User.objects.create_user(username='admin', is_staff=True)
+        )
+        response = client.get(url)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn('Комментарий', content)
+
+    def test_admin_action(self):
+        """Действие админки выгружает выбранные посты."""
+        client = Client()
+        client.force_login(User.objects.create_superuser(
+            username='root', email='root@example.com', password='pass'
+        ))
+        response = client.post(
+            reverse('admin:posts_post_changelist'),
+            {'action': 'export_jsonl', '_selected_action': [self.post.pk]},
+        )
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(len(content.splitlines()), 1)
+        self.assertIn('attachment', response['Content-Disposition'])
@@ -1,8 +1,9 @@
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
-from ..models import Follow, Post
+from ..models import Follow, Post, TimelineEntry
+from ..timeline import rebuild, timeline_posts
 
 User = get_user_model()
 
@@ -68,3 +69,93 @@ class FollowTests(TestCase):
             )
         )
         self.assertEqual(Follow.objects.count(), 0)
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='writer')
+        cls.old_post = Post.objects.create(
+            text='Пост до подписки',
+            author=cls.author
+        )
+
+    def test_follow_backfills_timeline(self):
+        """Подписка добавляет в ленту уже опубликованные посты."""
+        Follow.objects.create(user=self.user, author=self.author)
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=self.user, post=self.old_post
+            ).exists()
+        )
+
+    def test_new_post_fanned_out(self):
+        """Новый пост попадает в ленту подписчика."""
+        Follow.objects.create(user=self.user, author=self.author)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertIn(post, timeline_posts(self.user))
+
+    def test_unfollow_clears_timeline(self):
+        """Отписка убирает посты автора из ленты."""
+        follow = Follow.objects.create(user=self.user, author=self.author)
+        follow.delete()
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.user).exists()
+        )
+
+    @override_settings(TIMELINE_SIZE=2)
+    def test_timeline_is_bounded(self):
+        """Лента обрезается до TIMELINE_SIZE записей."""
+        Follow.objects.create(user=self.user, author=self.author)
+        posts = [
+            Post.objects.create(text=f'Пост {i}', author=self.author)
+            for i in range(3)
+        ]
+        self.assertEqual(
+            set(timeline_posts(self.user)), set(posts[-2:])
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_author_pulled_on_read(self):
+        """Посты популярного автора читаются при запросе ленты."""
+        Follow.objects.create(user=self.user, author=self.author)
+        post = Post.objects.create(text='Пост звезды', author=self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertIn(post, timeline_posts(self.user))
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_author_below_limit_materialized(self):
+        """Посты, опубликованные, пока автор читался «на лету», остаются
+        в ленте, когда подписчиков становится не больше порога.
+        """
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=self.user, author=self.author)
+        follow = Follow.objects.create(user=other, author=self.author)
+        post = Post.objects.create(text='Пост звезды', author=self.author)
+        self.assertFalse(
+            TimelineEntry.objects.filter(post=post).exists()
+        )
+        follow.delete()
+        self.assertIn(post, timeline_posts(self.user))
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.user, post=post).exists()
+        )
+
+    @override_settings(TIMELINE_SIZE=2)
+    def test_rebuild_matches_fan_out(self):
+        """Пересборка лент даёт те же записи, что и сигналы."""
+        Follow.objects.create(user=self.user, author=self.author)
+        for i in range(3):
+            Post.objects.create(text=f'Пост {i}', author=self.author)
+        expected = set(TimelineEntry.objects.values_list(
+            'user', 'post', 'pub_date'
+        ))
+        self.assertEqual(rebuild(), 2)
+        self.assertEqual(
+            set(TimelineEntry.objects.values_list(
+                'user', 'post', 'pub_date'
+            )),
+            expected,
+        )
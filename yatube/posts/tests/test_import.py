@@ -0,0 +1,189 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from ..models import Comment, Follow, Group, Post, UserStats
+
+User = get_user_model()
+
+
+def write_jsonl(path, rows):
+    with open(path, 'w', encoding='utf-8') as dump:
+        for row in rows:
+            dump.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+class ImportDataTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.author = User.objects.create_user(username='auth')
+        self.reader = User.objects.create_user(username='reader')
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def run_import(self, *args):
+        out = StringIO()
+        call_command('import_data', *args, stdout=out)
+        return out.getvalue()
+
+    def test_round_trip(self):
+        """Выгрузка export_data загружается обратно без потерь."""
+        group = Group.objects.create(
+            title='Группа', slug='test_slug', description='Описание'
+        )
+        post = Post.objects.create(
+            text='Пост', author=self.author, group=group
+        )
+        Comment.objects.create(post=post, author=self.reader, text='Ок')
+        Follow.objects.create(user=self.reader, author=self.author)
+        call_command(
+            'export_data', '--output-dir', self.directory, stdout=StringIO()
+        )
+        Follow.objects.all().delete()
+        Post.objects.all().delete()
+        Group.objects.all().delete()
+
+        output = self.run_import(self.directory)
+
+        imported = Post.objects.get()
+        self.assertEqual(
+            (imported.pk, imported.text, imported.pub_date),
+            (post.pk, post.text, post.pub_date),
+        )
+        self.assertEqual(imported.group.slug, 'test_slug')
+        self.assertEqual(imported.comments_count, 1)
+        self.assertTrue(
+            Follow.objects.filter(user=self.reader, author=self.author)
+            .exists()
+        )
+        self.assertEqual(
+            UserStats.objects.get(user=self.author).followers_count, 1
+        )
+        self.assertIn('строк/с', output)
+
+    def test_csv(self):
+        """CSV загружается так же, как JSON Lines."""
+        with open(self.path('posts.csv'), 'w', encoding='utf-8') as dump:
+            dump.write(
+                'id,text,pub_date,author,group,image\n'
+                '10,"Пост, из CSV",2022-01-01T10:00:00+00:00,auth,,\n'
+            )
+        self.run_import(self.path('posts.csv'), '--no-refresh')
+        post = Post.objects.get(pk=10)
+        self.assertEqual(post.text, 'Пост, из CSV')
+        self.assertIsNone(post.group)
+        self.assertEqual(post.pub_date.year, 2022)
+
+    def test_unknown_users(self):
+        """Строки с неизвестными авторами пропускаются или их авторы
+        создаются по --create-users.
+        """
+        write_jsonl(self.path('posts.jsonl'), [
+            {'id': 1, 'text': 'Пост', 'author': 'stranger'},
+        ])
+        output = self.run_import(self.path('posts.jsonl'), '--no-refresh')
+        self.assertIn('пропущено: 1', output)
+        self.assertFalse(Post.objects.exists())
+        self.run_import(
+            self.path('posts.jsonl'), '--no-refresh', '--create-users'
+        )
+        self.assertEqual(Post.objects.get().author.username, 'stranger')
+
+    def test_resume_from_checkpoint(self):
+        """Повторный запуск продолжает с сохранённой позиции."""
+        write_jsonl(self.path('posts.jsonl'), [
+            {'id': pk, 'text': f'Пост {pk}', 'author': 'auth'}
+            for pk in (1, 2, 3)
+        ])
+        checkpoint = self.path('checkpoint.json')
+        with open(checkpoint, 'w') as progress:
+            json.dump({self.path('posts.jsonl'): 2}, progress)
+        self.run_import(
+            self.path('posts.jsonl'), '--no-refresh',
+            '--checkpoint', checkpoint,
+        )
+        self.assertEqual(
+            list(Post.objects.values_list('pk', flat=True)), [3]
+        )
+        with open(checkpoint) as progress:
+            self.assertEqual(
+                json.load(progress), {self.path('posts.jsonl'): 3}
+            )
+
+    def test_id_conflict(self):
+        """Занятый чужим постом id останавливает загрузку, а комментарии
+        из выгрузки не попадают к чужому посту.
+        """
+        Post.objects.create(pk=5, text='Свой пост', author=self.reader)
+        write_jsonl(self.path('posts.jsonl'), [
+            {'id': 5, 'text': 'Из выгрузки', 'author': 'auth'},
+        ])
+        write_jsonl(self.path('comments.jsonl'), [
+            {'id': 1, 'post': 5, 'text': 'К посту', 'author': 'reader'},
+        ])
+        with self.assertRaisesMessage(CommandError, 'id 5 уже заняты'):
+            self.run_import(self.directory, '--no-refresh')
+        self.assertEqual(Post.objects.get().text, 'Свой пост')
+        self.assertFalse(Comment.objects.exists())
+
+    def test_repeated_import(self):
+        """Повторная загрузка той же выгрузки ничего не дублирует."""
+        write_jsonl(self.path('posts.jsonl'), [
+            {'id': 5, 'text': 'Пост', 'author': 'auth'},
+        ])
+        write_jsonl(self.path('comments.jsonl'), [
+            {'id': 1, 'post': 5, 'text': 'Ок', 'author': 'reader'},
+        ])
+        for _ in range(2):
+            self.run_import(self.directory, '--no-refresh')
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(Comment.objects.count(), 1)
+
+
+class DeferIndexesTests(TransactionTestCase):
+    def test_indexes_restored(self):
+        """С --defer-indexes индексы лент снимаются и строятся заново."""
+        User.objects.create_user(username='auth')
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        write_jsonl(os.path.join(directory, 'posts.jsonl'), [
+            {'id': 1, 'text': 'Пост', 'author': 'auth'},
+        ])
+        out = StringIO()
+        call_command(
+            'import_data', directory, '--defer-indexes', stdout=out
+        )
+        self.assertIn('Сняты индексы: post_feed_idx', out.getvalue())
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Post._meta.db_table
+            )
+        self.assertIn('post_feed_idx', constraints)
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_indexes_restored_after_error(self):
+        User.objects.create_user(username='auth')
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        write_jsonl(os.path.join(directory, 'posts.jsonl'), [
+            {'id': 1, 'text': 'Пост', 'author': 'auth', 'pub_date': 'вчера'},
+        ])
+        with self.assertRaises(ValueError):
+            call_command(
+                'import_data', directory, '--defer-indexes',
+                stdout=StringIO(),
+            )
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Post._meta.db_table
+            )
+        self.assertIn('post_feed_idx', constraints)
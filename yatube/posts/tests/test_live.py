@@ -0,0 +1,153 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.pubsub import broker
+
+from .. import live
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+
+QUICK_EVENTS = dict(
+    settings.LIVE_EVENTS, HEARTBEAT=0.05, STREAM_TIMEOUT=0.2, POLL_TIMEOUT=0.1
+)
+
+
+class PublishTests(TransactionTestCase):
+    def test_new_post_is_published_after_commit(self):
+        """Новый пост уходит в каналы общей ленты, группы и автора."""
+        author = User.objects.create_user(username='auth')
+        group = Group.objects.create(title='Группа', slug='group')
+        last = broker().last_id()
+        post = Post.objects.create(text='Пост', author=author, group=group)
+        post.text = 'Правка'
+        post.save()
+        for channel in (
+            live.GLOBAL_CHANNEL,
+            live.group_channel(group.pk),
+            live.author_channel(author.pk),
+        ):
+            with self.subTest(channel=channel):
+                _, events = broker().wait([channel], last, timeout=0)
+                self.assertEqual(
+                    [data['id'] for _, data in events], [post.pk]
+                )
+
+
+@override_settings(LIVE_EVENTS=QUICK_EVENTS)
+class LiveFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.other_group = Group.objects.create(title='Другая', slug='other')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def publish(self, group=None, author=None):
+        post = Post(
+            pk=broker().last_id() + 1000, text='Пост',
+            author=author or self.author, group=group,
+        )
+        return broker().publish(live.post_channels(post), {'id': post.pk})
+
+    def stream(self, client, url, last_event_id):
+        response = client.get(url, HTTP_LAST_EVENT_ID=str(last_event_id))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return b''.join(response.streaming_content).decode()
+
+    def test_stream_sends_feed_events(self):
+        """Поток группы получает только события своей группы."""
+        last = broker().last_id()
+        mine = self.publish(group=self.group)
+        self.publish(group=self.other_group)
+        body = self.stream(
+            self.client,
+            reverse('api:group_posts_events', args=('group',)),
+            last,
+        )
+        self.assertTrue(body.startswith('retry: '))
+        self.assertEqual(body.count('event: post'), 1)
+        self.assertIn(f'id: {mine}\nevent: post\ndata: ', body)
+        self.assertIn(': ping', body)
+
+    def test_follow_stream_uses_followed_authors(self):
+        last = broker().last_id()
+        self.publish(author=self.author)
+        self.publish(author=self.reader)
+        body = self.stream(self.reader_client, reverse('api:follow_events'),
+                           last)
+        self.assertEqual(body.count('event: post'), 1)
+
+    def test_long_poll(self):
+        """Первый опрос сообщает номер, следующий ждёт событий после него."""
+        url = reverse('api:index_events_poll')
+        first = self.client.get(url).json()
+        self.assertEqual(first['events'], [])
+        event_id = self.publish()
+        data = self.client.get(first['next']).json()
+        self.assertEqual(
+            [event['event_id'] for event in data['events']], [event_id]
+        )
+        self.assertEqual(data['last_id'], event_id)
+        empty = self.client.get(data['next']).json()
+        self.assertEqual(empty['events'], [])
+        self.assertEqual(empty['last_id'], event_id)
+
+    def test_errors(self):
+        self.assertEqual(
+            self.client.get(reverse('api:follow_events')).status_code, 401
+        )
+        self.assertEqual(
+            self.client.get(
+                reverse('api:follow_events_poll'), {'after': 0}
+            ).status_code,
+            401,
+        )
+        self.assertEqual(
+            self.client.get(
+                reverse('api:profile_events', args=('missing',))
+            ).status_code,
+            404,
+        )
+
+    def test_live_feed_off_by_default(self):
+        """Без LIVE_EVENTS_TRANSPORT страницы не держат соединений."""
+        with self.settings(
+            LIVE_EVENTS=dict(settings.LIVE_EVENTS, TRANSPORT='off')
+        ):
+            response = self.client.get(reverse('posts:index'))
+        self.assertNotContains(response, 'data-live-feed')
+
+    @override_settings(LIVE_EVENTS=dict(QUICK_EVENTS, TRANSPORT='poll'))
+    def test_pages_connect_live_feed(self):
+        """Первая страница ленты подключает живые обновления."""
+        pages = (
+            (self.client, reverse('posts:index'), 'api:index_events_poll',
+             ()),
+            (self.client, reverse('posts:group_posts', args=('group',)),
+             'api:group_posts_events_poll', ('group',)),
+            (self.client, reverse('posts:profile', args=('auth',)),
+             'api:profile_events_poll', ('auth',)),
+            (self.reader_client, reverse('posts:follow_index'),
+             'api:follow_events_poll', ()),
+        )
+        for client, url, poll_name, args in pages:
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertContains(response, 'data-live-feed')
+                self.assertContains(
+                    response,
+                    f'data-poll-url="{reverse(poll_name, args=args)}"'
+                )
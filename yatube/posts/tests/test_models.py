@@ -1,8 +1,11 @@
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
 
-from ..models import Group, Post
+from ..models import Comment, Group, Post
 
 User = get_user_model()
 
@@ -57,3 +60,21 @@ class PostModelTest(TestCase):
         posts = PostModelTest.post
         self.assertEqual(group.title, str(self.group))
         self.assertEqual(posts.text[:15], str(self.post))
+
+    def test_explicit_dates(self):
+        """Заданная дата сохраняется и в bulk_create, без неё — сейчас."""
+        past = timezone.now() - timedelta(days=30)
+        Post.objects.bulk_create([
+            Post(author=self.user, text='Из выгрузки', pub_date=past),
+        ])
+        Comment.objects.bulk_create([
+            Comment(
+                post=self.post, author=self.user, text='Ок', created=past
+            ),
+        ])
+        self.assertEqual(Post.objects.get(text='Из выгрузки').pub_date, past)
+        self.assertEqual(Comment.objects.get().created, past)
+        started = timezone.now()
+        post = Post.objects.create(author=self.user, text='Новый')
+        self.assertGreaterEqual(post.pub_date, started)
+        self.assertLessEqual(post.pub_date, timezone.now())
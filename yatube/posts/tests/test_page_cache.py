@@ -0,0 +1,130 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core import page_cache
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+PAGE_CACHE = {
+    'ENABLED': True,
+    'TTL': 60,
+    'STALE': 600,
+    'LOCK_TIMEOUT': 30,
+    'BYPASS_COOKIES': ['sessionid', 'messages'],
+}
+
+
+@override_settings(PAGE_CACHE=PAGE_CACHE)
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.other_group = Group.objects.create(title='Другая', slug='other')
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group
+        )
+        cls.index = reverse('posts:index')
+        cls.group_url = reverse('posts:group_posts', args=('group',))
+        cls.other_group_url = reverse('posts:group_posts', args=('other',))
+        cls.profile = reverse('posts:profile', args=('auth',))
+        cls.detail = reverse('posts:post_detail', args=(cls.post.pk,))
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        # Тесты меняют пост, а объект из setUpTestData общий.
+        self.post = Post.objects.get(pk=self.post.pk)
+
+    def state(self, url, client=None):
+        return (client or self.guest_client).get(url).get('X-Page-Cache')
+
+    def test_anonymous_pages_are_cached(self):
+        """Повторный запрос аноним получает из кеша без запросов к базе."""
+        for url in (self.index, self.group_url, self.profile, self.detail):
+            with self.subTest(url=url):
+                first = self.guest_client.get(url)
+                self.assertEqual(first['X-Page-Cache'], 'miss')
+                with self.assertNumQueries(0):
+                    second = self.guest_client.get(url)
+                self.assertEqual(second['X-Page-Cache'], 'hit')
+                self.assertEqual(second.content, first.content)
+
+    def test_query_string_is_part_of_key(self):
+        self.guest_client.get(self.index)
+        self.assertEqual(self.state(f'{self.index}?page=2'), 'miss')
+
+    def test_session_bypasses_cache(self):
+        """Вошедший пользователь всегда получает страницу из представления."""
+        self.guest_client.get(self.index)
+        client = Client()
+        client.force_login(self.reader)
+        response = client.get(self.index)
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertContains(response, 'reader')
+
+    def test_new_post_purges_affected_pages(self):
+        """Новый пост сбрасывает свои ленты, чужая группа остаётся."""
+        urls = (self.index, self.group_url, self.profile, self.detail)
+        for url in urls + (self.other_group_url,):
+            self.guest_client.get(url)
+        Post.objects.create(
+            author=self.user, text='Новый пост', group=self.group
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(self.guest_client.get(self.index), 'Новый пост')
+        self.assertEqual(self.state(self.other_group_url), 'hit')
+
+    def test_moved_post_purges_old_group(self):
+        self.guest_client.get(self.group_url)
+        self.post.group = self.other_group
+        self.post.save()
+        self.assertEqual(self.state(self.group_url), 'miss')
+
+    def test_comment_purges_post_page_only(self):
+        self.guest_client.get(self.index)
+        self.guest_client.get(self.detail)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Новый комментарий'
+        )
+        self.assertContains(
+            self.guest_client.get(self.detail), 'Новый комментарий'
+        )
+        self.assertEqual(self.state(self.index), 'hit')
+
+    def test_follow_purges_both_profiles(self):
+        reader_profile = reverse('posts:profile', args=('reader',))
+        self.guest_client.get(self.profile)
+        self.guest_client.get(reader_profile)
+        Follow.objects.create(user=self.reader, author=self.user)
+        self.assertEqual(self.state(self.profile), 'miss')
+        self.assertEqual(self.state(reader_profile), 'miss')
+
+    def test_stale_while_revalidate(self):
+        """Пока страницу пересобирает другой запрос, отдаётся старая."""
+        old = self.guest_client.get(self.index).content
+        self.post.text = 'Изменён'
+        self.post.save()
+        request = RequestFactory().get(self.index)
+        self.assertTrue(page_cache.try_revalidate(request))
+        stale = self.guest_client.get(self.index)
+        self.assertEqual(stale['X-Page-Cache'], 'stale')
+        self.assertEqual(stale.content, old)
+        page_cache.release(request)
+        self.assertContains(self.guest_client.get(self.index), 'Изменён')
+        self.assertEqual(self.state(self.index), 'hit')
+
+    def test_missing_page_is_forgotten(self):
+        """Удалённый пост не отдаётся из кеша после пересборки."""
+        self.guest_client.get(self.detail)
+        self.post.delete()
+        self.assertEqual(self.guest_client.get(self.detail).status_code, 404)
+        self.assertEqual(self.guest_client.get(self.detail).status_code, 404)
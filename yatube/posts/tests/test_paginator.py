@@ -1,9 +1,11 @@
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
-from django.test import Client, TestCase
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from ..models import Group, Post
+from ..models import Follow, Group, Post, UserStats
 
 User = get_user_model()
 
@@ -55,3 +57,130 @@ class PaginatorTest(TestCase):
             with self.subTest(reverse_name=reverse_name):
                 response = self.client.get(reverse_name, {'page': 2})
                 self.assertEqual(len(response.context['page_obj']), 3)
+
+    def test_cursor_pages(self):
+        """Курсоры ведут на следующую и обратно на предыдущую страницу."""
+        for reverse_name in PaginatorTest.pages_names:
+            with self.subTest(reverse_name=reverse_name):
+                first_page = self.guest_client.get(
+                    reverse_name).context['page_obj']
+                self.assertIsNone(first_page.previous_cursor)
+                second_page = self.guest_client.get(
+                    reverse_name, {'cursor': first_page.next_cursor}
+                ).context['page_obj']
+                self.assertEqual(len(second_page), 3)
+                self.assertIsNone(second_page.next_cursor)
+                back_page = self.guest_client.get(
+                    reverse_name, {'cursor': second_page.previous_cursor}
+                ).context['page_obj']
+                self.assertEqual(
+                    list(back_page.object_list),
+                    list(first_page.object_list)
+                )
+
+    def test_cursor_page_without_count(self):
+        """Страница по курсору не выполняет COUNT(*)."""
+        with CaptureQueriesContext(connection) as queries:
+            self.guest_client.get(reverse('posts:index'))
+        self.assertFalse(
+            any('COUNT(' in query['sql'] for query in queries)
+        )
+
+    def test_broken_cursor(self):
+        """Повреждённый курсор открывает первую страницу."""
+        response = self.guest_client.get(
+            reverse('posts:index'), {'cursor': 'broken'}
+        )
+        self.assertEqual(len(response.context['page_obj']), 10)
+
+    def test_numbered_page_window(self):
+        """Страница по номеру показывает окно номеров вместо курсоров."""
+        response = self.guest_client.get(
+            reverse('posts:index'), {'page': 2}
+        )
+        self.assertTrue(response.context['page_obj'].numbered)
+        self.assertContains(response, 'href="?page=1"')
+        self.assertContains(
+            response,
+            '<li class="page-item active"><span class="page-link">2</span>',
+        )
+        self.assertNotContains(response, '?cursor=')
+
+    def test_page_count_cached(self):
+        """COUNT(*) для номеров страниц берётся из кеша."""
+        url = reverse('posts:group_posts', kwargs={'slug': 'test_slug'})
+        self.guest_client.get(url, {'page': 1})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(url, {'page': 2})
+        self.assertEqual(response.context['page_obj'].paginator.count, 13)
+        self.assertFalse(
+            any('COUNT(' in query['sql'] for query in queries)
+        )
+
+    @override_settings(PAGINATOR_APPROXIMATE_THRESHOLD=5)
+    def test_approximate_count(self):
+        """Большая лента считается приблизительно, без полного COUNT(*)."""
+        UserStats.objects.filter(user=self.user).update(posts_count=40)
+        Group.objects.filter(pk=self.group.pk).update(posts_count=30)
+        cases = (
+            # В SQLite главная — по сумме счётчиков авторов, профиль
+            # и группа — по своим счётчикам.
+            (reverse('posts:index'), 40),
+            (reverse('posts:profile', kwargs={'username': 'auth'}), 40),
+            (reverse('posts:group_posts', kwargs={'slug': 'test_slug'}), 30),
+        )
+        for url, count in cases:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url, {'page': 1})
+                paginator = response.context['page_obj'].paginator
+                self.assertTrue(paginator.approximate)
+                self.assertEqual(paginator.count, count)
+                self.assertContains(
+                    response, f'около {paginator.num_pages} стр.'
+                )
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.guest_client.get(reverse('posts:index'), {'page': 1})
+        counts = [
+            query['sql'] for query in queries if 'COUNT(' in query['sql']
+        ]
+        self.assertEqual(len(counts), 1)
+        self.assertIn('LIMIT 6', counts[0])
+
+    @override_settings(PAGINATOR_APPROXIMATE_THRESHOLD=5)
+    def test_overestimated_count(self):
+        """Страница за концом ленты по завышенной оценке — последняя
+        настоящая, число страниц точное.
+        """
+        UserStats.objects.filter(user=self.user).update(posts_count=100)
+        response = self.guest_client.get(reverse('posts:index'), {'page': 10})
+        page = response.context['page_obj']
+        self.assertEqual(page.number, 2)
+        self.assertEqual(len(page.object_list), 3)
+        self.assertFalse(page.paginator.approximate)
+        self.assertEqual(page.paginator.num_pages, 2)
+        self.assertNotContains(response, 'около')
+
+    @override_settings(PAGINATOR_APPROXIMATE_THRESHOLD=5)
+    def test_feed_without_estimate_counted_exactly(self):
+        """Лента подписок без оценки: count точный, без «около»."""
+        follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=follower, author=self.user)
+        client = Client()
+        client.force_login(follower)
+        response = client.get(reverse('posts:follow_index'), {'page': 1})
+        paginator = response.context['page_obj'].paginator
+        self.assertFalse(paginator.approximate)
+        self.assertEqual(paginator.count, 13)
+        self.assertNotContains(response, 'около')
+
+    @override_settings(PAGINATOR_APPROXIMATE_THRESHOLD=100)
+    def test_small_feed_counted_exactly(self):
+        response = self.guest_client.get(
+            reverse('posts:profile', kwargs={'username': 'auth'}),
+            {'page': 1},
+        )
+        paginator = response.context['page_obj'].paginator
+        self.assertFalse(paginator.approximate)
+        self.assertEqual(paginator.count, 13)
+        self.assertNotContains(response, 'около')
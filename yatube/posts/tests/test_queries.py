@@ -0,0 +1,95 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class FeedQueriesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(
+                username=f'author_{i}', first_name='Имя', last_name='Фамилия'
+            )
+            for i in range(3)
+        ]
+        cls.group = Group.objects.create(
+            title='Заголовок тестовой группы',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        for author in cls.authors:
+            Follow.objects.create(user=cls.user, author=author)
+            for i in range(5):
+                Post.objects.create(
+                    author=author,
+                    text=f'Пост {i}',
+                    group=cls.group,
+                )
+        cls.urls_name = (
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': 'test_slug'}),
+            reverse('posts:profile', kwargs={'username': 'author_0'}),
+            reverse('posts:follow_index'),
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(FeedQueriesTests.user)
+
+    def count_queries(self, url, page_size):
+        cache.clear()
+        with mock.patch('posts.utils.POSTS_ON_THE_PAGE', page_size):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.authorized_client.get(url)
+        self.assertEqual(len(response.context['page_obj']), page_size)
+        return len(queries)
+
+    def test_feed_queries_do_not_depend_on_page_size(self):
+        """Число запросов ленты не зависит от числа постов на странице."""
+        for url in FeedQueriesTests.urls_name:
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.count_queries(url, 1),
+                    self.count_queries(url, 5)
+                )
+
+
+class ExplainFeedsTests(TestCase):
+    def test_explain_feeds_rolls_back(self):
+        """explain_feeds печатает планы и не оставляет данных и изменений."""
+        out = StringIO()
+        call_command('explain_feeds', seed=100, repeat=1, stdout=out)
+        self.assertIn('post_feed_idx', out.getvalue())
+        self.assertFalse(Post.objects.exists())
+        index_names = {
+            index.name for index in Post._meta.indexes
+        }
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Post._meta.db_table
+            )
+        self.assertTrue(index_names <= set(constraints))
+
+
+class FollowConstraintTests(TestCase):
+    def test_follow_is_unique(self):
+        """Повторная подписка запрещена на уровне базы."""
+        user = User.objects.create_user(username='reader')
+        author = User.objects.create_user(username='writer')
+        Follow.objects.create(user=user, author=author)
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Follow.objects.create(user=user, author=author)
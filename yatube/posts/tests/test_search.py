@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Post
+from ..search import highlight, search_posts, use_fts
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    backend = 'auto'
+
+    def setUp(self):
+        self.settings_override = override_settings(
+            SEARCH_BACKEND=self.backend
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.user = User.objects.create_user(username='auth')
+        self.cats = Post.objects.create(
+            author=self.user, text='Кошки любят спать на солнце'
+        )
+        self.dogs = Post.objects.create(
+            author=self.user, text='Собаки любят гулять'
+        )
+        self.guest_client = Client()
+
+    def test_backend(self):
+        self.assertEqual(use_fts(), self.backend == 'auto')
+
+    def test_backend_checked_once_per_connection(self):
+        """Таблица FTS5 ищется один раз, а после переподключения заново."""
+        use_fts()
+        with CaptureQueriesContext(connection) as queries:
+            use_fts()
+            search_posts('кошки')
+        self.assertFalse(
+            any('sqlite_master' in query['sql'] for query in queries)
+        )
+        connection_created.send(sender=type(connection), connection=connection)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(use_fts(), self.backend == 'auto')
+        checks = [
+            query for query in queries if 'sqlite_master' in query['sql']
+        ]
+        self.assertEqual(len(checks), int(self.backend == 'auto'))
+
+    def test_all_words_required(self):
+        """Найдены только посты, где есть все слова запроса."""
+        self.assertEqual(search_posts('любят'), [self.dogs.pk, self.cats.pk])
+        self.assertEqual(search_posts('кошки любят'), [self.cats.pk])
+        self.assertEqual(search_posts('кошки гулять'), [])
+
+    def test_comments_indexed(self):
+        """Пост находится по тексту своего комментария."""
+        Comment.objects.create(
+            post=self.dogs, author=self.user, text='Особенно под дождём'
+        )
+        self.assertEqual(search_posts('дождём'), [self.dogs.pk])
+
+    def test_text_ranked_above_comment(self):
+        """Совпадение в тексте поста выше совпадения в комментарии."""
+        Comment.objects.create(
+            post=self.cats, author=self.user, text='А собаки?'
+        )
+        self.assertEqual(
+            search_posts('собаки'), [self.dogs.pk, self.cats.pk]
+        )
+
+    def test_index_follows_changes(self):
+        """Изменение и удаление поста обновляют индекс."""
+        self.cats.text = 'Кошки любят рыбу'
+        self.cats.save()
+        self.assertEqual(search_posts('рыбу'), [self.cats.pk])
+        self.assertEqual(search_posts('солнце'), [])
+        self.cats.delete()
+        self.assertEqual(search_posts('рыбу'), [])
+
+    def test_search_page(self):
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'кошки'}
+        )
+        self.assertEqual(list(response.context['page_obj']), [self.cats])
+        self.assertContains(response, '<mark>Кошки</mark>')
+
+
+@override_settings(SEARCH_BACKEND='tokens')
+class TokenSearchTests(SearchTests):
+    backend = 'tokens'
+
+
+class HighlightTests(TestCase):
+    def test_highlight_escapes_html(self):
+        self.assertEqual(
+            highlight('<b>Кошки</b> спят', 'кошки'),
+            '&lt;b&gt;<mark>Кошки</mark>&lt;/b&gt; спят'
+        )
@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase, override_settings
+
+from core import page_cache
+
+from .. import cache
+from ..models import Comment, Follow, Post, TimelineEntry, UserStats
+from ..search import search_posts
+from ..seeding import refresh_derived
+
+User = get_user_model()
+
+
+class SeedDataTests(TestCase):
+    def test_seed_data(self):
+        """seed_data создаёт данные и пересчитывает производные таблицы."""
+        call_command(
+            'seed_data', users=10, groups=2, posts=60, comments=40,
+            follows=3, seed=1, stdout=StringIO(),
+        )
+        self.assertEqual(User.objects.count(), 10)
+        self.assertEqual(Post.objects.count(), 60)
+        self.assertEqual(Comment.objects.count(), 40)
+        self.assertTrue(Follow.objects.exists())
+        self.assertTrue(TimelineEntry.objects.exists())
+        post = Post.objects.first()
+        self.assertEqual(
+            UserStats.objects.get(user=post.author_id).posts_count,
+            Post.objects.filter(author=post.author_id).count(),
+        )
+        self.assertIn(post.pk, search_posts(post.text.split()[0]))
+        self.assertFalse(
+            Comment.objects.filter(created__lt=F('post__pub_date')).exists()
+        )
+
+    @override_settings(PAGE_CACHE=dict(settings.PAGE_CACHE, ENABLED=True))
+    def test_refresh_purges_caches(self):
+        """После загрузки сброшены кеш страниц и фрагментов."""
+        pages = page_cache.versions([page_cache.ALL])
+        fragments = cache.version(cache.FEED_SCOPE)
+        refresh_derived()
+        self.assertNotEqual(page_cache.versions([page_cache.ALL]), pages)
+        self.assertNotEqual(cache.version(cache.FEED_SCOPE), fragments)
+
+    def test_same_seed_same_data(self):
+        """Одинаковое зерно даёт одинаковые тексты."""
+        call_command(
+            'seed_data', users=3, posts=5, comments=0, prefix='a',
+            seed=7, no_refresh=True, stdout=StringIO(),
+        )
+        first = list(Post.objects.order_by('pk').values_list('text'))
+        Post.objects.all().delete()
+        call_command(
+            'seed_data', users=3, posts=5, comments=0, prefix='b',
+            seed=7, no_refresh=True, stdout=StringIO(),
+        )
+        second = list(Post.objects.order_by('pk').values_list('text'))
+        self.assertEqual(first, second)
+
+
+class BenchmarkViewsTests(TestCase):
+    def test_benchmark_views(self):
+        """Замер пишет JSON по каждой странице и откатывает данные."""
+        handle, path = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        call_command(
+            'benchmark_views', sizes=[50], repeat=2, output=path,
+            stderr=StringIO(),
+        )
+        with open(path) as output:
+            report = json.load(output)
+        self.assertEqual(
+            {result['view'] for result in report['results']},
+            {'index', 'group_posts', 'profile', 'post_detail',
+             'follow_index'},
+        )
+        for result in report['results']:
+            self.assertEqual(result['status'], 200)
+            self.assertEqual(result['posts'], 50)
+            self.assertGreater(result['queries'], 0)
+            self.assertGreater(result['latency_ms']['median'], 0)
+        self.assertFalse(Post.objects.exists())
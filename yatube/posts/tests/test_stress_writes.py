@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+
+class StressWritesTests(SimpleTestCase):
+    """Одновременные записи в файловую SQLite в отдельном процессе:
+    тестовая база в памяти не показывает блокировок настоящего файла.
+    """
+
+    def run_manage(self, url, *args):
+        return subprocess.run(
+            [sys.executable, 'manage.py', *args],
+            cwd=settings.BASE_DIR,
+            env=dict(os.environ, DATABASE_URL=url),
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+    def test_concurrent_writes_without_lock_errors(self):
+        with tempfile.TemporaryDirectory() as directory:
+            url = f'sqlite+pool:///{directory}/stress.sqlite3'
+            self.run_manage(url, 'migrate', '--verbosity=0')
+            result = json.loads(self.run_manage(
+                url, 'stress_writes', '--threads=8', '--writes=20',
+                '--readers=2', '--write-queue=on',
+            ))
+        self.assertEqual(result['journal_mode'], 'wal')
+        self.assertEqual(result['lock_errors'], 0)
+        self.assertEqual(result['errors'], 0)
+        self.assertEqual(result['writes'], 8 * 20)
+        self.assertGreater(result['reads'], 0)
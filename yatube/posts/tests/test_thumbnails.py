@@ -0,0 +1,157 @@
+import shutil
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import thumbnails
+from ..models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b"\x47\x49\x46\x38\x39\x61\x02\x00"
+    b"\x01\x00\x80\x00\x00\x00\x00\x00"
+    b"\xFF\xFF\xFF\x21\xF9\x04\x00\x00"
+    b"\x00\x00\x00\x2C\x00\x00\x00\x00"
+    b"\x02\x00\x01\x00\x00\x02\x02\x0C"
+    b"\x0A\x00\x3B"
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.user,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(
+                name='small.gif', content=SMALL_GIF, content_type='image/gif'
+            ),
+        )
+
+    def test_generate_stores_urls(self):
+        """generate() сохраняет адреса всех доступных вариантов."""
+        urls = thumbnails.generate(self.post.pk)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.thumbnail_urls, urls)
+        self.assertEqual(urls['source'], self.post.image.name)
+        for name in thumbnails.variants():
+            self.assertIn(name, urls)
+        self.assertFalse(thumbnails.needs_update(self.post))
+
+    def test_generate_without_image(self):
+        """Без картинки адреса миниатюр очищаются."""
+        thumbnails.generate(self.post.pk)
+        Post.objects.filter(pk=self.post.pk).update(image='')
+        self.assertIsNone(thumbnails.generate(self.post.pk))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.thumbnails, '')
+
+    def test_new_image_is_scheduled(self):
+        """Сохранение поста с новой картинкой ставит задачу после коммита."""
+        with mock.patch('posts.live.publish'), \
+                mock.patch('posts.thumbnails.transaction.on_commit') as hook:
+            Post.objects.create(
+                author=self.user,
+                text='Ещё пост',
+                image=SimpleUploadedFile(
+                    name='other.gif', content=SMALL_GIF,
+                    content_type='image/gif'
+                ),
+            )
+            Post.objects.create(author=self.user, text='Без картинки')
+        self.assertEqual(hook.call_count, 1)
+
+    def test_unchanged_image_is_not_scheduled(self):
+        """Правка текста не перестраивает готовые миниатюры."""
+        thumbnails.generate(self.post.pk)
+        self.post.refresh_from_db()
+        with mock.patch('posts.thumbnails.transaction.on_commit') as hook:
+            self.post.text = 'Новый текст'
+            self.post.save()
+        hook.assert_not_called()
+
+    def test_pages_use_ready_thumbnails(self):
+        """Ленты показывают готовую миниатюру, а до неё — оригинал."""
+        client = Client()
+        response = client.get(reverse('posts:index'))
+        self.assertContains(response, self.post.image.url)
+        urls = thumbnails.generate(self.post.pk)
+        response = client.get(reverse('posts:index'))
+        self.assertContains(response, urls['card'])
+        response = client.get(
+            reverse('posts:post_detail', args=(self.post.pk,))
+        )
+        self.assertContains(response, urls['card'])
+
+    @override_settings(PAGE_CACHE={**settings.PAGE_CACHE, 'ENABLED': True})
+    def test_page_cache_purged(self):
+        """Готовые миниатюры сбрасывают страницы с постом из кеша."""
+        client = Client()
+        pages = (
+            reverse('posts:index'),
+            reverse('posts:profile', args=('auth',)),
+            reverse('posts:post_detail', args=(self.post.pk,)),
+        )
+        for url in pages:
+            client.get(url)
+        urls = thumbnails.generate(self.post.pk)
+        for url in pages:
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertEqual(response['X-Page-Cache'], 'miss')
+                self.assertContains(response, urls['card'])
+
+    def test_command_fills_missing(self):
+        """generate_thumbnails строит миниатюры только там, где их нет."""
+        out = StringIO()
+        call_command('generate_thumbnails', '--workers=1', stdout=out)
+        self.assertIn('1 из 1', out.getvalue())
+        call_command('generate_thumbnails', '--workers=1', stdout=out)
+        self.assertIn('0 из 0', out.getvalue())
+
+    def test_single_executor(self):
+        """Одновременные первые вызовы создают один пул потоков."""
+        created = []
+
+        def slow_pool(**kwargs):
+            time.sleep(0.05)
+            created.append(kwargs)
+            return mock.Mock()
+
+        threads = [
+            threading.Thread(target=thumbnails._get_executor)
+            for _ in range(4)
+        ]
+        with mock.patch.object(thumbnails, '_executor', None):
+            with mock.patch.object(
+                thumbnails, 'ThreadPoolExecutor', slow_pool
+            ):
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+        self.assertEqual(len(created), 1)
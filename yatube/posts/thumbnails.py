@@ -0,0 +1,133 @@
+"""Заранее подготовленные миниатюры картинок постов.
+
+Миниатюры строятся не при отрисовке страницы, а после сохранения поста:
+в фоновом потоке (или сразу, если так указано в настройках). Адреса
+готовых миниатюр сохраняются в Post.thumbnails, и шаблоны только
+подставляют их, не обращаясь к файлам и к хранилищу sorl.
+Пока миниатюр нет, показывается исходная картинка.
+"""
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from PIL import features
+from sorl.thumbnail import get_thumbnail
+
+from . import cache
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Вариант: (геометрия, формат). Размер карточки совпадает с прежним
+# тегом {% thumbnail %} в шаблонах.
+VARIANTS = {
+    'card': ('960x339', 'JPEG'),
+    'card_webp': ('960x339', 'WEBP'),
+    'small': ('480x170', 'JPEG'),
+    'small_webp': ('480x170', 'WEBP'),
+}
+SOURCE_KEY: str = 'source'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def variants():
+    """Варианты, которые может построить установленный Pillow."""
+    webp = features.check('webp')
+    return {
+        name: options for name, options in VARIANTS.items()
+        if webp or options[1] != 'WEBP'
+    }
+
+
+def generate(post_id):
+    """Строит миниатюры поста и сохраняет их адреса.
+
+    Возвращает словарь адресов или None, если картинки нет.
+    """
+    post = Post.objects.filter(pk=post_id).only(
+        'image', 'author', 'group'
+    ).first()
+    if post is None:
+        return None
+    if not post.image:
+        if Post.objects.filter(pk=post_id).exclude(thumbnails='').update(
+            thumbnails=''
+        ):
+            cache.invalidate_post(post)
+        return None
+    urls = {SOURCE_KEY: post.image.name}
+    for name, (geometry, image_format) in variants().items():
+        try:
+            thumbnail = get_thumbnail(
+                post.image, geometry,
+                crop='center', upscale=True, format=image_format,
+            )
+        except Exception:
+            logger.exception(
+                'Не удалось построить миниатюру %s поста %s', name, post_id
+            )
+            continue
+        urls[name] = thumbnail.url
+    # Если картинку успели заменить, устаревшие адреса не записываем.
+    updated = Post.objects.filter(pk=post_id, image=post.image.name).update(
+        thumbnails=json.dumps(urls)
+    )
+    if updated:
+        # update() не шлёт сигналов: кеш сбрасываем сами.
+        cache.invalidate_post(post)
+    return urls
+
+
+def _generate_in_thread(post_id):
+    try:
+        generate(post_id)
+    except Exception:
+        logger.exception('Миниатюры поста %s не построены', post_id)
+    finally:
+        close_old_connections()
+
+
+def _get_executor():
+    global _executor
+    # Под блокировкой: одновременные первые запросы не создадут два пула.
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails',
+            )
+    return _executor
+
+
+def needs_update(post):
+    """Картинка поста изменилась с момента построения миниатюр."""
+    source = post.thumbnail_urls.get(SOURCE_KEY, '')
+    return (post.image.name or '') != source
+
+
+def _background_allowed():
+    """Можно ли писать в базу из другого потока.
+
+    Общая in-memory база SQLite блокирует таблицы без ожидания, и запись
+    из фонового потока падала бы с «database table is locked».
+    """
+    return connection.vendor != 'sqlite' or not connection.is_in_memory_db()
+
+
+def schedule(post):
+    """Ставит построение миниатюр в очередь после коммита транзакции."""
+    mode = settings.THUMBNAIL_PREGENERATE
+    if mode == 'off':
+        return
+    post_id = post.pk
+    if mode == 'sync' or not _background_allowed():
+        transaction.on_commit(lambda: generate(post_id))
+    else:
+        transaction.on_commit(
+            lambda: _get_executor().submit(_generate_in_thread, post_id)
+        )
@@ -0,0 +1,167 @@
+"""Материализованная лента подписок (fan-out-on-write).
+
+При публикации id поста раскладывается по ограниченным лентам всех
+подписчиков автора, а follow_index читает ленту готовой. Посты авторов
+с очень большим числом подписчиков не раскладываются: они подмешиваются
+в ленту при чтении (гибридный режим). Когда подписчиков у такого автора
+становится не больше порога, его последние посты раскладываются по
+лентам подписчиков (materialize), иначе они пропали бы из лент.
+"""
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Q
+
+from .models import Follow, Post, TimelineEntry, UserStats
+
+
+def pulled_authors(author_ids):
+    """Авторы из списка, чьи посты читаются при запросе ленты."""
+    return list(
+        UserStats.objects.filter(
+            user__in=author_ids,
+            followers_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+        ).values_list('user', flat=True)
+    )
+
+
+def trim(user_ids):
+    """Обрезает ленты пользователей до TIMELINE_SIZE записей."""
+    size = settings.TIMELINE_SIZE
+    overflowed = (
+        TimelineEntry.objects.filter(user__in=user_ids)
+        .values('user')
+        .annotate(entries=Count('pk'))
+        .filter(entries__gt=size)
+        .values_list('user', flat=True)
+    )
+    for user_id in overflowed:
+        oldest_kept = TimelineEntry.objects.filter(
+            user=user_id
+        ).order_by('-pub_date', '-post_id')[size - 1]
+        TimelineEntry.objects.filter(user=user_id).filter(
+            Q(pub_date__lt=oldest_kept.pub_date)
+            | Q(pub_date=oldest_kept.pub_date, post__lt=oldest_kept.post_id)
+        ).delete()
+
+
+def fan_out(post):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    if pulled_authors([post.author_id]):
+        return
+    follower_ids = list(
+        Follow.objects.filter(author=post.author_id)
+        .values_list('user', flat=True)
+    )
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+            for user_id in follower_ids
+        ],
+        ignore_conflicts=True,
+    )
+    trim(follower_ids)
+
+
+def _latest(author_id):
+    """(id, дата) последних постов автора, не больше TIMELINE_SIZE."""
+    return list(
+        Post.objects.filter(author=author_id).order_by(
+            '-pub_date', '-pk'
+        ).values_list('pk', 'pub_date')[:settings.TIMELINE_SIZE]
+    )
+
+
+def _fill(user_ids, author_id):
+    posts = _latest(author_id)
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+            for user_id in user_ids
+            for pk, pub_date in posts
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту подписчика последние посты нового автора."""
+    if pulled_authors([author_id]):
+        return
+    _fill([user_id], author_id)
+    trim([user_id])
+
+
+def materialize(author_id):
+    """Раскладывает последние посты автора по лентам всех подписчиков."""
+    follower_ids = list(
+        Follow.objects.filter(author=author_id)
+        .values_list('user', flat=True)
+    )
+    _fill(follower_ids, author_id)
+    trim(follower_ids)
+
+
+def follower_lost(author_id):
+    """Автор, у которого подписчиков стало ровно TIMELINE_FANOUT_LIMIT,
+    больше не читается «на лету»: его посты, опубликованные без
+    раскладки, переносятся в ленты подписчиков.
+
+    Вызывается после уменьшения счётчика подписчиков.
+    """
+    followers = UserStats.objects.filter(user=author_id).values_list(
+        'followers_count', flat=True
+    ).first()
+    if followers == settings.TIMELINE_FANOUT_LIMIT:
+        materialize(author_id)
+
+
+def rebuild():
+    """Строит все ленты заново, возвращает число записей.
+
+    Нужна после массовой загрузки через bulk_create, которая не шлёт
+    сигналов. Счётчики подписчиков должны быть уже пересчитаны.
+    """
+    TimelineEntry.objects.all().delete()
+    pulled = UserStats.objects.filter(
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT
+    ).values('user')
+    follows = Follow.objects.exclude(author__in=pulled)
+    readers = follows.order_by('user').values_list(
+        'user', flat=True
+    ).distinct()
+    for user_id in readers.iterator():
+        # Одна вставка на читателя: последние посты всех его авторов
+        # копируются в ленту запросом INSERT ... SELECT.
+        posts = Post.objects.filter(
+            author__in=follows.filter(user=user_id).values('author')
+        ).order_by('-pub_date', '-pk').values_list(
+            'pk', 'pub_date'
+        )[:settings.TIMELINE_SIZE]
+        sql, params = posts.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {TimelineEntry._meta.db_table} '
+                '(user_id, post_id, pub_date) '
+                f'SELECT %s, feed.* FROM ({sql}) AS feed',
+                [user_id, *params],
+            )
+    return TimelineEntry.objects.count()
+
+
+def forget(user_id, author_id):
+    """Убирает из ленты посты автора, от которого отписались."""
+    TimelineEntry.objects.filter(
+        user=user_id, post__author=author_id
+    ).delete()
+
+
+def timeline_posts(user):
+    """Посты ленты подписок: из материализованной ленты и «на лету»."""
+    followed = Follow.objects.filter(user=user).values_list(
+        'author', flat=True
+    )
+    return Post.objects.for_feed().filter(
+        Q(pk__in=TimelineEntry.objects.filter(user=user).values('post'))
+        | Q(author__in=pulled_authors(followed))
+    )
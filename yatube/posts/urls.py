@@ -16,7 +16,18 @@ urlpatterns = [
         views.add_comment,
         name='add_comment'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.comments,
+        name='comments'
+    ),
     path('follow/', views.follow_index, name='follow_index'),
+    path('search/', views.search, name='search'),
+    path(
+        'export/<slug:dataset>.<slug:format>',
+        views.export,
+        name='export'
+    ),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -1,9 +1,233 @@
+import binascii
+import hashlib
+import itertools
+
+from django.conf import settings
 from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from core.single_flight import get_or_fill
 
 POSTS_ON_THE_PAGE: int = 10
+COMMENTS_ON_THE_PAGE: int = 20
+
+CURSOR_NEXT: str = 'n'
+CURSOR_PREVIOUS: str = 'p'
+
+
+def encode_cursor(direction, value, pk):
+    """Упаковывает позицию (значение ключа, id) в непрозрачный токен."""
+    raw = f'{direction}|{value.isoformat()}|{pk}'
+    return urlsafe_base64_encode(force_bytes(raw))
+
+
+def decode_cursor(token):
+    """Распаковывает токен курсора.
+
+    Возвращает (direction, value, pk) или None, если токен повреждён.
+    """
+    try:
+        direction, value, pk = force_str(
+            urlsafe_base64_decode(token)
+        ).split('|')
+        value = parse_datetime(value)
+        pk = int(pk)
+    except (TypeError, ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+    if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS) or value is None:
+        return None
+    return direction, value, pk
+
+
+def cached_count(queryset):
+    """COUNT(*) запроса из кеша на PAGINATOR_COUNT_TTL секунд.
+
+    Ключ — текст SQL с параметрами, так что одинаковые выборки (лента
+    группы, профиль) считаются раз в TTL, а не на каждой странице.
+    """
+    sql, params = queryset.query.sql_with_params()
+    signature = hashlib.md5(repr((sql, params)).encode()).hexdigest()
+    return get_or_fill(
+        f'posts:count:{signature}', queryset.count,
+        settings.PAGINATOR_COUNT_TTL,
+    )
+
+
+def table_estimate(model, fallback=None):
+    """Примерное число строк таблицы model (кешируется как cached_count).
+
+    PostgreSQL хранит оценку в pg_class.reltuples. В других базах такой
+    статистики нет, и оценку даёт fallback() — например, сумма
+    поддерживаемых счётчиков; без него оценки нет (None).
+    """
+    table = model._meta.db_table
+
+    def estimate():
+        if connection.vendor != 'postgresql':
+            return fallback() if fallback else None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [table],
+            )
+            row = cursor.fetchone()
+        return max(int(row[0]), 0) if row else None
+
+    return get_or_fill(
+        f'posts:estimate:{table}', estimate, settings.PAGINATOR_COUNT_TTL
+    )
+
 
+class CursorPaginator(Paginator):
+    """Пагинатор по ключу (field, id) вместо OFFSET.
 
-def paginator_page(queryset, request):
-    paginator = Paginator(queryset, POSTS_ON_THE_PAGE)
+    Страница по курсору выбирается одним запросом по индексу за
+    постоянное время и без COUNT(*). Номер страницы и их количество
+    для такой страницы условные: номер 2 означает, что есть предыдущие
+    записи, а num_pages на единицу больше, если есть следующие.
+
+    Для страниц по номеру нужен count. Если записей больше
+    PAGINATOR_APPROXIMATE_THRESHOLD, он приблизительный (approximate):
+    из estimate() — счётчика или статистики таблицы. Без оценки count
+    точный, из кеша точных подсчётов. Если оценка завышена и запрошенная
+    страница оказалась за концом ленты, записи считаются точно.
+    """
+
+    approximate = False
+
+    def __init__(self, object_list, per_page, field='pub_date',
+                 descending=True, estimate=None, **kwargs):
+        self.field = field
+        self.descending = descending
+        self.estimate = estimate
+        ordering = (field, 'pk')
+        if descending:
+            ordering = (f'-{field}', '-pk')
+        super().__init__(object_list.order_by(*ordering), per_page, **kwargs)
+        self._cursor_num_pages = None
+
+    @cached_property
+    def count(self):
+        threshold = settings.PAGINATOR_APPROXIMATE_THRESHOLD
+        if threshold:
+            # Подсчёт не дальше порога: цена не растёт с размером ленты.
+            bounded = cached_count(self.object_list[:threshold + 1])
+            if bounded <= threshold:
+                return bounded
+            estimate = self.estimate() if self.estimate else None
+            if estimate is not None:
+                self.approximate = True
+                return max(estimate, bounded)
+        return cached_count(self.object_list)
+
+    def page(self, number):
+        page = super().page(number)
+        if self.approximate and page.number > 1 and not page.object_list:
+            self.count = cached_count(self.object_list)
+            self.approximate = False
+            page = super().page(min(page.number, self.num_pages))
+        return page
+
+    @property
+    def num_pages(self):
+        if self._cursor_num_pages is not None:
+            return self._cursor_num_pages
+        return super().num_pages
+
+    def _after(self, value, pk, forward):
+        """Условие «позиция строго после (value, pk)» в заданную сторону."""
+        lookup = 'lt' if forward == self.descending else 'gt'
+        return (
+            Q(**{f'{self.field}__{lookup}': value})
+            | Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def cursor_page(self, token=None):
+        """Возвращает страницу, следующую за позицией из курсора."""
+        cursor = decode_cursor(token) if token else None
+        queryset = self.object_list
+        limit = self.per_page + 1
+        if cursor is None:
+            rows = list(queryset[:limit])
+            has_previous, has_next = False, len(rows) > self.per_page
+            rows = rows[:self.per_page]
+        elif cursor[0] == CURSOR_NEXT:
+            rows = list(
+                queryset.filter(self._after(*cursor[1:], True))[:limit]
+            )
+            has_previous, has_next = True, len(rows) > self.per_page
+            rows = rows[:self.per_page]
+        else:
+            rows = list(
+                queryset.reverse().filter(
+                    self._after(*cursor[1:], False)
+                )[:limit]
+            )
+            has_previous, has_next = len(rows) > self.per_page, True
+            rows = rows[:self.per_page][::-1]
+        number = 2 if has_previous else 1
+        self._cursor_num_pages = number + 1 if has_next else number
+        page = self._get_page(rows, number, self)
+        return self.attach_cursors(page)
+
+    def attach_cursors(self, page):
+        """Проставляет странице токены соседних страниц."""
+        rows = list(page.object_list)
+        page.next_cursor = page.previous_cursor = None
+        if rows and page.has_next():
+            last = rows[-1]
+            page.next_cursor = encode_cursor(
+                CURSOR_NEXT, getattr(last, self.field), last.pk
+            )
+        if rows and page.has_previous():
+            first = rows[0]
+            page.previous_cursor = encode_cursor(
+                CURSOR_PREVIOUS, getattr(first, self.field), first.pk
+            )
+        return page
+
+
+def paginator_page(queryset, request, estimate=None):
+    """Страница ленты по ?cursor=, а для ссылок с номером — по ?page=N.
+
+    У страницы по номеру numbered=True: шаблон показывает окно номеров.
+    estimate() — дешёвая оценка числа записей для больших лент
+    (см. CursorPaginator), None — оценки нет.
+    """
+    paginator = CursorPaginator(
+        queryset, POSTS_ON_THE_PAGE, estimate=estimate
+    )
     page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+    if page_number and not request.GET.get('cursor'):
+        page = paginator.attach_cursors(paginator.get_page(page_number))
+        page.numbered = True
+        return page
+    page = paginator.cursor_page(request.GET.get('cursor'))
+    page.numbered = False
+    return page
+
+
+def comments_page(post, cursor=None):
+    """Страница комментариев поста, от старых к новым, с авторами."""
+    paginator = CursorPaginator(
+        post.comments.select_related('author'),
+        COMMENTS_ON_THE_PAGE,
+        field='created',
+        descending=False,
+    )
+    return paginator.cursor_page(cursor)
+
+
+def batched(iterable, size):
+    """Делит поток на списки не длиннее size."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
@@ -1,16 +1,42 @@
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Sum
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods
 
+from core import page_cache
+from core.write_queue import serialized_writes
+
+from .cache import (FEED_SCOPE, author_scope, fragment_cache, group_scope,
+                    post_scope)
+from .export import DATASETS, FORMATS, streaming_response
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
-from .utils import paginator_page
+from .models import Follow, Group, Post, User, UserStats
+from .search import highlight, search_posts
+from .timeline import timeline_posts
+from .utils import (POSTS_ON_THE_PAGE, comments_page, paginator_page,
+                    table_estimate)
+
+
+def posts_total():
+    """Сумма счётчиков постов авторов — число всех постов."""
+    return UserStats.objects.aggregate(total=Sum('posts_count'))['total']
 
 
 def index(request):
     """Представление главное страницы."""
-    posts = Post.objects.all()
+    posts = Post.objects.for_feed()
+    page_cache.tag(request, FEED_SCOPE)
     context = {
-        'page_obj': paginator_page(posts, request),
+        'page_obj': paginator_page(
+            posts, request,
+            estimate=lambda: table_estimate(Post, fallback=posts_total),
+        ),
+        'fragment_cache': fragment_cache(request, FEED_SCOPE),
     }
     return render(request, 'posts/index.html', context)
 
@@ -18,18 +44,33 @@ def index(request):
 def group_posts(request, slug):
     """Представление страницы Группы."""
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    posts = group.posts.for_feed()
+    page_cache.tag(request, group_scope(group.pk))
     context = {
         'group': group,
         'posts': posts,
-        'page_obj': paginator_page(posts, request),
+        'page_obj': paginator_page(
+            posts, request, estimate=lambda: group.posts_count
+        ),
+        'fragment_cache': fragment_cache(request, FEED_SCOPE),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+def posts_count(author):
+    """Счётчик постов автора или None, если строки счётчиков нет."""
+    try:
+        return author.stats.posts_count
+    except UserStats.DoesNotExist:
+        return None
+
+
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
+    posts = author.posts.for_feed()
+    page_cache.tag(request, author_scope(author.pk))
     following = request.user.is_authenticated and Follow.objects.filter(
         user=request.user,
         author=author
@@ -37,29 +78,62 @@ def profile(request, username):
     context = {
         'author': author,
         'posts': posts,
-        'page_obj': paginator_page(posts, request),
+        'page_obj': paginator_page(
+            posts, request, estimate=lambda: posts_count(author)
+        ),
         'following': following,
+        'fragment_cache': fragment_cache(request, FEED_SCOPE),
     }
 
     return render(request, 'posts/profile.html', context)
 
 
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), pk=post_id
+    )
+    page_cache.tag(
+        request, post_scope(post.pk), author_scope(post.author_id)
+    )
     form_com = CommentForm(request.POST or None)
-    comments = post.comments.all()
+    first_comments = comments_page(post)
     context = {
         'post': post,
         'form': form_com,
-        'comments': comments,
+        'comments': first_comments.object_list,
+        'comments_page': first_comments,
+        'fragment_cache': fragment_cache(
+            request, FEED_SCOPE, post_scope(post.pk)
+        ),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def search(request):
+    """Поиск по текстам постов и комментариев."""
+    query = request.GET.get('q', '').strip()
+    page_obj = Paginator(
+        search_posts(query) if query else [], POSTS_ON_THE_PAGE
+    ).get_page(request.GET.get('page'))
+    posts = Post.objects.for_feed().in_bulk(page_obj.object_list)
+    page_obj.object_list = [
+        posts[pk] for pk in page_obj.object_list if pk in posts
+    ]
+    for post in page_obj.object_list:
+        post.snippet = highlight(post.text, query)
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
+@serialized_writes
+@transaction.atomic
 def post_create(request):
     """Create new post"""
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
@@ -69,6 +143,7 @@ def post_create(request):
 
 
 @login_required
+@serialized_writes
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     if post.author != request.user:
@@ -92,6 +167,8 @@ def post_edit(request, post_id):
 
 
 @login_required
+@serialized_writes
+@transaction.atomic
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
@@ -103,13 +180,59 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+def comment_json(comment):
+    return {
+        'id': comment.pk,
+        'author': comment.author.username,
+        'author_url': reverse(
+            'posts:profile', args=(comment.author.username,)
+        ),
+        'text': comment.text,
+        'created': comment.created.isoformat(),
+    }
+
+
+@require_http_methods(['GET', 'POST'])
+@serialized_writes
+def comments(request, post_id):
+    """JSON: GET — комментарии по курсору, POST — новый комментарий."""
+    post = get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    if request.method == 'POST':
+        return create_comment(request, post)
+    page = comments_page(post, request.GET.get('cursor'))
+    next_url = None
+    if page.next_cursor:
+        next_url = (
+            f'{reverse("posts:comments", args=(post.pk,))}'
+            f'?cursor={page.next_cursor}'
+        )
+    return JsonResponse({
+        'comments': [comment_json(comment) for comment in page],
+        'next_cursor': page.next_cursor,
+        'next_url': next_url,
+    })
+
+
+@transaction.atomic
+def create_comment(request, post):
+    if not request.user.is_authenticated:
+        return JsonResponse(
+            {'errors': {'__all__': ['Нужно войти на сайт.']}}, status=403
+        )
+    form = CommentForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    comment = form.save(commit=False)
+    comment.author = request.user
+    comment.post = post
+    comment.save()
+    return JsonResponse(comment_json(comment), status=201)
+
+
 @login_required
 def follow_index(request):
     """Посты авторов, на кого подписан текущий пользователь."""
-    Follow.objects.filter(user=request.user)
-    posts = Post.objects.filter(
-        author__following__user=request.user
-    )
+    posts = timeline_posts(request.user)
     context = {
         'page_obj': paginator_page(posts, request),
     }
@@ -117,6 +240,7 @@ def follow_index(request):
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     """Подписка на автора."""
     author = get_object_or_404(User, username=username)
@@ -126,9 +250,18 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     """Отписка от автора."""
     author = get_object_or_404(User, username=username)
     if request.user != author:
         Follow.objects.filter(user=request.user, author=author).delete()
     return redirect('posts:profile', username=username)
+
+
+@staff_member_required
+def export(request, dataset, format):
+    """Потоковая выгрузка набора данных (только для персонала)."""
+    if dataset not in DATASETS or format not in FORMATS:
+        raise Http404
+    return streaming_response(dataset, format)
@@ -0,0 +1,97 @@
+// Комментарии без перезагрузки страницы: отправка формы и подгрузка
+// следующих страниц через JSON (posts:comments). Без JavaScript
+// работают обычная форма и первая страница комментариев.
+(function () {
+  'use strict';
+
+  var list = document.querySelector('[data-comment-list]');
+  if (!list) {
+    return;
+  }
+  var counter = document.querySelector('[data-comments-count]');
+
+  function renderComment(comment) {
+    var item = document.createElement('div');
+    item.className = 'media mb-4';
+    var body = document.createElement('div');
+    body.className = 'media-body';
+    var title = document.createElement('h5');
+    title.className = 'mt-0';
+    var link = document.createElement('a');
+    link.href = comment.author_url;
+    link.textContent = comment.author;
+    var text = document.createElement('p');
+    text.textContent = comment.text;
+    title.appendChild(link);
+    body.appendChild(title);
+    body.appendChild(text);
+    item.appendChild(body);
+    return item;
+  }
+
+  function getJSON(url, options) {
+    options = options || {};
+    options.headers = Object.assign(
+      {'Accept': 'application/json'}, options.headers || {}
+    );
+    options.credentials = 'same-origin';
+    return fetch(url, options).then(function (response) {
+      return response.json().then(function (data) {
+        return {ok: response.ok, data: data};
+      });
+    });
+  }
+
+  var more = document.querySelector('[data-comments-more]');
+  if (more) {
+    more.addEventListener('click', function () {
+      more.disabled = true;
+      getJSON(more.dataset.url).then(function (result) {
+        result.data.comments.forEach(function (comment) {
+          list.appendChild(renderComment(comment));
+        });
+        if (result.data.next_url) {
+          more.dataset.url = result.data.next_url;
+          more.disabled = false;
+        } else {
+          more.remove();
+        }
+      }).catch(function () {
+        more.disabled = false;
+      });
+    });
+  }
+
+  var form = document.querySelector('[data-comment-form]');
+  if (form) {
+    var errors = form.querySelector('[data-comment-errors]');
+    form.addEventListener('submit', function (event) {
+      event.preventDefault();
+      var data = new FormData(form);
+      errors.textContent = '';
+      getJSON(form.dataset.url, {
+        method: 'POST',
+        body: data,
+        headers: {'X-CSRFToken': data.get('csrfmiddlewaretoken')}
+      }).then(function (result) {
+        if (!result.ok) {
+          errors.textContent = Object.values(result.data.errors)
+            .map(function (messages) { return messages.join(' '); })
+            .join(' ');
+          return;
+        }
+        // Новый комментарий показываем сразу, только если загружены
+        // все предыдущие: иначе он появится при подгрузке по порядку.
+        if (!document.querySelector('[data-comments-more]')) {
+          list.appendChild(renderComment(result.data));
+        }
+        if (counter) {
+          counter.textContent = Number(counter.textContent) + 1;
+        }
+        form.reset();
+      }).catch(function () {
+        form.submit();
+      });
+    });
+  }
+})();
@@ -0,0 +1,52 @@
+// Живая лента: счётчик новых постов над первой страницей. События
+// приходят через server-sent events или long polling (настройка
+// LIVE_EVENTS['TRANSPORT']); посты показываются после перезагрузки.
+(function () {
+  'use strict';
+
+  var banner = document.querySelector('[data-live-feed]');
+  if (!banner) {
+    return;
+  }
+  var counter = banner.querySelector('[data-live-count]');
+  var seen = {};
+
+  function notify(post) {
+    if (seen[post.id]) {
+      return;
+    }
+    seen[post.id] = true;
+    counter.textContent = Object.keys(seen).length;
+    banner.hidden = false;
+  }
+
+  function listen() {
+    var source = new EventSource(banner.dataset.eventsUrl);
+    source.addEventListener('post', function (event) {
+      notify(JSON.parse(event.data));
+    });
+  }
+
+  function poll(url) {
+    fetch(url, {
+      credentials: 'same-origin',
+      headers: {'Accept': 'application/json'}
+    }).then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.status);
+      }
+      return response.json();
+    }).then(function (data) {
+      data.events.forEach(notify);
+      poll(data.next);
+    }).catch(function () {
+      setTimeout(function () { poll(url); }, 10000);
+    });
+  }
+
+  if (banner.dataset.transport === 'sse' && window.EventSource) {
+    listen();
+  } else {
+    poll(banner.dataset.pollUrl);
+  }
+})();
@@ -0,0 +1,23 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Django 2.2 has no ASGI handler, so the WSGI application is wrapped with
+asgiref's adapter (``pip install asgiref uvicorn``):
+
+    uvicorn yatube.asgi:application
+"""
+
+import os
+
+from asgiref.wsgi import WsgiToAsgi
+from django.core.wsgi import get_wsgi_application
+
+from core.template_warmup import warm
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+application = WsgiToAsgi(get_wsgi_application())
+
+# Templates are compiled before the first request, not during it.
+warm(cached_only=True)